@@ -3,6 +3,10 @@ const port = chrome.runtime.connect();
 
 async function checkAndReloadCallsign() {
     const newCallsign = await fetchCurrentCallsign();
+    await reloadForCallsign(newCallsign);
+}
+
+async function reloadForCallsign(newCallsign) {
     if (!newCallsign) return;
 
     // Request the last callsign from the background script
@@ -20,21 +24,53 @@ async function checkAndReloadCallsign() {
     }
 }
 
-setInterval(checkAndReloadCallsign, 1000);
+// Prefer the push channel of wsjt-x_get_dx_call.py (one event per DX call change),
+// fall back to polling server.js /dx_input if it is not available
+function watchCallsign() {
+    let connected = false;
+    const events = new EventSource('http://localhost:3090/events');
+
+    events.addEventListener('open', () => {
+        connected = true;
+    });
+    events.addEventListener('dx', (event) => {
+        reloadForCallsign(event.data.trim());
+    });
+    events.addEventListener('error', () => {
+        // Once connected, EventSource reconnects by itself
+        if (!connected) {
+            events.close();
+            setInterval(checkAndReloadCallsign, 1000);
+        }
+    });
+}
+
+watchCallsign();
 
 async function highlightCallSign() {
     const callsignSpanClass = 'span.hamcall';
 
-    const adiFileCallsignsList = await fetchAdiFileCallsigns();
     const callSignSpanElement = document.querySelector(callsignSpanClass);
     const callSignElementText = callSignSpanElement ? callSignSpanElement.textContent.trim() : null;
 
     if (callSignSpanElement && callSignElementText) {
-        if (adiFileCallsignsList.includes(callSignElementText)) {
+        const workedStatus = await isCallsignWorked(callSignElementText);
+        if (workedStatus.worked) {
             callSignSpanElement.style.border = '2px solid lime';
             callSignSpanElement.style.padding = '5px';
             callSignSpanElement.style.marginBottom = '10px';
             callSignSpanElement.style.display = 'inline-block';
+            if (workedStatus.band_modes) {
+                const bandModes = workedStatus.band_modes.map(([band, mode]) => `${band} ${mode}`).join(', ');
+                callSignSpanElement.title = `Worked ${workedStatus.qsos} time(s): ${bandModes}`;
+            }
+        } else if (workedStatus.variants && workedStatus.variants.length) {
+            // Worked under another form of the call, e.g. KN6RDD/P
+            callSignSpanElement.style.border = '2px dashed lime';
+            callSignSpanElement.style.padding = '5px';
+            callSignSpanElement.style.marginBottom = '10px';
+            callSignSpanElement.style.display = 'inline-block';
+            callSignSpanElement.title = `Worked as ${workedStatus.variants.join(', ')}`;
         } else {
             callSignSpanElement.style.border = 'none';
             callSignSpanElement.style.padding = '0';
@@ -5,13 +5,15 @@ chrome.tabs.query({ active: true, currentWindow: true }, async (tabs) => {
         target: { tabId: tabId },
         func: async () => {
             const callsignSpanClass = 'span.hamcall';
-            const adiFileCallsignsList = await fetchAdiFileCallsigns();
             const callSignSpanElement = document.querySelector(callsignSpanClass);
             const callSignElementText = callSignSpanElement ? callSignSpanElement.textContent.trim() : null;
 
             if (callSignSpanElement && callSignElementText) {
-                if (adiFileCallsignsList.includes(callSignElementText)) {
+                const workedStatus = await isCallsignWorked(callSignElementText);
+                if (workedStatus.worked) {
                     return `Callsign ${callSignElementText} is found in the WSJTX ADI file.`;
+                } else if (workedStatus.variants && workedStatus.variants.length) {
+                    return `Callsign ${callSignElementText} is found in the WSJTX ADI file as ${workedStatus.variants.join(', ')}.`;
                 } else {
                     return `Callsign ${callSignElementText} is NOT found in the WSJTX ADI file.`;
                 }
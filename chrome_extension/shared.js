@@ -16,14 +16,47 @@ async function fetchAdiFileCallsigns() {
         if (!response.ok) {
             throw new Error('Network response was not ok ' + response.statusText);
         }
-        const content = await response.text();
-
-        // document.getElementById('fileContent').textContent = content;
-        // console.log(content);
-
-        return content;
+        // server.js /file answers a JSON array of the logged calls
+        const callsigns = await response.json();
+        return Array.isArray(callsigns) ? callsigns : [];
     } catch (error) {
         console.error('There has been a problem with your fetch operation:', error);
         return [];
     }
-}
\ No newline at end of file
+}
+
+// Worked-before lookup served by py/worked_server.py, returns null if it is not running
+async function fetchWorkedStatus(callsign) {
+    try {
+        const response = await fetch(`http://localhost:3089/worked/${encodeURIComponent(callsign)}`);
+        if (!response.ok) {
+            throw new Error('Network response was not ok ' + response.statusText);
+        }
+        return await response.json();
+    } catch (error) {
+        console.error('Error fetching worked status:', error);
+    }
+    return null;
+}
+
+// Base call of a portable call, same rules as py/callsign.py split_call():
+// the longest part with letters and digits, so VE3/KN6RDD and KN6RDD/P give KN6RDD
+function baseCall(callsign) {
+    const parts = callsign.trim().toUpperCase().split('/').filter((part) => part);
+    const candidates = parts.filter((part) => /\d/.test(part) && /[A-Z]/.test(part));
+    return (candidates.length ? candidates : parts).reduce((best, part) => (part.length > best.length ? part : best), '');
+}
+
+async function isCallsignWorked(callsign) {
+    const workedStatus = await fetchWorkedStatus(callsign);
+    if (workedStatus) {
+        return workedStatus;
+    }
+
+    // Fall back to the full call list from server.js
+    const adiFileCallsignsList = await fetchAdiFileCallsigns();
+    const call = callsign.trim().toUpperCase();
+    const base = baseCall(call);
+    const variants = adiFileCallsignsList.map((logged) => logged.trim().toUpperCase()).filter((logged) => baseCall(logged) === base);
+    return { call: call, worked: variants.includes(call), base: base, variants: [...new Set(variants)].sort() };
+}
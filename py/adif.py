@@ -0,0 +1,190 @@
+# Streaming ADIF reader for the WSJT-X log (wsjtx_log.adi).
+#
+# Fields are read using their declared <name:length> so values may contain
+# anything, and every record is returned no matter which fields it carries or
+# in what order. AdifTailReader only reads what was appended since last time.
+
+import hashlib
+import json
+import os
+
+CHUNK_SIZE = 1 << 20
+HEAD_BYTES = 1024  # How much of the file start is hashed into its identity
+
+# Same convention as server/server.js
+DEFAULT_ADI_PATH = os.environ.get("ADI_FILE_PATH") or os.path.join(
+    os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "WSJT-X", "wsjtx_log.adi")
+
+
+def file_identity(path, head_size=HEAD_BYTES):
+    """
+    Identifies a log file independently of its name: device and inode (the
+    NTFS file index on Windows) plus a hash of its first bytes, so a log that
+    was replaced or rotated is not mistaken for the one an offset belongs to.
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as file:
+        head = file.read(head_size)
+    return {"dev": stat.st_dev, "ino": stat.st_ino, "head_size": len(head), "head": hashlib.sha1(head).hexdigest()}
+
+
+def is_same_file(path, identity):
+    """True if path is still the file identity was taken from (appends allowed)."""
+    try:
+        return file_identity(path, identity["head_size"]) == identity
+    except (OSError, KeyError):
+        return False
+
+
+def qso_mode(record):
+    """WSJT-X logs FT4 as MODE=MFSK SUBMODE=FT4, the submode is what operators mean."""
+    return (record.get("submode") or record.get("mode") or "").upper()
+
+
+def iter_records(data):
+    """
+    Parses ADIF bytes.
+
+    Args:
+        data: ADIF content as bytes, may start mid-file and end mid-record
+
+    Yields:
+        (record, end) tuples where record maps lowercase field names to str
+        values and end is the offset in data just past the record's <eor>.
+        An incomplete record at the end of data is not yielded.
+    """
+    record = {}
+    pos = 0
+    size = len(data)
+    while True:
+        start = data.find(b"<", pos)
+        if start < 0:
+            return
+        end = data.find(b">", start)
+        if end < 0:
+            return
+        tag = data[start + 1:end].decode("ascii", errors="replace").split(":")
+        name = tag[0].strip().lower()
+        pos = end + 1
+
+        if name == "eor":
+            if record:
+                yield record, pos
+            record = {}
+        elif name == "eoh":
+            # Everything before <eoh> is file header, not a QSO
+            record = {}
+        elif len(tag) > 1:
+            try:
+                length = int(tag[1])
+            except ValueError:
+                continue
+            if pos + length > size:
+                return
+            record[name] = data[pos:pos + length].decode("utf-8", errors="replace")
+            pos += length
+
+
+def iter_file_records(path, offset=0, chunk_size=CHUNK_SIZE):
+    """
+    Streams records from an ADIF file starting at a byte offset, reading it in
+    chunks so memory use does not depend on the file size.
+
+    Yields:
+        (record, end_offset) tuples, end_offset being the absolute file offset
+        just past the record's <eor>
+    """
+    with open(path, "rb") as file:
+        file.seek(offset)
+        base = offset
+        buffer = b""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            buffer += chunk
+            consumed = 0
+            for record, end in iter_records(buffer):
+                consumed = end
+                yield record, base + end
+            buffer = buffer[consumed:]
+            base += consumed
+
+
+def read_records(path):
+    """Returns every QSO record in an ADIF file as a list of dicts."""
+    return [record for record, _ in iter_file_records(path)]
+
+
+class AdifTailReader:
+    """
+    Follows an ADIF file that is only ever appended to.
+
+    read_new() returns the records that were completed since the previous
+    call; a partially written record is left for the next call. If the file
+    shrank or was replaced by another file, reading starts over from the
+    beginning.
+
+    Args:
+        path: ADIF file to follow
+        offset: Byte offset to resume from, 0 reads the whole file first
+        identity: file_identity() the offset was recorded against; if the file
+            no longer matches it the offset is discarded
+    """
+
+    def __init__(self, path, offset=0, identity=None):
+        self.path = path
+        self.offset = offset
+        self.identity = identity
+        self._pending_restart = False
+        if offset and identity is not None and not is_same_file(path, identity):
+            self.offset = 0
+            self._pending_restart = True
+
+    def read_new(self):
+        """
+        Returns:
+            (records, restarted) where restarted is True when the file had to
+            be read again from the start, so anything built from earlier
+            records is out of date
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return [], False
+
+        restarted = self._pending_restart
+        self._pending_restart = False
+        replaced = self.identity is not None and (stat.st_dev, stat.st_ino) != (self.identity["dev"], self.identity["ino"])
+        if stat.st_size < self.offset or replaced:
+            self.offset = 0
+            restarted = True
+        if self.offset == 0 and stat.st_size:
+            self.identity = file_identity(self.path)
+        if stat.st_size == self.offset:
+            return [], restarted
+
+        records = []
+        for record, end in iter_file_records(self.path, self.offset):
+            records.append(record)
+            self.offset = end
+        return records, restarted
+
+    def save_checkpoint(self, checkpoint_path):
+        """Stores the offset so a later run can resume with from_checkpoint()."""
+        temp_path = checkpoint_path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"path": os.path.abspath(self.path), "offset": self.offset, "identity": self.identity}, file)
+        os.replace(temp_path, checkpoint_path)
+
+    @classmethod
+    def from_checkpoint(cls, path, checkpoint_path):
+        """Resumes from a saved checkpoint, or starts at 0 if there is none for this file."""
+        try:
+            with open(checkpoint_path, "r") as file:
+                checkpoint = json.load(file)
+            if checkpoint.get("path") == os.path.abspath(path):
+                return cls(path, int(checkpoint.get("offset", 0)), checkpoint.get("identity"))
+        except (OSError, ValueError):
+            pass
+        return cls(path)
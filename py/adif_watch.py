@@ -0,0 +1,142 @@
+# Notices when WSJT-X writes to the ADI log and hands the change to a callback,
+# typically LogFollower.refresh(), which parses only the appended records and
+# pushes them into its indexes (and rebuilds them if the log was truncated or
+# replaced).
+#
+# Uses the watchdog package (pip install watchdog; inotify on Linux,
+# ReadDirectoryChangesW on Windows) when it is installed, and otherwise polls
+# the file's size, mtime and inode. Bursts of writes are debounced into one
+# refresh, so a QSO shows up well within a second of being logged.
+
+import os
+import threading
+import time
+from datetime import datetime
+
+POLL_SECONDS = 0.25  # Stat interval without watchdog
+WATCHDOG_POLL_SECONDS = 5.0  # Safety stat interval with watchdog, in case an event is missed
+DEBOUNCE_SECONDS = 0.2  # Quiet time after the last write before refreshing
+MAX_DELAY_SECONDS = 0.75  # A continuous burst is refreshed after this long anyway
+
+
+def log_message(message):
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"{timestamp} - {message}")
+
+
+def file_signature(path):
+    """(inode, size, mtime) of path, None if it does not exist; changes on append, truncation and replacement."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class AdiWatcher:
+    """
+    Args:
+        path: ADI log to watch
+        on_change: Called from the watcher thread after a (debounced) change,
+            e.g. LogFollower.refresh; its return value goes to log_message
+            when it is a non-zero count
+        use_watchdog: Use file system events if the watchdog package is
+            installed, False always polls
+        poll_seconds: Stat interval when polling
+        debounce_seconds: Quiet time before on_change is called
+    """
+
+    def __init__(self, path, on_change, use_watchdog=True, poll_seconds=POLL_SECONDS, debounce_seconds=DEBOUNCE_SECONDS):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.use_watchdog = use_watchdog
+        self.poll_seconds = poll_seconds
+        self.debounce_seconds = debounce_seconds
+        self.signature = file_signature(self.path)
+        self.stop_event = threading.Event()
+        self.changed_event = threading.Event()
+        self.thread = None
+        self.observer = None
+        self.refreshes = 0
+
+    def _start_observer(self):
+        """Starts watchdog on the log's directory. Returns False if watchdog is not available."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # Moves and deletes count too: that is how a log gets rotated
+                paths = (event.src_path, getattr(event, "dest_path", ""))
+                if any(path and os.path.abspath(path) == watcher.path for path in paths):
+                    watcher.changed_event.set()
+
+        try:
+            self.observer = Observer()
+            self.observer.schedule(Handler(), os.path.dirname(self.path))
+            self.observer.daemon = True
+            self.observer.start()
+        except OSError as e:
+            log_message(f"Cannot watch {self.path} ({e}), polling it instead.")
+            self.observer = None
+            return False
+        return True
+
+    def start(self):
+        if self.use_watchdog and self._start_observer():
+            self.poll_seconds = max(self.poll_seconds, WATCHDOG_POLL_SECONDS)
+        self.thread = threading.Thread(target=self.run, name="adif-watch", daemon=True)
+        self.thread.start()
+        return self
+
+    def _poll(self):
+        signature = file_signature(self.path)
+        if signature != self.signature:
+            self.signature = signature
+            return True
+        return False
+
+    def _wait_quiet(self):
+        """Waits until the writes stop for debounce_seconds (at most MAX_DELAY_SECONDS)."""
+        started = time.monotonic()
+        while not self.stop_event.is_set() and time.monotonic() - started < MAX_DELAY_SECONDS:
+            self.changed_event.clear()
+            if not self.changed_event.wait(self.debounce_seconds) and not self._poll():
+                return
+
+    def check(self):
+        """One round: refreshes if the file changed. Returns True if on_change was called."""
+        if not self.changed_event.is_set() and not self._poll():
+            return False
+        self._wait_quiet()
+        if self.stop_event.is_set():
+            return False
+        self.changed_event.clear()
+        self.signature = file_signature(self.path)
+        try:
+            result = self.on_change()
+        except Exception as e:
+            log_message(f"Error refreshing from {self.path}: {e}")
+            return False
+        self.refreshes += 1
+        if result:
+            log_message(f"{result} new QSO(s) in {os.path.basename(self.path)}")
+        return True
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.check()
+            self.changed_event.wait(self.poll_seconds)
+
+    def stop(self):
+        self.stop_event.set()
+        self.changed_event.set()
+        if self.observer is not None:
+            self.observer.stop()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
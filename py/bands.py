@@ -0,0 +1,56 @@
+# Amateur band plan (ADIF band names and edges in MHz) and helpers to find the
+# band of a QSO. Band indexes are stable and below 32 so they fit a bitmask.
+
+BANDS = [
+    ("2190m", 0.1357, 0.1378),
+    ("630m", 0.472, 0.479),
+    ("160m", 1.8, 2.0),
+    ("80m", 3.5, 4.0),
+    ("60m", 5.06, 5.45),
+    ("40m", 7.0, 7.3),
+    ("30m", 10.1, 10.15),
+    ("20m", 14.0, 14.35),
+    ("17m", 18.068, 18.168),
+    ("15m", 21.0, 21.45),
+    ("12m", 24.89, 24.99),
+    ("10m", 28.0, 29.7),
+    ("6m", 50.0, 54.0),
+    ("4m", 70.0, 71.0),
+    ("2m", 144.0, 148.0),
+    ("1.25m", 222.0, 225.0),
+    ("70cm", 420.0, 450.0),
+    ("33cm", 902.0, 928.0),
+    ("23cm", 1240.0, 1300.0),
+]
+
+BAND_NAMES = [name for name, _, _ in BANDS]
+BAND_INDEX = {name: index for index, name in enumerate(BAND_NAMES)}
+UNKNOWN_BAND = -1
+
+
+def band_for_freq(freq_mhz):
+    """Returns the band name for a frequency in MHz, or '' if it is outside every band."""
+    for name, low, high in BANDS:
+        if low <= freq_mhz <= high:
+            return name
+    return ""
+
+
+def record_band(record):
+    """Band of an ADIF record, from BAND or, if missing, from FREQ."""
+    band = record.get("band", "").strip().lower()
+    if band:
+        return band
+    try:
+        return band_for_freq(float(record.get("freq", "")))
+    except ValueError:
+        return ""
+
+
+def band_index(name):
+    return BAND_INDEX.get((name or "").lower(), UNKNOWN_BAND)
+
+
+def band_mask_names(mask):
+    """Band names for the bits set in mask, in band plan order."""
+    return [name for index, name in enumerate(BAND_NAMES) if mask >> index & 1]
@@ -0,0 +1,224 @@
+# Benchmarks for the hot paths: ADI parsing, incremental tail ingest,
+# worked-before lookups, and a TX watchdog tick against the fake UI backend.
+# Synthetic WSJT-X logs are generated per size; results are written as JSON
+# so runs can be compared over time.
+#
+#   python benchmark.py --sizes 1000,100000,1000000 --output benchmark_results.json
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import adif
+import event_journal
+from fake_wsjtx import FakeBackend, FakeWSJTX
+from tx_watchdog import TxWatchdog
+from ui_backend import WSJTX_TITLE_PATTERN
+from worked_index import WorkedIndex
+from worked_log import WorkedLog
+from worked_matrix import WorkedMatrix
+from wsjtx_controls import ControlRegistry
+
+DEFAULT_SIZES = "1000,100000,1000000"
+TAIL_QSOS = 100  # QSOs appended before timing the incremental ingest
+BATCH_CALLS = 100
+LOOKUP_REPEAT = 1000
+
+BAND_FREQS = [("160m", 1.840), ("80m", 3.573), ("40m", 7.074), ("30m", 10.136), ("20m", 14.074),
+              ("17m", 18.100), ("15m", 21.074), ("12m", 24.915), ("10m", 28.074), ("6m", 50.313)]
+PREFIXES = ["K", "W", "N", "AA", "KN", "VE", "JA", "DL", "G", "F", "I", "EA", "VK", "ZL", "PY", "LU", "UA", "SP", "OK", "HA"]
+GRID_LETTERS = "ABCDEFGHIJKLMNOPQR"
+
+
+def adif_field(name, value):
+    return f"<{name}:{len(value)}>{value} "
+
+
+def synthetic_record(rng, calls, when):
+    band, freq = rng.choice(BAND_FREQS)
+    mode = rng.choice(["FT8", "FT8", "FT8", "FT4"])
+    grid = rng.choice(GRID_LETTERS) + rng.choice(GRID_LETTERS) + str(rng.randrange(10)) + str(rng.randrange(10))
+    fields = [
+        ("call", rng.choice(calls)),
+        ("gridsquare", grid),
+        ("mode", "MFSK" if mode == "FT4" else mode),
+    ]
+    if mode == "FT4":
+        fields.append(("submode", "FT4"))
+    fields += [
+        ("rst_sent", str(rng.randrange(-24, 10))),
+        ("rst_rcvd", str(rng.randrange(-24, 10))),
+        ("qso_date", when.strftime("%Y%m%d")),
+        ("time_on", when.strftime("%H%M%S")),
+        ("qso_date_off", when.strftime("%Y%m%d")),
+        ("time_off", (when + timedelta(seconds=60)).strftime("%H%M%S")),
+        ("band", band),
+        ("freq", f"{freq + rng.randrange(3000) / 1e6:.6f}"),
+        ("station_callsign", "KN6RDD"),
+        ("my_gridsquare", "CM97"),
+    ]
+    return "".join(adif_field(name, value) for name, value in fields) + "<eor>\n"
+
+
+def synthetic_calls(rng, count):
+    return [f"{rng.choice(PREFIXES)}{rng.randrange(10)}{''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.randrange(1, 4)))}"
+            for _ in range(count)]
+
+
+def generate_adi(path, count, seed=1, append=False):
+    """Writes count WSJT-X style QSO records (with the WSJT-X header unless appending)."""
+    rng = random.Random(seed)
+    calls = synthetic_calls(rng, max(count // 3, 10))
+    when = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    with open(path, "a" if append else "w", newline="\n") as file:
+        if not append:
+            file.write("WSJT-X ADIF Export<eoh>\n")
+        for _ in range(count):
+            when += timedelta(seconds=rng.randrange(60, 600))
+            file.write(synthetic_record(rng, calls, when))
+    return calls
+
+
+def timed(function, repeat=1):
+    """Runs function repeat times, returns (median seconds per run, last result)."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations), result
+
+
+class Results:
+    def __init__(self):
+        self.entries = []
+
+    def add(self, name, size, seconds, operations=1, **extra):
+        entry = {
+            "name": name,
+            "size": size,
+            "seconds": seconds,
+            "operations": operations,
+            "per_operation_us": seconds / operations * 1e6,
+        }
+        entry.update(extra)
+        self.entries.append(entry)
+        print(f"{name:<28} {size:>9} {seconds:>10.4f}s {entry['per_operation_us']:>12.2f} us/op")
+
+
+def bench_log(results, directory, size, include_sqlite):
+    path = os.path.join(directory, f"synthetic_{size}.adi")
+    calls = generate_adi(path, size)
+    file_size = os.path.getsize(path)
+
+    seconds, records = timed(lambda: adif.read_records(path))
+    results.add("adif.full_parse", size, seconds, len(records), file_bytes=file_size)
+
+    reader = adif.AdifTailReader(path)
+    reader.read_new()
+    generate_adi(path, TAIL_QSOS, seed=2, append=True)
+    seconds, (tail, _) = timed(reader.read_new)
+    results.add("adif.tail_ingest", size, seconds, max(len(tail), 1), new_qsos=len(tail))
+
+    rng = random.Random(3)
+    probe_calls = [rng.choice(calls) if rng.random() < 0.5 else f"ZZ{i}ZZ" for i in range(BATCH_CALLS)]
+
+    worked = WorkedLog()
+    seconds, _ = timed(lambda: (worked.clear(), worked.add_records(records)))
+    results.add("worked_log.build", size, seconds, len(records))
+    seconds, _ = timed(lambda: [worked.lookup(call) for call in probe_calls[:1] * LOOKUP_REPEAT])
+    results.add("worked_log.single_lookup", size, seconds, LOOKUP_REPEAT)
+    seconds, _ = timed(lambda: [worked.lookup(call) for call in probe_calls], repeat=10)
+    results.add("worked_log.batch_lookup", size, seconds, len(probe_calls), batch=len(probe_calls))
+
+    matrix = WorkedMatrix()
+    seconds, _ = timed(lambda: (matrix.clear(), matrix.add_records(records)))
+    results.add("worked_matrix.build", size, seconds, len(records), array_bytes=matrix.memory_bytes())
+    seconds, _ = timed(lambda: [matrix.is_worked(call, "20m", "FT8") for call in probe_calls[:1] * LOOKUP_REPEAT])
+    results.add("worked_matrix.single_lookup", size, seconds, LOOKUP_REPEAT)
+    seconds, _ = timed(lambda: [matrix.is_worked(call, "20m", "FT8") for call in probe_calls], repeat=10)
+    results.add("worked_matrix.batch_lookup", size, seconds, len(probe_calls), batch=len(probe_calls))
+
+    if include_sqlite:
+        db_path = os.path.join(directory, f"synthetic_{size}.db")
+        seconds, index = timed(lambda: WorkedIndex(path, db_path))
+        build_seconds, _ = timed(index.refresh)
+        results.add("worked_index.build", size, seconds + build_seconds, len(records) + len(tail))
+        index.close()
+        seconds, index = timed(lambda: WorkedIndex(path, db_path))
+        refresh_seconds, _ = timed(index.refresh)
+        results.add("worked_index.warm_start", size, seconds + refresh_seconds)
+        seconds, _ = timed(lambda: [index.is_worked(call) for call in probe_calls[:1] * LOOKUP_REPEAT])
+        results.add("worked_index.single_lookup", size, seconds, LOOKUP_REPEAT)
+        seconds, _ = timed(lambda: [index.lookup(call) for call in probe_calls], repeat=10)
+        results.add("worked_index.batch_lookup", size, seconds, len(probe_calls), batch=len(probe_calls))
+        index.close()
+
+    os.remove(path)
+
+
+def bench_watchdog(results, ticks=10000):
+    """Times TxWatchdog.step() on a simulated clock, one UI poll per tick."""
+    clock = [time.time()]
+    wsjtx = FakeWSJTX()
+    backend = FakeBackend(wsjtx)
+    window = backend.connect(backend.find_windows(WSJTX_TITLE_PATTERN)[0])
+    controls = ControlRegistry(backend, window, clock=lambda: clock[0])
+    watchdog = TxWatchdog(backend, controls, clock=lambda: clock[0])
+
+    def run():
+        for tick in range(ticks):
+            watchdog.step()
+            clock[0] += 1
+            if tick % 400 == 50:
+                wsjtx.select_tx(2)
+            elif tick % 400 == 80:
+                wsjtx.finish_qso("K7VAY")
+
+    # step() prints state changes, keep them out of the results
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        seconds, _ = timed(run)
+    finally:
+        # log_message() prints from a background thread, let it catch up first
+        event_journal.console.flush()
+        sys.stdout.close()
+        sys.stdout = stdout
+    results.add("tx_watchdog.tick", ticks, seconds, ticks, backend_calls=dict(backend.calls))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parsing, lookups and the TX watchdog")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma separated QSO counts for the synthetic logs")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--skip-sqlite", action="store_true", help="Leave out the SQLite index benchmarks")
+    args = parser.parse_args()
+
+    results = Results()
+    directory = tempfile.mkdtemp(prefix="wsjtx_bench_")
+    try:
+        for size in (int(value) for value in args.sizes.split(",")):
+            bench_log(results, directory, size, not args.skip_sqlite)
+        bench_watchdog(results)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {
+        "generated": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results.entries,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {os.path.abspath(args.output)}")
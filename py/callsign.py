@@ -0,0 +1,160 @@
+# Callsign normalization and a prefix trie over the logged calls.
+#
+# QRZ shows "KN6RDD" while the log may hold "KN6RDD/P" or "VE3/KN6RDD" (and the
+# other way round). split_call() takes a call apart into portable prefix, base
+# call and suffix; CallIndex keeps two tries, one over the logged calls and one
+# over their base calls, so exact, base-call and "starts with JA1" queries cost
+# time proportional to the length of the call, not the size of the log. Lookups
+# for the calls a page asks for again and again are answered from an LRU cache.
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+CACHE_SIZE = 1024  # Cached CallIndex.lookup() results
+MAX_PREFIX_CALLS = 200  # Default cap on the calls returned for a prefix query
+
+_END = ""  # Trie node key holding the values stored at that node
+
+
+def normalize(call):
+    return (call or "").strip().strip("<>").upper()
+
+
+def looks_like_call(part):
+    return any(c.isdigit() for c in part) and any(c.isalpha() for c in part)
+
+
+@lru_cache(maxsize=4096)
+def split_call(call):
+    """
+    Splits a call into (prefix, base, suffix):
+    "VE3/KN6RDD" -> ("VE3", "KN6RDD", ""), "KN6RDD/P" -> ("", "KN6RDD", "P"),
+    "KH6/W1AW/QRP" -> ("KH6", "W1AW", "QRP").
+
+    The base call is the longest part with both letters and digits (the
+    first one on a tie), so "W1AW/KH6" is W1AW operating from KH6.
+    """
+    parts = [part for part in normalize(call).split("/") if part]
+    if not parts:
+        return "", "", ""
+    candidates = [index for index, part in enumerate(parts) if looks_like_call(part)] or range(len(parts))
+    base = max(candidates, key=lambda index: (len(parts[index]), -index))
+    return "/".join(parts[:base]), parts[base], "/".join(parts[base + 1:])
+
+
+def base_call(call):
+    return split_call(call)[1]
+
+
+class PrefixTrie:
+    """Character trie mapping string keys to sets of values."""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, key, value):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+        node.setdefault(_END, set()).add(value)
+
+    def _node(self, key):
+        node = self.root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def get(self, key):
+        """Values stored under exactly key, an empty set if none."""
+        node = self._node(key)
+        return node.get(_END, set()) if node is not None else set()
+
+    def starting_with(self, prefix, limit=None):
+        """Values under every key starting with prefix, shortest keys first, at most limit."""
+        node = self._node(prefix)
+        if node is None:
+            return []
+        values = []
+        level = [node]
+        while level and (limit is None or len(values) < limit):
+            next_level = []
+            for node in level:
+                for char in sorted(node):
+                    if char == _END:
+                        values.extend(sorted(node[_END]))
+                    else:
+                        next_level.append(node[char])
+            level = next_level
+        return values[:limit]
+
+
+class CallIndex:
+    """
+    Exact, base-call and prefix lookups over the logged calls. Like WorkedLog
+    it is a LogFollower index (add_records() and clear()).
+
+    Args:
+        cache_size: How many lookup() results are kept
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.calls = PrefixTrie()
+            self.bases = PrefixTrie()
+            self.count = 0
+            self._cache = OrderedDict()
+
+    def add(self, call):
+        call = normalize(call)
+        if not call:
+            return
+        with self.lock:
+            if not self.calls.get(call):
+                self.calls.add(call, call)
+                self.bases.add(base_call(call), call)
+                self.count += 1
+            self._cache.clear()
+
+    def add_records(self, records):
+        for record in records:
+            self.add(record.get("call"))
+
+    def __contains__(self, call):
+        return bool(self.calls.get(normalize(call)))
+
+    def __len__(self):
+        return self.count
+
+    def variants(self, call):
+        """Logged calls with the same base call, e.g. KN6RDD and VE3/KN6RDD for KN6RDD/P."""
+        return sorted(self.bases.get(base_call(call)))
+
+    def starting_with(self, prefix, limit=MAX_PREFIX_CALLS):
+        """Logged calls starting with prefix ("JA1"), shortest first, at most limit."""
+        return self.calls.starting_with(normalize(prefix), limit)
+
+    def lookup(self, call):
+        """
+        Returns:
+            {"base": base call, "variants": logged calls sharing it}; the
+            result is served from the LRU cache until the index changes
+        """
+        call = normalize(call)
+        with self.lock:
+            result = self._cache.get(call)
+            if result is not None:
+                self._cache.move_to_end(call)
+                return result
+            result = {"base": base_call(call), "variants": self.variants(call)}
+            self._cache[call] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return result
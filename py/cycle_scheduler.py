@@ -0,0 +1,92 @@
+# When to poll the WSJT-X UI next.
+#
+# FixedInterval is the classic once-a-second poll. CyclePolicy follows the
+# FT8/FT4 T/R periods on the UTC clock instead: the states the scripts watch
+# (Enable Tx turning off after 73, the Log QSO window, auto-sequencing picking
+# the next message, the DX call following a double-click on a decode) change
+# right after transmissions end and decodes arrive, i.e. just before and after
+# a period boundary. It samples at a few offsets around each boundary, sleeps in
+# between, and after any detected change polls fast for a few seconds (e.g.
+# while the operator is typing a call). A change in the middle of a period
+# (a call typed or clicked while nothing was changing) is still seen within
+# MAX_INTERVAL_SECONDS, the slow background poll between the samples.
+#
+# Periods divide a UTC minute, so "now % period" is the phase of the current
+# T/R period when now comes from time.time().
+
+PERIODS = {
+    "FT8": 15.0,
+    "FT4": 7.5,
+}
+
+# Sample offsets relative to each period boundary, in seconds. FT8 transmissions
+# end at 12.6 s and decodes land before 14 s; FT4 at 5 s and 6.5 s.
+OFFSETS = {
+    "FT8": (-1.0, 0.5),
+    "FT4": (-0.5, 0.5),
+}
+
+FAST_INTERVAL_SECONDS = 0.5  # Poll interval right after a change
+FAST_SECONDS = 4.0  # How long to keep polling fast after the last change
+MAX_INTERVAL_SECONDS = 5.0  # Longest gap between polls, bounds how late a mid-period change is seen
+
+
+class FixedInterval:
+    def __init__(self, interval=1.0):
+        self.interval = interval
+
+    def next_poll(self, now):
+        return now + self.interval
+
+    def changed(self, now):
+        pass
+
+
+class CyclePolicy:
+    """
+    Args:
+        period: T/R period in seconds
+        offsets: Sample times relative to each period boundary (negative is
+            before the boundary)
+        fast_interval: Poll interval while in fast mode
+        fast_seconds: How long a change keeps fast mode on
+        max_interval: Longest time between two polls, None for samples only
+    """
+
+    def __init__(self, period=PERIODS["FT8"], offsets=OFFSETS["FT8"],
+                 fast_interval=FAST_INTERVAL_SECONDS, fast_seconds=FAST_SECONDS, max_interval=MAX_INTERVAL_SECONDS):
+        self.period = period
+        self.offsets = sorted(offsets)
+        self.fast_interval = fast_interval
+        self.fast_seconds = fast_seconds
+        self.max_interval = max_interval
+        self.fast_until = 0.0
+
+    def next_sample(self, now):
+        """The first boundary-relative sample time after now."""
+        boundary = now - now % self.period
+        while True:
+            for offset in self.offsets:
+                when = boundary + offset
+                if when > now:
+                    return when
+            boundary += self.period
+
+    def next_poll(self, now):
+        sample = self.next_sample(now)
+        if now < self.fast_until:
+            return min(sample, now + self.fast_interval)
+        if self.max_interval is not None:
+            return min(sample, now + self.max_interval)
+        return sample
+
+    def changed(self, now):
+        self.fast_until = now + self.fast_seconds
+
+
+def policy_for(mode=None, interval=1.0):
+    """CyclePolicy for "FT8"/"FT4", FixedInterval(interval) for None."""
+    if not mode:
+        return FixedInterval(interval)
+    mode = mode.upper()
+    return CyclePolicy(PERIODS[mode], OFFSETS[mode])
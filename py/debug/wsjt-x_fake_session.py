@@ -0,0 +1,78 @@
+# Runs the TX watchdog against the in-memory fake WSJT-X on a simulated clock,
+# so its behaviour can be checked (and timed) on any OS without WSJT-X.
+#
+#   python wsjt-x_fake_session.py --minutes 30
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from cycle_scheduler import PERIODS, policy_for
+from event_journal import EventJournal, console, read_events
+from fake_wsjtx import FakeBackend, FakeWSJTX
+from tx_watchdog import TxWatchdog
+from ui_backend import WSJTX_TITLE_PATTERN
+from wsjtx_controls import ControlRegistry
+
+class SimulatedClock:
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+def run_session(minutes, cycle=None, journal_path=None):
+    """
+    Plays a scripted session: a QSO gets stuck sending a report, a QSO is
+    completed and logged, and otherwise the station just keeps calling CQ.
+    """
+    clock = SimulatedClock(time.time())
+    start = clock.now
+    wsjtx = FakeWSJTX()
+    backend = FakeBackend(wsjtx)
+    window = backend.connect(backend.find_windows(WSJTX_TITLE_PATTERN)[0])
+    controls = ControlRegistry(backend, window, clock=clock)
+    journal = EventJournal(journal_path) if journal_path else None
+    watchdog = TxWatchdog(backend, controls, clock=clock, poll_policy=policy_for(cycle), journal=journal)
+
+    # (seconds into the session, action)
+    script = [
+        (20, lambda: wsjtx.select_tx(2)),
+        (180, lambda: wsjtx.select_tx(3)),
+        (200, lambda: wsjtx.finish_qso("K7VAY")),
+        (201, wsjtx.open_alerts),
+        (600, lambda: wsjtx.fail_next("enable_tx")),
+    ]
+
+    steps = 0
+    step_time = 0.0
+    while clock.now - start < minutes * 60:
+        while script and clock.now - start >= script[0][0]:
+            script.pop(0)[1]()
+        started = time.perf_counter()
+        delay = watchdog.step()
+        step_time += time.perf_counter() - started
+        steps += 1
+        clock.now += max(delay, 0.01)
+
+    console.flush()
+    print()
+    print(f"Simulated {minutes} minutes in {steps} steps, {step_time / steps * 1e6:.1f} us per step")
+    print(f"Final state: {watchdog.state.value}, Log QSO confirmations: {len(wsjtx.logged)}")
+    print(f"Backend calls: {backend.calls}")
+    print(f"Control cache: {controls.stats()}")
+    print(f"Window index: {watchdog.windows.listings} listings, {watchdog.windows.rebuilds} rebuilds")
+    if journal is not None:
+        journal.close()
+        events = [entry["event"] for entry in read_events(journal_path, since=start)]
+        print(f"Journal: {len(events)} events ({', '.join(sorted(set(events)))}), {journal.dropped} dropped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the TX watchdog against a fake WSJT-X")
+    parser.add_argument("--minutes", type=float, default=15)
+    parser.add_argument("--cycle", choices=sorted(PERIODS), help="Poll around the T/R period boundaries instead of every second")
+    parser.add_argument("--journal", help="Also record the TX events to this JSONL file")
+    args = parser.parse_args()
+    run_session(args.minutes, args.cycle, args.journal)
@@ -0,0 +1,85 @@
+# Captures WSJT-X UDP datagrams to a file and replays them later, so the UDP
+# listener mode of wsjt-x_get_dx_call.py can be exercised without WSJT-X (on Linux too).
+#
+#   python wsjt-x_udp_replay.py capture udp_capture.txt
+#   python wsjt-x_udp_replay.py replay udp_capture.txt
+#   python wsjt-x_udp_replay.py status KN6RDD
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import wsjtx_udp
+
+def capture(path, host, port):
+    """Writes every datagram as '<seconds since start> <hex payload>' per line."""
+    sock = wsjtx_udp.open_socket(host, port)
+    start = time.time()
+    count = 0
+    print(f"Capturing WSJT-X datagrams from {host}:{port} into {path}. Press Ctrl+C to stop.")
+    try:
+        with open(path, "w") as capture_file:
+            while True:
+                try:
+                    data, _ = sock.recvfrom(65535)
+                except socket.timeout:
+                    continue
+                capture_file.write(f"{time.time() - start:.3f} {data.hex()}\n")
+                capture_file.flush()
+                count += 1
+                message = wsjtx_udp.parse_message(data)
+                if message is not None:
+                    print(f"#{count} type={message['type']} dx_call={message.get('dx_call', '')}")
+    except KeyboardInterrupt:
+        print(f"Captured {count} datagram(s).")
+    finally:
+        sock.close()
+
+def replay(path, host, port, speed):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start = time.time()
+    count = 0
+    with open(path, "r") as capture_file:
+        for line in capture_file:
+            line = line.strip()
+            if not line:
+                continue
+            offset, payload = line.split(" ", 1)
+            delay = float(offset) / speed - (time.time() - start)
+            if delay > 0:
+                time.sleep(delay)
+            sock.sendto(bytes.fromhex(payload), (host, port))
+            count += 1
+    sock.close()
+    print(f"Replayed {count} datagram(s) to {host}:{port}.")
+
+def send_status(dx_call, host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    datagram = wsjtx_udp.encode_message(wsjtx_udp.STATUS, "WSJT-X", {"mode": "FT8", "dx_call": dx_call, "tr_period": 15})
+    sock.sendto(datagram, (host, port))
+    sock.close()
+    print(f"Sent Status with DX call '{dx_call}' to {host}:{port}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Capture and replay WSJT-X UDP traffic")
+    parser.add_argument("--host", default=wsjtx_udp.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=wsjtx_udp.DEFAULT_PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    capture_parser = commands.add_parser("capture", help="Record datagrams to a file")
+    capture_parser.add_argument("path")
+    replay_parser = commands.add_parser("replay", help="Send recorded datagrams with their original timing")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier")
+    status_parser = commands.add_parser("status", help="Send a single synthetic Status message")
+    status_parser.add_argument("dx_call")
+    args = parser.parse_args()
+
+    if args.command == "capture":
+        capture(args.path, args.host, args.port)
+    elif args.command == "replay":
+        replay(args.path, args.host, args.port, args.speed)
+    else:
+        send_status(args.dx_call, args.host, args.port)
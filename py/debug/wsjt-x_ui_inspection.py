@@ -1,10 +1,21 @@
 # Helps finding all the UI elements. 
+#
+#   python wsjt-x_ui_inspection.py              full report, several tree walks
+#   python wsjt-x_ui_inspection.py --snapshot   one walk, JSON snapshot + report
+#   python wsjt-x_ui_inspection.py --diff old.json new.json
+#   python wsjt-x_ui_inspection.py --compile-locators snapshot.json
 
-from pywinauto import Application, findwindows
+import argparse
 import time
 import sys
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import ui_snapshot
+from wsjtx_controls import LOCATORS_FILE
+
+SNAPSHOT_FILE = "wsjt_x_ui_snapshot.json"
+
 def inspect_wsjt_x_ui():
     """
     Creates a detailed inspection of the WSJT-X UI including:
@@ -13,6 +24,8 @@ def inspect_wsjt_x_ui():
     3. Screenshots of the window (if PIL is available)
     4. Saves results to a log file for later reference
     """
+    from pywinauto import Application, findwindows
+
     window_title_pattern = r"WSJT-X\s+.*by K1JT"
     app = None
     max_attempts = 10
@@ -371,5 +384,119 @@ def log_message(message, log_filename):
     with open(log_filename, "a") as log_file:
         log_file.write(message + "\n")
 
+def snapshot_wsjt_x_ui(snapshot_filename=SNAPSHOT_FILE, log_filename="wsjt_x_ui_inspection.log"):
+    """
+    Walks the WSJT-X control tree once into a JSON snapshot and derives the
+    button, lower panel and TX candidate analysis from it. The report goes
+    through a single open file instead of reopening the log for every line.
+    """
+    from pywinauto import Application, findwindows
+
+    matches = findwindows.find_elements(title_re=r"WSJT-X\s+.*by K1JT", backend="uia")
+    if len(matches) != 1:
+        print(f"Expected one WSJT-X window, found {len(matches)}. Exiting.")
+        sys.exit(1)
+    window = Application(backend="uia").connect(handle=matches[0].handle).window(handle=matches[0].handle)
+
+    started = time.perf_counter()
+    snapshot = ui_snapshot.snapshot_uia(window)
+    walk_seconds = time.perf_counter() - started
+    ui_snapshot.write_snapshot(snapshot, snapshot_filename)
+
+    with open(log_filename, "w") as log_file:
+        def emit(message=""):
+            print(message)
+            log_file.write(message + "\n")
+
+        controls = snapshot["controls"]
+        root = controls[0]
+        emit("WSJT-X UI Inspection Report (snapshot)")
+        emit(f"Generated: {snapshot['generated']}")
+        emit("=" * 50)
+        emit(f"Window: {root.get('name')!r}, class {root.get('class_name')!r}, rectangle {root.get('rectangle')}")
+        emit(f"Walked {len(controls)} controls in {walk_seconds:.2f}s, snapshot saved to {os.path.abspath(snapshot_filename)}")
+
+        emit("\n=== FULL CONTROL HIERARCHY ===\n")
+        for control in controls:
+            emit(f"{'   ' * control['depth']}{control.get('control_type', '?')} - {control.get('name', '')!r} "
+                 f"auto_id={control.get('automation_id', '')!r} class={control.get('class_name', '')!r}")
+
+        buttons = ui_snapshot.buttons(snapshot)
+        emit("\n=== DETAILED BUTTON ANALYSIS ===\n")
+        emit(f"Found {len(buttons)} buttons in the UI.")
+        for i, button in enumerate(buttons, 1):
+            emit(f"\nButton #{i}:")
+            for key in ui_snapshot.PROPERTIES + ("parent_name", "parent_class", "parent_automation_id", "path"):
+                emit(f"  {key}: {button.get(key)}")
+            if button["maybe_tx"]:
+                emit("  NOTE: This button may be the TX button based on its text!")
+
+        emit("\n=== LOOKING FOR CONTROLS IN LOWER PANEL ===\n")
+        panels = ui_snapshot.lower_panel_candidates(snapshot)
+        if not panels:
+            emit("No clear lower panel containers found.")
+        for i, (panel, children) in enumerate(panels, 1):
+            emit(f"\nLower Panel Candidate #{i}: {panel.get('control_type')} {panel.get('name')!r} "
+                 f"auto_id={panel.get('automation_id')!r} class={panel.get('class_name')!r}")
+            emit(f"  Children: {len(children)}")
+            for j, child in enumerate(children, 1):
+                emit(f"    Child #{j}: {child.get('control_type')} {child.get('name')!r} "
+                     f"auto_id={child.get('automation_id')!r} class={child.get('class_name')!r}")
+
+        emit("\n=== ANALYSIS AND RECOMMENDATIONS ===\n")
+        candidates = ui_snapshot.tx_button_candidates(snapshot)
+        if not candidates:
+            emit("No clear TX button candidates identified. Please review the full control hierarchy.")
+        for i, (button, score) in enumerate(candidates, 1):
+            emit(f"{i}. Score: {score}/10 - Text: '{button.get('name')}', "
+                 f"ID: '{button.get('automation_id')}', Class: '{button.get('class_name')}'")
+
+    print(f"\nComplete inspection saved to: {os.path.abspath(log_filename)}")
+
+def diff_snapshots(old_filename, new_filename):
+    """Prints what changed between two snapshots, e.g. from two WSJT-X versions."""
+    diff = ui_snapshot.diff_snapshots(ui_snapshot.load_snapshot(old_filename), ui_snapshot.load_snapshot(new_filename))
+    print(f"Snapshot diff {old_filename} -> {new_filename}")
+    print(f"\n=== MOVED ({len(diff['moved'])}) ===")
+    for old_id, new_id in sorted(diff["moved"].items()):
+        print(f"  {old_id}\n    -> {new_id}")
+    print(f"\n=== REMOVED ({len(diff['removed'])}) ===")
+    for automation_id in diff["removed"]:
+        print(f"  {automation_id}")
+    print(f"\n=== ADDED ({len(diff['added'])}) ===")
+    for automation_id in diff["added"]:
+        print(f"  {automation_id}")
+    print(f"\n=== CHANGED ({len(diff['changed'])}) ===")
+    for automation_id, fields in diff["changed"].items():
+        print(f"  {automation_id}")
+        for field, (old, new) in fields.items():
+            print(f"    {field}: {old!r} -> {new!r}")
+    return diff
+
+def compile_locators(snapshot_filename, locators_filename=LOCATORS_FILE):
+    """Writes the locator map the runtime scripts load at startup."""
+    locators, missing = ui_snapshot.compile_locators(ui_snapshot.load_snapshot(snapshot_filename))
+    ui_snapshot.write_locators(locators, locators_filename)
+    for name, locator in sorted(locators["controls"].items()):
+        print(f"  {name:<10} {locator['control_type']:<12} {locator['auto_id']} (by {locator['matched_by']})")
+    if missing:
+        print(f"Could not locate: {', '.join(missing)} (the built-in ids stay in use for those)")
+    print(f"Locator map with {len(locators['controls'])} controls saved to: {os.path.abspath(locators_filename)}")
+
 if __name__ == "__main__":
-    inspect_wsjt_x_ui()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Inspect the WSJT-X UI Automation tree")
+    parser.add_argument("--snapshot", nargs="?", const=SNAPSHOT_FILE, metavar="JSON",
+                        help=f"Walk the tree once and save a JSON snapshot (default {SNAPSHOT_FILE})")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"), help="Compare two snapshots")
+    parser.add_argument("--compile-locators", metavar="SNAPSHOT",
+                        help="Compile a snapshot into the locator map the runtime scripts load")
+    parser.add_argument("--locators", default=LOCATORS_FILE, help=f"Locator map to write (default {LOCATORS_FILE})")
+    args = parser.parse_args()
+    if args.diff:
+        diff_snapshots(*args.diff)
+    elif args.compile_locators:
+        compile_locators(args.compile_locators, args.locators)
+    elif args.snapshot:
+        snapshot_wsjt_x_ui(args.snapshot)
+    else:
+        inspect_wsjt_x_ui()
\ No newline at end of file
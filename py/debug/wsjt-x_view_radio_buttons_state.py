@@ -1,8 +1,12 @@
 from pywinauto import Application, findwindows
+import os
 import time
 import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from wsjtx_controls import load_controls
+
 def log_message(message):
     """Helper function to print timestamped log messages"""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -49,12 +53,12 @@ def check_radio_buttons():
     log_message("Checking status of radio buttons txrb1 through txrb6...")
     
     try:
-        # Base auto_id pattern, we'll replace the number for each radio button
-        base_id = "MainWindow.centralWidget.lower_panel_widget.controls_stack_widget.page.QSO_controls_widget.tabWidget.qt_tabwidget_stackedwidget.tab.txrb"
-        
+        # Automation ids come from the compiled locator map when there is one
+        controls, _ = load_controls()
+
         # Check each radio button from txrb1 to txrb6
         for i in range(1, 7):
-            radio_id = f"{base_id}{i}"
+            radio_id = controls[f"txrb{i}"]["auto_id"]
             try:
                 radio_button = window.child_window(
                     auto_id=radio_id, 
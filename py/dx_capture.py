@@ -0,0 +1,96 @@
+# DX call outputs (dx_input_log.txt, the mmap slot, Server-Sent Events) and the
+# DX capture handler the supervisor runs next to the TX watchdog.
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import dx_slot
+import instances
+from cycle_scheduler import FixedInterval
+
+DX_INPUT_LOG = "dx_input_log.txt"
+DX_SLOT = dx_slot.DEFAULT_SLOT_PATH
+DX_POLL_SECONDS = 1  # How often the DX Call entry is read
+
+
+def write_to_file(text, path=DX_INPUT_LOG):
+    # Temp file + rename, so server.js never reads a half-written file
+    dx_slot.replace_file(path, text)
+
+def dx_call_changed(text, events, slot, path=DX_INPUT_LOG):
+    if slot is not None:
+        slot.write(text)
+    write_to_file(text, path)
+    if events is not None:
+        events.publish(text)
+
+def read_previous_text(path=DX_INPUT_LOG):
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            return file.read().strip()
+    return None
+
+
+class InstanceOutputs:
+    """
+    DX call file and slot of one WSJT-X instance: dx_input_log.txt for the
+    default instance, dx_input_log_<rig>.txt (and .slot) for the others.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.path = instances.instance_path(DX_INPUT_LOG, name)
+        self.slot = dx_slot.DxSlotWriter(instances.instance_path(DX_SLOT, name))
+        self.previous_text = read_previous_text(self.path)
+        self.lock = threading.Lock()
+
+    def update(self, text, events):
+        """Writes text if it is a new DX call. Returns True if it was."""
+        with self.lock:
+            if not text or text == self.previous_text:
+                return False
+            dx_call_changed(text, events, self.slot, self.path)
+            self.previous_text = text
+        print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - [{self.name}] {text}")
+        return True
+
+    def close(self):
+        self.slot.close()
+
+
+class DxCapture:
+    """
+    Supervisor handler that mirrors the DX Call entry into the outputs. Like
+    TxWatchdog it has step() (returns how long it may sleep) and reset().
+
+    Args:
+        controls: ControlRegistry of the WSJT-X window, shared with the watchdog
+        outputs: InstanceOutputs to write to
+        events: DxEventServer to publish to, or None
+        clock: Time source
+        poll_policy: When to read the entry (cycle_scheduler), every
+            DX_POLL_SECONDS by default
+    """
+
+    def __init__(self, controls, outputs, events=None, clock=time.time, poll_policy=None):
+        self.controls = controls
+        self.outputs = outputs
+        self.events = events
+        self.clock = clock
+        self.poll_policy = poll_policy or FixedInterval(DX_POLL_SECONDS)
+        self.next_poll = 0
+
+    def reset(self, controls=None):
+        if controls is not None:
+            self.controls = controls
+        self.next_poll = 0
+
+    def step(self):
+        now = self.clock()
+        if now >= self.next_poll:
+            if self.outputs.update(self.controls.get_value("dx_call"), self.events):
+                self.poll_policy.changed(now)
+            self.next_poll = self.poll_policy.next_poll(now)
+        return max(0.0, self.next_poll - self.clock())
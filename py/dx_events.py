@@ -0,0 +1,107 @@
+# Server-Sent Events endpoint for DX call changes, hosted by wsjt-x_get_dx_call.py
+# itself. Every open QRZ tab keeps one idle connection and receives one event
+# per change, instead of polling /dx_input every second.
+#
+#   GET /events    text/event-stream, "dx" event with the call as data
+#   GET /dx_input  current call as plain text (same as server.js)
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 3090
+KEEPALIVE_SECONDS = 15  # Comment line sent on idle connections so proxies/browsers keep them open
+
+
+class DxEventServer:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, initial_call=None):
+        self.call = initial_call or ""
+        self.sequence = 0
+        self.changed = threading.Condition()
+        self.running = True
+        handler = type("Handler", (_EventRequestHandler,), {"events": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        with self.changed:
+            self.running = False
+            self.changed.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def publish(self, call):
+        """Sends call to every connected client, unless it is already the current one."""
+        with self.changed:
+            if call == self.call:
+                return
+            self.call = call
+            self.sequence += 1
+            self.changed.notify_all()
+
+    def wait_for_change(self, sequence, timeout):
+        """Blocks until the sequence moves past the given one or timeout passes."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.sequence != sequence or not self.running, timeout)
+            return self.sequence, self.call, self.running
+
+
+class _EventRequestHandler(BaseHTTPRequestHandler):
+    events = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _cors_headers(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", "no-cache")
+
+    def do_GET(self):
+        if self.path.startswith("/events"):
+            self._stream_events()
+        elif self.path.startswith("/dx_input"):
+            payload = self.events.call.encode("utf-8")
+            self.send_response(200)
+            self._cors_headers()
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self.send_error(404)
+
+    def _stream_events(self):
+        self.send_response(200)
+        self._cors_headers()
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        sequence = self.events.sequence
+        call = self.events.call
+        try:
+            # The current call first, so a freshly opened tab is in sync
+            self._send_event(sequence, call)
+            while True:
+                new_sequence, call, running = self.events.wait_for_change(sequence, KEEPALIVE_SECONDS)
+                if not running:
+                    return
+                if new_sequence == sequence:
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    sequence = new_sequence
+                    self._send_event(sequence, call)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+
+    def _send_event(self, sequence, call):
+        self.wfile.write(f"id: {sequence}\nevent: dx\ndata: {call}\n\n".encode("utf-8"))
+        self.wfile.flush()
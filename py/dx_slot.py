@@ -0,0 +1,160 @@
+# Fixed-size, memory-mapped "current DX" record shared between processes.
+#
+# The writer follows a seqlock protocol: it makes the sequence odd, writes the
+# call and timestamp, then makes it even again. A reader copies the record and
+# accepts it only if the sequence was even and unchanged across the copy.
+# Reading is plain memory access on the mapping, no syscalls per poll.
+#
+# Python has no memory barriers, the stores to the mapping are plain memcpy's.
+# The sequence recheck alone is only sound where stores become visible in
+# program order (x86 TSO). The record therefore also carries a CRC32 of the
+# timestamp and call, which the reader checks too, so a weakly ordered CPU
+# (ARM64) that shows the new sequence before the new body gets a retry, not
+# a torn value.
+#
+#   python dx_slot.py          # follow the slot and print every change
+
+import mmap
+import os
+import struct
+import time
+import zlib
+
+DEFAULT_SLOT_PATH = "dx_current.slot"
+MAGIC = b"DXS2"
+MAX_CALL_LENGTH = 32
+SPIN_ATTEMPTS = 100  # Retries before a reader starts yielding to the writer
+
+# magic, 4 pad bytes, sequence, then the body: timestamp, call length, call
+# bytes and the CRC32 of those
+SLOT_SIZE = 64
+_SEQUENCE_OFFSET = 8
+_SEQUENCE = struct.Struct("<Q")
+_BODY = struct.Struct(f"<dB{MAX_CALL_LENGTH}sI")
+_BODY_OFFSET = _SEQUENCE_OFFSET + 8
+
+assert _BODY_OFFSET + _BODY.size <= SLOT_SIZE
+
+
+def _pack_body(timestamp, encoded):
+    body = _BODY.pack(timestamp, len(encoded), encoded, 0)
+    return body[:-4] + struct.pack("<I", zlib.crc32(body[:-4]))
+
+
+def _is_slot_file(path):
+    try:
+        with open(path, "rb") as file:
+            return os.fstat(file.fileno()).st_size == SLOT_SIZE and file.read(4) == MAGIC
+    except OSError:
+        return False
+
+
+def _open_mapping(path, create):
+    if create and not _is_slot_file(path):
+        with open(path, "wb") as file:
+            file.write((MAGIC + bytes(12) + _pack_body(0.0, b"")).ljust(SLOT_SIZE, b"\0"))
+    file = open(path, "r+b" if create else "rb")
+    try:
+        access = mmap.ACCESS_WRITE if create else mmap.ACCESS_READ
+        return mmap.mmap(file.fileno(), SLOT_SIZE, access=access)
+    finally:
+        # The mapping stays valid after the file object is closed
+        file.close()
+
+
+class DxSlotWriter:
+    """Single writer of the slot, creates the file on first use."""
+
+    def __init__(self, path=DEFAULT_SLOT_PATH):
+        self.path = path
+        self.mapping = _open_mapping(path, create=True)
+        self.sequence = _SEQUENCE.unpack_from(self.mapping, _SEQUENCE_OFFSET)[0] & ~1
+
+    def write(self, call, timestamp=None):
+        encoded = call.encode("ascii", errors="replace")[:MAX_CALL_LENGTH]
+        timestamp = time.time() if timestamp is None else timestamp
+
+        self.sequence += 1  # odd: write in progress
+        _SEQUENCE.pack_into(self.mapping, _SEQUENCE_OFFSET, self.sequence)
+        self.mapping[_BODY_OFFSET:_BODY_OFFSET + _BODY.size] = _pack_body(timestamp, encoded)
+        self.sequence += 1  # even: record is consistent
+        _SEQUENCE.pack_into(self.mapping, _SEQUENCE_OFFSET, self.sequence)
+
+    def close(self):
+        self.mapping.close()
+
+
+class DxSlotReader:
+    """Lock-free reader of the slot; several processes can read at once."""
+
+    def __init__(self, path=DEFAULT_SLOT_PATH):
+        self.mapping = _open_mapping(path, create=False)
+        if self.mapping[:4] != MAGIC:
+            raise ValueError(f"{path} is not a DX slot file")
+
+    def sequence(self):
+        """Cheap change check: compare with the previous value before calling read()."""
+        return _SEQUENCE.unpack_from(self.mapping, _SEQUENCE_OFFSET)[0]
+
+    def read(self, timeout=1.0):
+        """
+        Returns:
+            (call, sequence, timestamp) of the latest complete write
+        """
+        attempts = 0
+        deadline = None
+        while True:
+            before = _SEQUENCE.unpack_from(self.mapping, _SEQUENCE_OFFSET)[0]
+            if not before & 1:
+                body = self.mapping[_BODY_OFFSET:_BODY_OFFSET + _BODY.size]
+                after = _SEQUENCE.unpack_from(self.mapping, _SEQUENCE_OFFSET)[0]
+                timestamp, length, call, checksum = _BODY.unpack(body)
+                if before == after and checksum == zlib.crc32(body[:-4]):
+                    return call[:length].decode("ascii"), before, timestamp
+
+            # Caught the writer mid-update. Spin briefly, then yield the CPU
+            # in case the writer was preempted inside its write.
+            attempts += 1
+            if attempts > SPIN_ATTEMPTS:
+                if deadline is None:
+                    deadline = time.monotonic() + timeout
+                elif time.monotonic() > deadline:
+                    raise TimeoutError("DX slot writer did not finish a write")
+                time.sleep(0.0005)
+
+    def close(self):
+        self.mapping.close()
+
+
+def replace_file(path, text, attempts=5):
+    """
+    Writes text to path atomically: a temp file renamed over the target, so
+    plain-file readers see the old or the new content, never a partial one.
+    Windows refuses the rename while another process has the target open, in
+    that case it retries briefly and finally writes in place.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as file:
+        file.write(text)
+    for _ in range(attempts):
+        try:
+            os.replace(temp_path, path)
+            return
+        except PermissionError:
+            time.sleep(0.01)
+    os.remove(temp_path)
+    with open(path, "w") as file:
+        file.write(text)
+
+
+if __name__ == "__main__":
+    reader = DxSlotReader()
+    last_sequence = None
+    try:
+        while True:
+            if reader.sequence() != last_sequence:
+                call, last_sequence, timestamp = reader.read()
+                print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))} - {call} (seq {last_sequence})")
+            time.sleep(0.05)
+    except KeyboardInterrupt:
+        pass
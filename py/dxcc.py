@@ -0,0 +1,243 @@
+# Offline DXCC entity resolution from a cty.dat prefix file
+# (https://www.country-files.com/, the file most logging programs use).
+#
+# The file is parsed once and compiled into two dicts: prefix -> entity record
+# and exact call -> entity record (the "=CALL" entries). A call resolves with
+# a handful of dict probes, from its longest prefix down. The compiled form is
+# saved next to cty.dat as JSON and reused while cty.dat is unchanged, and
+# resolve() is memoized per call, so resolving every decode is cheap.
+#
+#   python dxcc.py K1ABC VE3/KN6RDD JA1XYZ/P
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+
+from callsign import looks_like_call, normalize, split_call
+
+DEFAULT_CTY_PATH = os.environ.get("CTY_DAT_PATH") or "cty.dat"
+MEMO_SIZE = 65536  # Calls whose resolution is memoized
+
+# Suffixes that say nothing about the entity (portable, mobile, QRP, ...)
+IGNORED_SUFFIXES = {"P", "M", "QRP", "A", "B", "R", "LH", "J"}
+# Maritime and aeronautical mobile do not count for any entity
+NO_ENTITY_SUFFIXES = {"MM", "AM"}
+
+# Per-prefix overrides of the entity defaults: (CQ) [ITU] <lat/lon> {continent} ~UTC~
+_OVERRIDES = re.compile(r"\((\d+)\)|\[(\d+)\]|<([-\d.]+)/([-\d.]+)>|\{(\w+)\}|~([-\d.]+)~")
+
+
+def _entity(fields):
+    name, cq_zone, itu_zone, continent, lat, lon, utc_offset, prefix = (field.strip() for field in fields)
+    return {
+        "entity": name,
+        "prefix": prefix.lstrip("*"),
+        "wae": prefix.startswith("*"),  # WAE/CQ-only entity, not on the DXCC list
+        "cq_zone": int(cq_zone),
+        "itu_zone": int(itu_zone),
+        "continent": continent,
+        "lat": float(lat),
+        "lon": -float(lon),  # cty.dat has west longitudes positive
+        "utc_offset": float(utc_offset),
+    }
+
+
+def _apply_overrides(entity, alias):
+    """(prefix, record) for one alias token like "=W1AW(5)[8]" or "KH6"."""
+    record = entity
+    for cq, itu, lat, lon, continent, utc in _OVERRIDES.findall(alias):
+        if record is entity:
+            record = dict(entity)
+        if cq:
+            record["cq_zone"] = int(cq)
+        if itu:
+            record["itu_zone"] = int(itu)
+        if lat:
+            record["lat"], record["lon"] = float(lat), -float(lon)
+        if continent:
+            record["continent"] = continent
+        if utc:
+            record["utc_offset"] = float(utc)
+    return _OVERRIDES.sub("", alias), record
+
+
+def compile_cty(text):
+    """
+    Compiles cty.dat content.
+
+    Returns:
+        {"records": [...], "prefixes": {prefix: record index},
+         "exact": {call: record index}}; records are entity dicts, one per
+        distinct set of overrides
+    """
+    records = []
+    record_ids = {}
+    prefixes = {}
+    exact = {}
+
+    def record_id(record):
+        key = json.dumps(record, sort_keys=True)
+        if key not in record_ids:
+            record_ids[key] = len(records)
+            records.append(record)
+        return record_ids[key]
+
+    for block in text.split(";"):
+        fields = block.split(":")
+        if len(fields) < 9:
+            continue
+        try:
+            entity = _entity(fields[:8])
+        except ValueError:
+            continue
+        for alias in ":".join(fields[8:]).replace("\n", "").split(","):
+            alias = alias.strip()
+            if not alias:
+                continue
+            alias, record = _apply_overrides(entity, alias)
+            if alias.startswith("="):
+                exact[alias[1:].upper()] = record_id(record)
+            else:
+                prefixes[alias.upper()] = record_id(record)
+    return {"records": records, "prefixes": prefixes, "exact": exact}
+
+
+def _source_key(path):
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+class DxccResolver:
+    """
+    Args:
+        compiled: compile_cty() result
+        memo_size: How many resolve() results are memoized
+    """
+
+    def __init__(self, compiled, memo_size=MEMO_SIZE):
+        self.records = compiled["records"]
+        self.prefixes = compiled["prefixes"]
+        self.exact = compiled["exact"]
+        self.max_prefix = max((len(prefix) for prefix in self.prefixes), default=0)
+        self.resolve = lru_cache(maxsize=memo_size)(self._resolve)
+
+    @classmethod
+    def load(cls, cty_path=DEFAULT_CTY_PATH, cache_path=None):
+        """
+        Loads cty.dat, using the compiled cache (cty.json next to it by
+        default) if it was built from the same file content.
+        """
+        cache_path = cache_path or os.path.splitext(cty_path)[0] + ".json"
+        source = _source_key(cty_path)
+        try:
+            with open(cache_path, "r") as file:
+                cached = json.load(file)
+            if cached.get("source") == source:
+                return cls(cached)
+        except (OSError, ValueError):
+            pass
+
+        with open(cty_path, "r", encoding="utf-8", errors="replace") as file:
+            compiled = compile_cty(file.read())
+        compiled["source"] = source
+        try:
+            with open(cache_path + ".tmp", "w") as file:
+                json.dump(compiled, file)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError:
+            pass  # A read-only directory only costs the compile on the next start
+        return cls(compiled)
+
+    def _longest_prefix(self, text):
+        for length in range(min(len(text), self.max_prefix), 0, -1):
+            record_id = self.prefixes.get(text[:length])
+            if record_id is not None:
+                return self.records[record_id]
+        return None
+
+    def _resolve(self, call):
+        call = normalize(call)
+        record_id = self.exact.get(call)
+        if record_id is not None:
+            return self.records[record_id]
+        prefix, base, suffix = split_call(call)
+        if suffix in NO_ENTITY_SUFFIXES:
+            return None
+        if prefix:
+            # VE3/KN6RDD operates from VE3
+            return self._longest_prefix(prefix)
+        if suffix and suffix not in IGNORED_SUFFIXES and looks_like_call(suffix):
+            # W1AW/KH6 operates from KH6
+            return self._longest_prefix(suffix)
+        record_id = self.exact.get(base)
+        if record_id is not None:
+            return self.records[record_id]
+        return self._longest_prefix(base)
+
+    def entity(self, call):
+        """Entity name of call, or None."""
+        record = self.resolve(call)
+        return record["entity"] if record else None
+
+
+class DxccIndex:
+    """
+    Entities and CQ zones worked, as a LogFollower index, so a worked-before
+    answer can say whether a call would be a new one.
+
+    Args:
+        resolver: DxccResolver
+    """
+
+    def __init__(self, resolver):
+        self.resolver = resolver
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.entities = {}  # entity name -> QSO count
+            self.cq_zones = {}  # CQ zone -> QSO count
+
+    def add_records(self, records):
+        with self.lock:
+            for record in records:
+                resolved = self.resolver.resolve(record.get("call", ""))
+                if resolved is None:
+                    continue
+                self.entities[resolved["entity"]] = self.entities.get(resolved["entity"], 0) + 1
+                self.cq_zones[resolved["cq_zone"]] = self.cq_zones.get(resolved["cq_zone"], 0) + 1
+
+    def lookup(self, call):
+        """{"dxcc": entity record or None, "new_entity": bool, "new_cq_zone": bool}"""
+        resolved = self.resolver.resolve(call)
+        if resolved is None:
+            return {"dxcc": None, "new_entity": False, "new_cq_zone": False}
+        with self.lock:
+            return {
+                "dxcc": resolved,
+                "new_entity": resolved["entity"] not in self.entities,
+                "new_cq_zone": resolved["cq_zone"] not in self.cq_zones,
+            }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve calls to DXCC entities with a cty.dat file")
+    parser.add_argument("calls", nargs="+")
+    parser.add_argument("--cty", default=DEFAULT_CTY_PATH, help="cty.dat (default: $CTY_DAT_PATH or ./cty.dat)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    resolver = DxccResolver.load(args.cty)
+    print(f"Loaded {len(resolver.prefixes)} prefixes and {len(resolver.exact)} exact calls in {time.perf_counter() - started:.3f}s")
+    for call in args.calls:
+        record = resolver.resolve(call)
+        if record is None:
+            print(f"{call.upper()}: no entity")
+        else:
+            print(f"{call.upper()}: {record['entity']} ({record['prefix']}) CQ {record['cq_zone']} ITU {record['itu_zone']} {record['continent']}")
@@ -0,0 +1,227 @@
+# Structured event journal of the TX watchdog, and the console writer behind
+# log_message().
+#
+# Both hand their output to a background thread through a bounded queue, so the
+# UI loop never waits on the disk or the console. If the queue is ever full the
+# entry is dropped and counted instead of blocking. The journal is JSON Lines,
+# one event per line, rotated by size:
+#
+#   {"time": 1729234567.12, "event": "tx6_timer_expired", "instance": "IC7300", "seconds": 150.2}
+#
+#   python event_journal.py                          # counts per event
+#   python event_journal.py --event log_qso_confirmed
+
+import argparse
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime
+
+DEFAULT_JOURNAL_PATH = "tx_watchdog_events.jsonl"
+MAX_BYTES = 5 * 1024 * 1024  # Journal size before it is rotated to .1
+BACKUPS = 3  # Rotated journals kept (.1 is the newest)
+QUEUE_SIZE = 10000  # Entries waiting for the writer thread before new ones are dropped
+
+# Events
+TX_ENABLED = "tx_enabled"
+TX_DISABLED = "tx_disabled"
+TX6_TIMER_STARTED = "tx6_timer_started"
+TX6_TIMER_EXPIRED = "tx6_timer_expired"
+REPORT_MODE_ENTERED = "report_mode_entered"
+REPORT_MODE_STUCK = "report_mode_stuck"
+LOG_QSO_CONFIRMED = "log_qso_confirmed"
+RECONNECTED = "reconnected"
+
+
+class QueueWriter(ABC):
+    """
+    Runs write_batch(items) on a background thread for everything put().
+
+    Args:
+        name: Name of the writer thread
+        queue_size: Pending entries before put() starts dropping
+    """
+
+    def __init__(self, name, queue_size=QUEUE_SIZE):
+        self.name = name
+        self.queue = queue.Queue(queue_size)
+        self.dropped = 0
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self.thread.start()
+
+    def put(self, item):
+        """Queues item, never blocks. Returns False if it was dropped."""
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            items = [self.queue.get()]
+            # Everything that piled up meanwhile goes out in one write
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in items
+            try:
+                self.write_batch([item for item in items if item is not None])
+            except Exception as e:
+                print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {self.name} failed: {e}")
+            for _ in items:
+                self.queue.task_done()
+            if stop:
+                return
+
+    @abstractmethod
+    def write_batch(self, items):
+        """Writes a batch of queued items, on the writer thread."""
+
+    def flush(self):
+        """Blocks until everything queued so far is written. Not for the UI loop."""
+        if self.thread is not None:
+            self.queue.join()
+
+    def close(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout=5)
+
+
+class ConsoleWriter(QueueWriter):
+    def __init__(self, queue_size=QUEUE_SIZE):
+        super().__init__("console-writer", queue_size)
+
+    def write_batch(self, lines):
+        print("\n".join(lines), flush=True)
+
+
+class EventJournal(QueueWriter):
+    """
+    Args:
+        path: JSONL file to append to
+        max_bytes: Size at which the file is rotated
+        backups: Rotated files kept (path.1 .. path.N)
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, max_bytes=MAX_BYTES, backups=BACKUPS, queue_size=QUEUE_SIZE):
+        super().__init__("event-journal", queue_size)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.file = None
+        self.size = 0
+        self.rotate_at = max_bytes  # Moves up by max_bytes when a rotation fails
+
+    def emit(self, event, when=None, **fields):
+        """Records an event (plus JSON-serializable fields) without waiting for the write."""
+        entry = {"time": round(time.time() if when is None else when, 3), "event": event}
+        thread = threading.current_thread()
+        if thread is not threading.main_thread():
+            entry["instance"] = thread.name
+        entry.update(fields)
+        return self.put(entry)
+
+    def _open(self):
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.size = self.file.tell()
+
+    def _rotate(self):
+        self.file.close()
+        self.file = None  # Reopened by the next batch if even _open() fails
+        self.rotate_at = self.max_bytes
+        try:
+            for index in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{index}"):
+                    os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+            if self.backups:
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                os.remove(self.path)
+        except OSError as e:
+            # E.g. the journal is open in a viewer on Windows; keep appending
+            # to it and try again at the next rotation size
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - Cannot rotate {self.path}: {e}")
+            self.rotate_at = self.size + self.max_bytes
+        finally:
+            self._open()
+
+    def write_batch(self, entries):
+        if self.file is None:
+            self._open()
+        for entry in entries:
+            line = json.dumps(entry, separators=(",", ":")) + "\n"
+            if self.size and self.size + len(line) > self.rotate_at:
+                self._rotate()
+            self.file.write(line)
+            self.size += len(line)
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def journal_files(path=DEFAULT_JOURNAL_PATH, backups=BACKUPS):
+    """The journal and its rotated files that exist, oldest first."""
+    candidates = [f"{path}.{index}" for index in range(backups, 0, -1)] + [path]
+    return [candidate for candidate in candidates if os.path.exists(candidate)]
+
+
+def read_events(path=DEFAULT_JOURNAL_PATH, event=None, since=None, backups=BACKUPS):
+    """Yields the journal entries, oldest first, optionally of one event type and not older than since."""
+    for file_path in journal_files(path, backups):
+        with open(file_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by a crash
+                if event is not None and entry.get("event") != event:
+                    continue
+                if since is not None and entry.get("time", 0) < since:
+                    continue
+                yield entry
+
+
+# Shared by every log_message() in the process
+console = ConsoleWriter()
+atexit.register(console.close)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize or list the TX watchdog event journal")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH)
+    parser.add_argument("--event", help="List the events of this type instead of counting all of them")
+    parser.add_argument("--hours", type=float, help="Only the last this many hours")
+    args = parser.parse_args()
+
+    since = time.time() - args.hours * 3600 if args.hours else None
+    if args.event:
+        for entry in read_events(args.journal, args.event, since):
+            when = datetime.fromtimestamp(entry["time"]).strftime('%Y-%m-%d %H:%M:%S')
+            details = ", ".join(f"{key}={value}" for key, value in entry.items() if key not in ("time", "event"))
+            print(f"{when} - {entry['event']} {details}")
+    else:
+        counts = Counter(entry["event"] for entry in read_events(args.journal, since=since))
+        for event, count in counts.most_common():
+            print(f"{count:>6} {event}")
@@ -0,0 +1,222 @@
+# In-memory stand-in for WSJT-X (and GridTracker's Alerts window) behind the
+# UIBackend interface, so the TX logic can be exercised and timed without a
+# Windows desktop.
+#
+#   wsjtx = FakeWSJTX()
+#   backend = FakeBackend(wsjtx)
+#   wsjtx.select_tx(2)        # operator is now sending a report
+#   wsjtx.finish_qso("K7VAY") # TX turns off and Log QSO pops up
+
+import itertools
+import re
+
+from ui_backend import UIBackend
+from wsjtx_controls import CONTROLS
+
+MAIN_TITLE = "WSJT-X   v2.7.0   by K1JT, G4WJS, K9AN, and IV3NWV"
+PROCESS_ID = 4242
+GRIDTRACKER_PROCESS_ID = 4343
+
+
+class ElementNotAvailable(Exception):
+    """Raised for controls or windows that no longer exist, like a stale UIA element."""
+
+
+class FakeControl:
+    def __init__(self, window, name, title, auto_id, control_type):
+        self.window = window
+        self.name = name
+        self.title = title
+        self.auto_id = auto_id
+        self.control_type = control_type
+
+
+class FakeWindow:
+    def __init__(self, handle, title, controls, process_id=PROCESS_ID):
+        self.handle = handle
+        self.title = title
+        self.process_id = process_id
+        self.controls = {control.name: control for control in controls}
+        self.closed = False
+
+
+class FakeWSJTX:
+    """
+    Models the pieces of WSJT-X the scripts touch: the Enable Tx checkbox, the
+    Tx 1-6 buttons and txrb1-6 radio buttons, the DX Call entry, plus the
+    Log QSO and Alerts windows. Each click is appended to self.clicks.
+    """
+
+    def __init__(self, title=MAIN_TITLE, process_id=PROCESS_ID, first_handle=0x10000):
+        self._handles = itertools.count(first_handle, 0x10)
+        self.process_id = process_id
+        self.windows = {}
+        self.enable_tx = False
+        self.tx_selected = 1
+        self.dx_call = ""
+        self.logged = []
+        self.clicks = []
+        self._failures = {}
+        self.main = self._add_window(title, [
+            FakeControl(None, name, spec.get("title"), spec["auto_id"], spec["control_type"])
+            for name, spec in CONTROLS.items()
+        ])
+
+    def _add_window(self, title, controls, process_id=None):
+        window = FakeWindow(next(self._handles), title, controls, process_id or self.process_id)
+        for control in controls:
+            control.window = window
+        self.windows[window.handle] = window
+        return window
+
+    # -- scripting ----------------------------------------------------------
+
+    def select_tx(self, number):
+        """Checks txrbN the way auto-sequencing does when a QSO progresses."""
+        self.tx_selected = number
+
+    def set_enable_tx(self, enabled):
+        self.enable_tx = enabled
+
+    def set_dx_call(self, call):
+        self.dx_call = call
+
+    def open_log_qso(self, call=""):
+        return self._add_window(f"WSJT-X - Log QSO {call}".strip(), [
+            FakeControl(None, "ok", "OK", "LogQSO.buttonBox.OK", "Button"),
+            FakeControl(None, "cancel", "Cancel", "LogQSO.buttonBox.Cancel", "Button"),
+        ])
+
+    def open_alerts(self):
+        return self._add_window("GridTracker Alerts", [], GRIDTRACKER_PROCESS_ID)
+
+    def finish_qso(self, call=None):
+        """WSJT-X turns Enable Tx off after RR73/73 and asks to log the QSO."""
+        self.enable_tx = False
+        return self.open_log_qso(call or self.dx_call)
+
+    def close_main_window(self):
+        """Simulates WSJT-X exiting, every cached control becomes stale."""
+        self._close(self.main)
+
+    def fail_next(self, control_name, count=1):
+        """Makes the next count operations on a control raise ElementNotAvailable."""
+        self._failures[control_name] = count
+
+    def _close(self, window):
+        window.closed = True
+        self.windows.pop(window.handle, None)
+
+    # -- behaviour --------------------------------------------------------
+
+    def check(self, control):
+        if control.window.closed:
+            raise ElementNotAvailable(f"window {control.window.title!r} is gone")
+        remaining = self._failures.get(control.name, 0)
+        if remaining:
+            self._failures[control.name] = remaining - 1
+            raise ElementNotAvailable(f"control {control.name!r} is not available")
+
+    def toggle_state(self, control):
+        if control.name == "enable_tx":
+            return 1 if self.enable_tx else 0
+        if control.name.startswith("txrb"):
+            return 1 if int(control.name[4:]) == self.tx_selected else 0
+        raise ElementNotAvailable(f"{control.name!r} has no toggle state")
+
+    def press(self, control):
+        self.clicks.append(control.name)
+        if control.name == "enable_tx":
+            self.enable_tx = not self.enable_tx
+        elif control.name.startswith("txb"):
+            self.tx_selected = int(control.name[3:])
+        elif control.name in ("ok", "cancel"):
+            if control.name == "ok":
+                self.logged.append(control.window.title)
+            self._close(control.window)
+
+
+class FakeBackend(UIBackend):
+    """
+    UIBackend over a FakeWSJTX. Counts every call per operation in
+    self.calls, which benchmarks use as a stand-in for UIA round trips.
+    """
+
+    def __init__(self, wsjtx=None):
+        self.wsjtx = wsjtx or FakeWSJTX()
+        self.calls = {}
+
+    def _count(self, operation):
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def find_windows(self, title_re):
+        self._count("find_windows")
+        pattern = re.compile(title_re)
+        return [handle for handle, window in self.wsjtx.windows.items() if pattern.match(window.title)]
+
+    def connect(self, handle):
+        self._count("connect")
+        window = self.wsjtx.windows.get(handle)
+        if window is None:
+            raise ElementNotAvailable(f"no window with handle {handle:#x}")
+        return window
+
+    def find_control(self, window, title=None, auto_id=None, control_type=None):
+        self._count("find_control")
+        if window.closed:
+            raise ElementNotAvailable(f"window {window.title!r} is gone")
+        for control in window.controls.values():
+            if auto_id is not None and control.auto_id != auto_id:
+                continue
+            if title is not None and control.title != title:
+                continue
+            if control_type is not None and control.control_type != control_type:
+                continue
+            return control
+        raise ElementNotAvailable(f"no control matching {title!r}/{auto_id!r} in {window.title!r}")
+
+    def get_toggle_state(self, control):
+        self._count("get_toggle_state")
+        self.wsjtx.check(control)
+        return self.wsjtx.toggle_state(control)
+
+    def get_value(self, control):
+        self._count("get_value")
+        self.wsjtx.check(control)
+        return self.wsjtx.dx_call
+
+    def click(self, control):
+        self._count("click")
+        self.wsjtx.check(control)
+        self.wsjtx.press(control)
+
+    def close(self, window):
+        self._count("close")
+        if window.closed:
+            raise ElementNotAvailable(f"window {window.title!r} is gone")
+        self.wsjtx._close(window)
+
+    def is_stale(self, error):
+        return isinstance(error, ElementNotAvailable)
+
+    def is_alive(self, window):
+        self._count("is_alive")
+        return not window.closed
+
+    def top_level_handles(self):
+        self._count("top_level_handles")
+        return list(self.wsjtx.windows)
+
+    def window_title(self, handle):
+        self._count("window_title")
+        window = self.wsjtx.windows.get(handle)
+        if window is None:
+            raise ElementNotAvailable(f"no window with handle {handle:#x}")
+        return window.title
+
+    def window_process_id(self, handle):
+        self._count("window_process_id")
+        window = self.wsjtx.windows.get(handle)
+        if window is None:
+            raise ElementNotAvailable(f"no window with handle {handle:#x}")
+        return window.process_id
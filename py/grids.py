@@ -0,0 +1,238 @@
+# Maidenhead grids: a worked-grid bitmap and NumPy grid/distance math.
+#
+# A 4-character grid (field + square, "FN42") is one of 18 * 18 * 10 * 10 =
+# 32,400 values, so the grids worked fit a 4 KB bitmap (one overall and one per
+# band) and "new grid?" is a single bit test. WorkedGrids is a LogFollower index
+# and is updated as QSOs are ingested.
+#
+# grid_to_latlon() and distance_bearing() work on whole NumPy arrays, so the
+# grids of the entire log convert in one batch (see best_dx()).
+#
+#   python grids.py --home CM87 --top 10
+#
+# The conversions need NumPy (pip install numpy), the bitmap does not.
+
+import argparse
+import threading
+import time
+
+import adif
+from bands import BAND_NAMES, band_index, record_band
+
+GRID_COUNT = 18 * 18 * 10 * 10
+EARTH_RADIUS_KM = 6371.0
+
+
+def grid_index(grid):
+    """Bit index 0..32399 of the field+square of grid ("FN42", "fn42ab"), None if it is not a grid."""
+    grid = (grid or "").strip().upper()
+    if len(grid) < 4:
+        return None
+    field_lon, field_lat, square_lon, square_lat = (ord(c) for c in grid[:4])
+    field_lon -= 65
+    field_lat -= 65
+    square_lon -= 48
+    square_lat -= 48
+    if not (0 <= field_lon < 18 and 0 <= field_lat < 18 and 0 <= square_lon < 10 and 0 <= square_lat < 10):
+        return None
+    return ((field_lon * 18 + field_lat) * 10 + square_lon) * 10 + square_lat
+
+
+def index_grid(index):
+    """Inverse of grid_index()."""
+    rest, square_lat = divmod(index, 10)
+    rest, square_lon = divmod(rest, 10)
+    field_lon, field_lat = divmod(rest, 18)
+    return f"{chr(65 + field_lon)}{chr(65 + field_lat)}{square_lon}{square_lat}"
+
+
+class GridBitmap:
+    def __init__(self):
+        self.bits = bytearray(GRID_COUNT // 8 + 1)
+        self.count = 0
+
+    def set(self, index):
+        """Sets a bit, returns True if it was not set before."""
+        byte, bit = divmod(index, 8)
+        if self.bits[byte] >> bit & 1:
+            return False
+        self.bits[byte] |= 1 << bit
+        self.count += 1
+        return True
+
+    def test(self, index):
+        byte, bit = divmod(index, 8)
+        return bool(self.bits[byte] >> bit & 1)
+
+    def indexes(self):
+        """Set bit indexes, ascending."""
+        return [byte * 8 + bit for byte, value in enumerate(self.bits) if value for bit in range(8) if value >> bit & 1]
+
+
+class WorkedGrids:
+    """Grids worked overall and per band, as a LogFollower index."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.all = GridBitmap()
+            self.bands = [GridBitmap() for _ in BAND_NAMES]
+
+    def add(self, grid, band=""):
+        """Marks grid worked. Returns True if it is a new grid overall."""
+        index = grid_index(grid)
+        if index is None:
+            return False
+        with self.lock:
+            band_id = band_index(band)
+            if band_id >= 0:
+                self.bands[band_id].set(index)
+            return self.all.set(index)
+
+    def add_records(self, records):
+        for record in records:
+            self.add(record.get("gridsquare", ""), record_band(record))
+
+    def is_worked(self, grid, band=None):
+        index = grid_index(grid)
+        if index is None:
+            return False
+        if band is None:
+            return self.all.test(index)
+        band_id = band_index(band)
+        return band_id >= 0 and self.bands[band_id].test(index)
+
+    def lookup(self, grid):
+        """JSON-ready answer: {"grid", "worked", "bands"}."""
+        index = grid_index(grid)
+        if index is None:
+            return {"grid": (grid or "").upper(), "worked": False, "error": "not a grid"}
+        return {
+            "grid": index_grid(index),
+            "worked": self.all.test(index),
+            "bands": [name for name, bitmap in zip(BAND_NAMES, self.bands) if bitmap.test(index)],
+        }
+
+    def __len__(self):
+        return self.all.count
+
+
+def grid_to_latlon(grids):
+    """
+    Centers of Maidenhead grids, vectorized.
+
+    Args:
+        grids: Sequence or array of 2, 4 or 6 character grids; anything else
+            gives NaN
+
+    Returns:
+        (lat, lon) float arrays in degrees
+    """
+    import numpy as np
+
+    # "U6" stores each character as a UCS-4 code point, view them as a (n, 6) array
+    codes = np.ascontiguousarray(np.asarray(grids, dtype="U6")).view(np.uint32).reshape(-1, 6)
+    lengths = np.count_nonzero(codes, axis=1)
+    chars = np.where((codes >= 97) & (codes <= 122), codes - 32, codes).astype(np.float64)
+    field_lon, field_lat = chars[:, 0] - 65, chars[:, 1] - 65
+    square_lon, square_lat = chars[:, 2] - 48, chars[:, 3] - 48
+    sub_lon, sub_lat = chars[:, 4] - 65, chars[:, 5] - 65
+
+    has_square = lengths >= 4
+    has_sub = lengths >= 6
+    valid = ((lengths == 2) | (lengths == 4) | (lengths == 6)) \
+        & (field_lon >= 0) & (field_lon < 18) & (field_lat >= 0) & (field_lat < 18) \
+        & (~has_square | ((square_lon >= 0) & (square_lon < 10) & (square_lat >= 0) & (square_lat < 10))) \
+        & (~has_sub | ((sub_lon >= 0) & (sub_lon < 24) & (sub_lat >= 0) & (sub_lat < 24)))
+
+    lon = field_lon * 20 - 180
+    lat = field_lat * 10 - 90
+    lon += np.where(has_square, square_lon * 2, 0)
+    lat += np.where(has_square, square_lat, 0)
+    lon += np.where(has_sub, sub_lon * (2 / 24), 0)
+    lat += np.where(has_sub, sub_lat * (1 / 24), 0)
+    # Center of the smallest cell given
+    lon += np.where(has_sub, 1 / 24, np.where(has_square, 1.0, 10.0))
+    lat += np.where(has_sub, 0.5 / 24, np.where(has_square, 0.5, 5.0))
+    return np.where(valid, lat, np.nan), np.where(valid, lon, np.nan)
+
+
+def distance_bearing(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance and initial bearing, vectorized over any of the
+    arguments (degrees in).
+
+    Returns:
+        (km, bearing in degrees from north) arrays
+    """
+    import numpy as np
+
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    dlon = lon2 - lon1
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    bearing = np.degrees(np.arctan2(np.sin(dlon) * np.cos(lat2),
+                                    np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)))
+    return km, bearing % 360
+
+
+def best_dx(store, home_grid, top=10):
+    """
+    The longest-distance QSOs of a QsoStore.
+
+    Only the distinct grids of the log are converted; every QSO then picks
+    its distance by grid id.
+
+    Returns:
+        List of {"call", "grid", "km", "bearing", "time"}, farthest first
+    """
+    import numpy as np
+
+    lat, lon = grid_to_latlon(store.grids or [""])
+    home_lat, home_lon = grid_to_latlon([home_grid])
+    km, bearing = distance_bearing(home_lat[0], home_lon[0], lat, lon)
+    qso_km = km[store.columns["grid"]]
+    order = np.argsort(np.where(np.isnan(qso_km), np.inf, -qso_km), kind="stable")
+    results = []
+    seen = set()
+    for row in order.tolist():
+        if np.isnan(qso_km[row]) or len(results) >= top:
+            break
+        call = store.calls[store.columns["call"][row]]
+        if call in seen:
+            continue
+        seen.add(call)
+        grid_id = store.columns["grid"][row]
+        results.append({"call": call, "grid": store.grids[grid_id], "km": round(float(km[grid_id])),
+                        "bearing": round(float(bearing[grid_id])), "time": int(store.columns["time"][row])})
+    return results
+
+
+if __name__ == "__main__":
+    from qso_store import DEFAULT_STORE_DIR, QsoStore
+
+    parser = argparse.ArgumentParser(description="Grids worked and best DX from the WSJT-X ADI log")
+    parser.add_argument("--home", required=True, help="Your grid, e.g. CM87")
+    parser.add_argument("--adi", default=adif.DEFAULT_ADI_PATH, help="WSJT-X ADI log (default: $ADI_FILE_PATH)")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="Directory of the QSO store columns")
+    parser.add_argument("--top", type=int, default=10, help="How many best DX QSOs to list")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    worked = WorkedGrids()
+    worked.add_records(adif.read_records(args.adi))
+    print(f"{len(worked)} grids worked ({time.perf_counter() - started:.3f}s)")
+    for name, bitmap in zip(BAND_NAMES, worked.bands):
+        if bitmap.count:
+            print(f"  {name}: {bitmap.count}")
+
+    store = QsoStore(args.adi, args.store)
+    store.refresh()
+    started = time.perf_counter()
+    farthest = best_dx(store, args.home, args.top)
+    print(f"Best DX from {args.home.upper()} ({(time.perf_counter() - started) * 1000:.1f} ms):")
+    for entry in farthest:
+        print(f"  {entry['call']:<10} {entry['grid']:<6} {entry['km']:>6} km  {entry['bearing']:>3} deg")
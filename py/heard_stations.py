@@ -0,0 +1,359 @@
+# Rolling table of the stations WSJT-X hears, fed by its UDP Decode messages.
+#
+# Decodes land in a fixed-size NumPy ring buffer (call id, SNR, DT, audio
+# offset, band, time, worked flags), so memory stays constant however long it
+# runs and however busy the band is. Incoming decodes are staged in a short
+# Python list and written to the ring in bulk; per-slot statistics (decode
+# counts, mean/best SNR per call, band activity) are computed with vectorized
+# NumPy operations over the slot's rows. Each decode is marked with the
+# worked-before status of its call from the ADI log.
+#
+#   python heard_stations.py --adi wsjtx_log.adi
+#
+# Needs NumPy (pip install numpy).
+
+import argparse
+import functools
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import adif
+import wsjtx_udp
+from adif_watch import AdiWatcher
+from bands import BAND_NAMES, UNKNOWN_BAND, band_for_freq, band_index
+from cycle_scheduler import PERIODS
+from dxcc import DEFAULT_CTY_PATH, DxccIndex, DxccResolver
+from worked_log import LogFollower
+from worked_matrix import WorkedMatrix
+
+DEFAULT_CAPACITY = 65536  # Decodes kept; a busy FT8 band is ~3000 per 15 minutes
+DEFAULT_PERIOD = PERIODS["FT8"]
+MAX_CALLS_FACTOR = 4  # Interned calls are compacted when they exceed capacity * this
+
+# Mode characters of the Decode message -> T/R period
+DECODE_MODE_PERIODS = {
+    "~": PERIODS["FT8"],
+    "+": PERIODS["FT4"],
+}
+
+DTYPE = np.dtype([
+    ("call", np.int32),        # index into HeardTable.calls
+    ("snr", np.int16),
+    ("dt", np.float32),
+    ("df", np.uint16),         # audio offset in Hz
+    ("band", np.int8),         # bands.BAND_INDEX, UNKNOWN_BAND if the dial was not known
+    ("time", np.float64),      # UTC epoch seconds of the decode
+    ("slot", np.float64),      # start of the T/R period the decode belongs to
+    ("worked", np.bool_),      # call is in the log
+    ("worked_band", np.bool_), # call is in the log on this band
+])
+
+_CALL = re.compile(r"^(?=.*\d)(?=.*[A-Z])[A-Z0-9/]{3,13}$")
+_CQ_WORDS = ("CQ", "QRZ")
+
+
+def sender_call(message):
+    """
+    The transmitting station of a decoded FT8/FT4 message, or None:
+    "CQ K1ABC FN42", "CQ DX K1ABC FN42" and "W9XYZ <K1ABC> -12" all give K1ABC.
+    """
+    tokens = message.upper().split()
+    if len(tokens) < 2:
+        return None
+    if tokens[0] in _CQ_WORDS:
+        # "CQ DX K1ABC FN42", "CQ POTA K1ABC": skip the directed-CQ word
+        candidate = tokens[1]
+        if not _CALL.match(candidate.strip("<>")) and len(tokens) >= 3:
+            candidate = tokens[2]
+    else:
+        candidate = tokens[1]
+    candidate = candidate.strip("<>")
+    return candidate if _CALL.match(candidate) else None
+
+
+def decode_time(milliseconds, now=None):
+    """UTC epoch seconds for a QTime (ms since UTC midnight) of a decode made just now."""
+    now = time.time() if now is None else now
+    midnight = now - now % 86400
+    when = midnight + milliseconds / 1000.0
+    # A decode stamped 23:59:45 that arrives after midnight belongs to yesterday
+    if when > now + 3600:
+        when -= 86400
+    return when
+
+
+class HeardTable:
+    """
+    Args:
+        capacity: Number of decodes kept in the ring buffer
+        worked: Optional WorkedMatrix for the worked-before flags; its
+            lookups take its own lock, so a log watcher may update it meanwhile
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, worked=None):
+        self.capacity = capacity
+        self.worked = worked
+        self.rows = np.zeros(capacity, dtype=DTYPE)
+        self.head = 0     # next row to write
+        self.size = 0     # valid rows
+        self.total = 0    # decodes ever ingested
+        self.calls = []
+        self.call_ids = {}
+        self.lock = threading.Lock()
+        self._pending = []
+        self.last_slot = None
+
+    # -- ingest -----------------------------------------------------------------
+
+    def _call_id(self, call):
+        call_id = self.call_ids.get(call)
+        if call_id is None:
+            call_id = self.call_ids[call] = len(self.calls)
+            self.calls.append(call)
+        return call_id
+
+    def add(self, call, snr, dt, df, band, when, period=DEFAULT_PERIOD):
+        """Stages one decode; it reaches the ring on the next flush()."""
+        slot = when - when % period
+        with self.lock:
+            self._pending.append((call, snr, dt, df, band, when, slot))
+            self.last_slot = slot
+
+    def add_decode(self, message, dial_frequency=0, now=None):
+        """
+        Stages a parsed UDP Decode message. Returns the sender call, or None
+        for messages without one (or replayed, off-air decodes).
+        """
+        if message.get("off_air"):
+            return None
+        call = sender_call(message.get("message", ""))
+        if call is None or message.get("time") is None:
+            return None
+        band = band_for_freq(dial_frequency / 1e6) if dial_frequency else ""
+        period = DECODE_MODE_PERIODS.get(message.get("mode", ""), DEFAULT_PERIOD)
+        self.add(call, message.get("snr", 0), message.get("delta_time", 0.0), message.get("delta_frequency", 0),
+                 band, decode_time(message["time"], now), period)
+        return call
+
+    def flush(self):
+        """Writes the staged decodes into the ring in one vectorized copy."""
+        with self.lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+
+            batch = np.zeros(len(pending), dtype=DTYPE)
+            calls, snrs, dts, dfs, bands, times, slots = zip(*pending)
+            batch["call"] = [self._call_id(call) for call in calls]
+            batch["snr"] = snrs
+            batch["dt"] = dts
+            batch["df"] = np.minimum(dfs, np.iinfo(np.uint16).max)
+            batch["band"] = [band_index(band) for band in bands]
+            batch["time"] = times
+            batch["slot"] = slots
+            if self.worked is not None:
+                batch["worked"] = [self.worked.is_worked(call) for call in calls]
+                batch["worked_band"] = [bool(band) and self.worked.is_worked(call, band) for call, band in zip(calls, bands)]
+
+            # Only the newest capacity rows can survive
+            batch = batch[-self.capacity:]
+            count = len(batch)
+            first = min(count, self.capacity - self.head)
+            self.rows[self.head:self.head + first] = batch[:first]
+            self.rows[:count - first] = batch[first:]
+            self.head = (self.head + count) % self.capacity
+            self.size = min(self.size + count, self.capacity)
+            self.total += len(pending)
+            if len(self.calls) > self.capacity * MAX_CALLS_FACTOR:
+                self._compact_calls()
+            return len(pending)
+
+    def _compact_calls(self):
+        """Drops interned calls that no longer appear in the ring."""
+        valid = self.rows["call"][:self.size] if self.size < self.capacity else self.rows["call"]
+        live, remapped = np.unique(valid, return_inverse=True)
+        self.calls = [self.calls[call_id] for call_id in live]
+        self.call_ids = {call: call_id for call_id, call in enumerate(self.calls)}
+        if self.size < self.capacity:
+            self.rows["call"][:self.size] = remapped
+        else:
+            self.rows["call"] = remapped
+
+    def refresh_worked(self):
+        """Re-marks every row, e.g. after new QSOs were logged."""
+        if self.worked is None:
+            return
+        with self.lock:
+            view = self.rows[:self.size]
+            worked_calls = np.array([self.worked.is_worked(call) for call in self.calls] or [False])
+            view["worked"] = worked_calls[view["call"]]
+            # One lookup per distinct (call, band) pair, not per row
+            keys = view["call"].astype(np.int64) * 256 + (view["band"].astype(np.int64) + 1)
+            pairs, inverse = np.unique(keys, return_inverse=True)
+            worked_pairs = np.array([
+                band_id != UNKNOWN_BAND and self.worked.is_worked(self.calls[call_id], BAND_NAMES[band_id])
+                for call_id, band_id in zip((pairs // 256).tolist(), (pairs % 256 - 1).tolist())
+            ] or [False])
+            view["worked_band"] = worked_pairs[inverse]
+
+    # -- queries ----------------------------------------------------------------
+
+    def slots(self):
+        """Distinct slot start times present in the ring, oldest first."""
+        self.flush()
+        with self.lock:
+            return np.unique(self.rows["slot"][:self.size]).tolist()
+
+    def slot_stats(self, slot):
+        """Aggregates for one T/R period (a value from slots())."""
+        self.flush()
+        with self.lock:
+            view = self.rows[:self.size]
+            return self._aggregate(view[view["slot"] == slot], slot)
+
+    def window_stats(self, seconds, now=None):
+        """Aggregates over the decodes of the last seconds."""
+        self.flush()
+        now = time.time() if now is None else now
+        with self.lock:
+            view = self.rows[:self.size]
+            return self._aggregate(view[view["time"] >= now - seconds], None)
+
+    def _aggregate(self, rows, slot):
+        stats = {"slot": slot, "decodes": int(len(rows)), "calls": [], "bands": {}}
+        if not len(rows):
+            return stats
+
+        call_ids, inverse, counts = np.unique(rows["call"], return_inverse=True, return_counts=True)
+        snr = rows["snr"].astype(np.float64)
+        mean_snr = np.bincount(inverse, weights=snr) / counts
+        mean_dt = np.bincount(inverse, weights=rows["dt"].astype(np.float64)) / counts
+        best_snr = np.full(len(call_ids), -np.inf)
+        np.maximum.at(best_snr, inverse, snr)
+        last_df = np.zeros(len(call_ids), dtype=np.int64)
+        last_df[inverse] = rows["df"]  # later rows win
+        worked = np.zeros(len(call_ids), dtype=bool)
+        worked[inverse] = rows["worked"]
+        worked_band = np.zeros(len(call_ids), dtype=bool)
+        np.logical_or.at(worked_band, inverse, rows["worked_band"])
+
+        order = np.lexsort((-counts, -best_snr))
+        stats["calls"] = [
+            {
+                "call": self.calls[call_ids[i]],
+                "decodes": int(counts[i]),
+                "mean_snr": round(float(mean_snr[i]), 1),
+                "best_snr": int(best_snr[i]),
+                "mean_dt": round(float(mean_dt[i]), 2),
+                "df": int(last_df[i]),
+                "worked": bool(worked[i]),
+                "worked_band": bool(worked_band[i]),
+            }
+            for i in order
+        ]
+
+        bands = rows["band"]
+        known = bands[bands != UNKNOWN_BAND].astype(np.int64)
+        activity = np.bincount(known, minlength=len(BAND_NAMES))
+        stats["bands"] = {BAND_NAMES[i]: int(activity[i]) for i in np.flatnonzero(activity)}
+        stats["new_calls"] = int(np.count_nonzero(~worked))
+        return stats
+
+    def memory_bytes(self):
+        return self.rows.nbytes
+
+
+class HeardListener:
+    """
+    Feeds a HeardTable from wsjtx_udp.listen() and reports each T/R period
+    once the next one has started.
+
+    Args:
+        table: HeardTable to fill
+        on_slot: on_slot(stats) for every completed slot, or None
+        follower: Optional LogFollower refreshed once per slot, so QSOs logged
+            meanwhile show up as worked
+    """
+
+    def __init__(self, table, on_slot=None, follower=None):
+        self.table = table
+        self.on_slot = on_slot
+        self.follower = follower
+        self.dial_frequency = {}  # client id -> Hz, from Status messages
+        self.current_slot = None
+
+    def on_message(self, message, address=None):
+        if message["type"] == wsjtx_udp.STATUS and "dial_frequency" in message:
+            self.dial_frequency[message["id"]] = message["dial_frequency"]
+        elif message["type"] == wsjtx_udp.DECODE:
+            if self.table.add_decode(message, self.dial_frequency.get(message["id"], 0)) is not None:
+                self._check_slot(self.table.last_slot)
+
+    def _check_slot(self, slot):
+        # WSJT-X stamps decodes with the start of their period, so the first
+        # decode of a newer period means the previous one is complete
+        if self.current_slot is None:
+            self.current_slot = slot
+            return
+        if slot <= self.current_slot:
+            return
+        finished, self.current_slot = self.current_slot, slot
+        if self.follower is not None and self.follower.refresh():
+            self.table.refresh_worked()
+        if self.on_slot is not None:
+            self.on_slot(self.table.slot_stats(finished))
+
+
+def print_slot(stats, dxcc=None):
+    """Prints a slot_stats() result; dxcc is an optional DxccIndex for the entity column."""
+    started = datetime.fromtimestamp(stats["slot"], timezone.utc).strftime('%H:%M:%S')
+    bands = ", ".join(f"{band} {count}" for band, count in stats["bands"].items())
+    print(f"{started} - {stats['decodes']} decodes, {len(stats['calls'])} calls, "
+          f"{stats.get('new_calls', 0)} not worked before{f' ({bands})' if bands else ''}")
+    for entry in stats["calls"][:10]:
+        marker = " " if entry["worked"] else "*"
+        entity = ""
+        if dxcc is not None:
+            resolved = dxcc.lookup(entry["call"])
+            if resolved["dxcc"] is not None:
+                entity = f"  {resolved['dxcc']['entity']}{' (new)' if resolved['new_entity'] else ''}"
+        print(f"  {marker} {entry['call']:<10} {entry['best_snr']:>4} dB  x{entry['decodes']}  DT {entry['mean_dt']:+.1f}  {entry['df']} Hz{entity}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling table of the stations WSJT-X decodes, with worked-before status")
+    parser.add_argument("--host", default=wsjtx_udp.DEFAULT_HOST, help="UDP address WSJT-X reports to (multicast groups are joined)")
+    parser.add_argument("--port", type=int, default=wsjtx_udp.DEFAULT_PORT, help="UDP port WSJT-X reports to")
+    parser.add_argument("--adi", default=adif.DEFAULT_ADI_PATH, help="WSJT-X ADI log for the worked-before status, empty to skip")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="Number of decodes kept")
+    parser.add_argument("--cty", default=DEFAULT_CTY_PATH, help="cty.dat for the DXCC entity column, skipped if missing")
+    args = parser.parse_args()
+
+    dxcc = None
+    if os.path.exists(args.cty):
+        dxcc = DxccIndex(DxccResolver.load(args.cty))
+    follower = None
+    matrix = None
+    if args.adi:
+        matrix = WorkedMatrix()
+        follower = LogFollower(args.adi, [matrix] + ([dxcc] if dxcc is not None else []))
+        follower.refresh()
+    table = HeardTable(args.capacity, matrix)
+    listener = HeardListener(table, functools.partial(print_slot, dxcc=dxcc))
+    if follower is not None:
+        def log_changed():
+            added = follower.refresh()
+            if added:
+                table.refresh_worked()
+            return added
+        AdiWatcher(args.adi, log_changed).start()
+    print(f"Listening for WSJT-X decodes on {args.host}:{args.port} ('*' = not worked before)...")
+    try:
+        wsjtx_udp.listen(listener.on_message, host=args.host, port=args.port)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,144 @@
+# Runs one worker thread per WSJT-X instance, so a station with several rigs
+# (each WSJT-X started with --rig-name) is handled by a single process.
+#
+# The manager lists the WSJT-X windows every few seconds, starts a worker for
+# each window it has not seen and forgets workers whose window went away, so a
+# restarted instance gets a fresh worker. Every worker builds its own backend
+# (UI Automation objects should not be shared between threads) and its own
+# state, e.g. a TxWatchdog with independent TX6 and report-mode timers.
+
+import os
+import re
+import threading
+import time
+
+from ui_backend import WSJTX_TITLE_PATTERN
+
+DEFAULT_INSTANCE = "default"  # Instance name of a WSJT-X started without --rig-name
+SCAN_SECONDS = 5  # How often to look for WSJT-X instances that appeared or went away
+
+# "WSJT-X - IC-7300   v2.6.1   by K1JT, ..." -> "IC-7300"
+_RIG_NAME = re.compile(r"WSJT-X\s+-\s+(.+?)\s+v\d")
+# UDP client id of a rig: "WSJT-X - IC-7300" -> "IC-7300"
+_UDP_RIG_PREFIX = re.compile(r"WSJT-X\s*-\s*")
+_UNSAFE_FILE_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def instance_name(title):
+    """Rig name from a WSJT-X main window title, DEFAULT_INSTANCE without one."""
+    match = _RIG_NAME.match(title)
+    return match.group(1).strip() if match else DEFAULT_INSTANCE
+
+
+def instance_name_from_udp_id(client_id):
+    """
+    Instance name from a UDP client id, the same one instance_name() gives for
+    the window title: "WSJT-X - IC-7300" -> "IC-7300", plain "WSJT-X" (no
+    --rig-name) -> DEFAULT_INSTANCE.
+    """
+    client_id = (client_id or "").strip()
+    if client_id in ("", "WSJT-X"):
+        return DEFAULT_INSTANCE
+    match = _UDP_RIG_PREFIX.match(client_id)
+    name = client_id[match.end():].strip() if match else client_id
+    return name or DEFAULT_INSTANCE
+
+
+def instance_path(path, name):
+    """
+    Per-instance variant of an output file: dx_input_log.txt stays as is for
+    the default instance and becomes dx_input_log_IC-7300.txt for a rig.
+    """
+    if name == DEFAULT_INSTANCE:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}_{_UNSAFE_FILE_CHARACTERS.sub('_', name)}{extension}"
+
+
+class Instance:
+    """What a worker gets handed: the window it owns and a way to be stopped."""
+
+    def __init__(self, name, handle, title, backend, stop_event):
+        self.name = name
+        self.handle = handle
+        self.title = title
+        self.backend = backend
+        self.stop_event = stop_event
+
+    def connect(self):
+        return self.backend.connect(self.handle)
+
+
+class InstanceManager:
+    """
+    Args:
+        backend_factory: Returns a new UIBackend; called once for discovery
+            and once inside every worker thread
+        run_instance: run_instance(instance) does the per-instance work and
+            returns when the window is gone or instance.stop_event is set
+        title_re: Title pattern of the WSJT-X main windows
+        scan_seconds: How often to look for new or vanished instances
+    """
+
+    def __init__(self, backend_factory, run_instance, title_re=WSJTX_TITLE_PATTERN, scan_seconds=SCAN_SECONDS, log=print):
+        self.backend_factory = backend_factory
+        self.run_instance = run_instance
+        self.title_re = title_re
+        self.scan_seconds = scan_seconds
+        self.log = log
+        self.stop_event = threading.Event()
+        self.workers = {}  # window handle -> (Instance, Thread)
+        self._backend = None
+
+    def _worker(self, handle, title):
+        name = instance_name(title)
+        backend = self.backend_factory()
+        backend.thread_started()
+        try:
+            self.run_instance(Instance(name, handle, title, backend, self.stop_event))
+        except Exception as e:
+            self.log(f"Instance {name} stopped after an error: {e}")
+        finally:
+            backend.thread_stopped()
+
+    def scan(self):
+        """Starts workers for new WSJT-X windows and drops the finished ones."""
+        if self._backend is None:
+            self._backend = self.backend_factory()
+
+        for handle, (instance, thread) in list(self.workers.items()):
+            if not thread.is_alive():
+                self.log(f"Instance {instance.name} is gone.")
+                del self.workers[handle]
+
+        for handle in self._backend.find_windows(self.title_re):
+            if handle in self.workers:
+                continue
+            title = self._backend.window_title(handle)
+            name = instance_name(title)
+            if any(instance.name == name for instance, _ in self.workers.values()):
+                self.log(f"Ignoring a second WSJT-X window for instance {name}.")
+                continue
+            instance = Instance(name, handle, title, None, self.stop_event)
+            thread = threading.Thread(target=self._worker, args=(handle, title), name=name, daemon=True)
+            self.workers[handle] = (instance, thread)
+            self.log(f"Found WSJT-X instance {name}, starting its worker.")
+            thread.start()
+
+    def run(self):
+        """Scans until stop() is called (or Ctrl+C)."""
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self.scan()
+                except Exception as e:
+                    self.log(f"Error while looking for WSJT-X instances: {e}")
+                self.stop_event.wait(self.scan_seconds)
+        finally:
+            self.stop()
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for _, thread in list(self.workers.values()):
+            thread.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,283 @@
+# Columnar QSO store built from the WSJT-X ADI log, for log analytics.
+#
+# Every QSO is a row across NumPy columns (time, call, band, mode, frequency,
+# sent/received report, grid). Calls, modes and grids are dictionary-encoded:
+# the column holds an integer id into a list of distinct values. The columns are
+# saved as .npy files and memory-mapped on load, so opening a large log is
+# instant and queries like QSOs per band or unique calls in a date range are
+# vectorized operations instead of re-parsing ADIF text. Like worked_index.py it
+# remembers the ADI offset it was built from and only ingests the new QSOs.
+#
+#   python qso_store.py --from 20240101 --to 20241231
+#
+# Needs NumPy (pip install numpy).
+
+import argparse
+import calendar
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+import adif
+from bands import BAND_NAMES, UNKNOWN_BAND, band_index, record_band
+
+DEFAULT_STORE_DIR = "qso_store"
+META_FILE = "meta.json"
+NO_REPORT = np.iinfo(np.int16).min  # rst_sent/rst_rcvd of a QSO without a report
+
+COLUMNS = {
+    "time": np.int64,      # UTC epoch seconds of QSO_DATE + TIME_ON
+    "call": np.int32,      # index into QsoStore.calls
+    "band": np.int8,       # bands.BAND_INDEX, UNKNOWN_BAND if neither BAND nor FREQ is known
+    "mode": np.int16,      # index into QsoStore.modes
+    "freq": np.float64,    # MHz, NaN if not logged
+    "rst_sent": np.int16,  # dB for FT8/FT4, NO_REPORT if missing
+    "rst_rcvd": np.int16,
+    "grid": np.int32,      # index into QsoStore.grids, "" is a valid entry
+}
+
+# Dictionary-encoded columns -> file with their distinct values
+DICTIONARIES = ("calls", "modes", "grids")
+
+
+def qso_time(qso_date, time_on):
+    """UTC epoch seconds for ADIF QSO_DATE (YYYYMMDD) and TIME_ON (HHMM or HHMMSS), 0 if unparsable."""
+    try:
+        time_on = (time_on or "").ljust(6, "0")
+        return calendar.timegm((int(qso_date[0:4]), int(qso_date[4:6]), int(qso_date[6:8]),
+                                int(time_on[0:2]), int(time_on[2:4]), int(time_on[4:6])))
+    except (ValueError, TypeError):
+        return 0
+
+
+def parse_date(value):
+    """
+    Epoch seconds for a range bound.
+
+    Args:
+        value: "YYYYMMDD", "YYYYMMDDHHMM" or "YYYYMMDDHHMMSS" (UTC); an int or
+            float is already epoch seconds and None is an open bound, both are
+            returned unchanged
+
+    Raises:
+        ValueError: For any other string
+    """
+    if value is None or isinstance(value, (int, float, np.integer, np.floating)):
+        return value
+    text = str(value).strip()
+    formats = {8: "%Y%m%d", 12: "%Y%m%d%H%M", 14: "%Y%m%d%H%M%S"}
+    try:
+        if not text.isdigit():
+            raise ValueError
+        return calendar.timegm(datetime.strptime(text, formats[len(text)]).timetuple())
+    except (KeyError, ValueError):
+        raise ValueError(f"not a YYYYMMDD[HHMM[SS]] date: {value!r}") from None
+
+
+def parse_report(value):
+    """ADIF RST_SENT/RST_RCVD as an integer ("-12", "+05", "599"), NO_REPORT if missing."""
+    try:
+        return int(value.strip())
+    except (ValueError, AttributeError):
+        return NO_REPORT
+
+
+def parse_freq(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return float("nan")
+
+
+class QsoStore:
+    """
+    Args:
+        adi_path: WSJT-X ADI log to build the store from
+        store_dir: Directory holding the .npy columns, created on first save
+    """
+
+    def __init__(self, adi_path=adif.DEFAULT_ADI_PATH, store_dir=DEFAULT_STORE_DIR):
+        self.adi_path = adi_path
+        self.store_dir = store_dir
+        self._clear()
+
+        # Warm start, same rules as WorkedIndex: resume from the saved offset
+        # unless the store was built from another file
+        meta = self._load()
+        offset = 0
+        identity = None
+        if meta.get("adi_path") == adi_path:
+            offset = int(meta.get("offset", 0))
+            identity = meta.get("identity")
+        elif meta:
+            self._clear()
+        self.reader = adif.AdifTailReader(adi_path, offset, identity)
+
+    def _clear(self):
+        self.columns = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self.calls, self.modes, self.grids = [], [], []
+        self.call_ids, self.mode_ids, self.grid_ids = {}, {}, {}
+
+    # -- persistence --------------------------------------------------------------
+
+    def _path(self, name):
+        return os.path.join(self.store_dir, name + ".npy")
+
+    def _load(self):
+        """Memory-maps the saved columns. Returns the saved meta, {} if there is no usable store."""
+        try:
+            with open(os.path.join(self.store_dir, META_FILE), "r") as file:
+                meta = json.load(file)
+            columns = {name: np.load(self._path(name), mmap_mode="r") for name in COLUMNS}
+            dictionaries = {name: np.load(self._path(name)).tolist() for name in DICTIONARIES}
+        except (OSError, ValueError):
+            return {}
+        if any(len(column) != meta.get("count") for column in columns.values()):
+            return {}
+        self.columns = columns
+        self.calls, self.modes, self.grids = (dictionaries[name] for name in DICTIONARIES)
+        self.call_ids = {call: index for index, call in enumerate(self.calls)}
+        self.mode_ids = {mode: index for index, mode in enumerate(self.modes)}
+        self.grid_ids = {grid: index for index, grid in enumerate(self.grids)}
+        return meta
+
+    def save(self):
+        """Writes every column and the meta file (temp file + rename each), then maps them again."""
+        os.makedirs(self.store_dir, exist_ok=True)
+        # Bring the columns into memory first: a mapped file cannot be replaced on Windows
+        self.columns = {name: np.array(column) for name, column in self.columns.items()}
+        arrays = dict(self.columns)
+        arrays["calls"] = np.array(self.calls, dtype=str)
+        arrays["modes"] = np.array(self.modes, dtype=str)
+        arrays["grids"] = np.array(self.grids, dtype=str)
+        for name, array in arrays.items():
+            temp_path = self._path(name) + ".tmp"
+            with open(temp_path, "wb") as file:
+                np.save(file, array)
+            os.replace(temp_path, self._path(name))
+
+        meta_path = os.path.join(self.store_dir, META_FILE)
+        with open(meta_path + ".tmp", "w") as file:
+            json.dump({"adi_path": self.adi_path, "offset": self.reader.offset,
+                       "identity": self.reader.identity, "count": len(self)}, file)
+        os.replace(meta_path + ".tmp", meta_path)
+        self._load()
+
+    # -- ingest -----------------------------------------------------------------
+
+    @staticmethod
+    def _encode(value, values, ids):
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    def add_records(self, records):
+        """Appends ADIF records as rows. Returns how many had a call."""
+        records = [record for record in records if record.get("call", "").strip()]
+        if not records:
+            return 0
+        batch = {
+            "time": [qso_time(record.get("qso_date", ""), record.get("time_on", "")) for record in records],
+            "call": [self._encode(record["call"].strip().upper(), self.calls, self.call_ids) for record in records],
+            "band": [band_index(record_band(record)) for record in records],
+            "mode": [self._encode(adif.qso_mode(record), self.modes, self.mode_ids) for record in records],
+            "freq": [parse_freq(record.get("freq")) for record in records],
+            "rst_sent": [parse_report(record.get("rst_sent")) for record in records],
+            "rst_rcvd": [parse_report(record.get("rst_rcvd")) for record in records],
+            "grid": [self._encode(record.get("gridsquare", "").strip().upper(), self.grids, self.grid_ids) for record in records],
+        }
+        self.columns = {
+            name: np.concatenate([column, np.array(batch[name], dtype=COLUMNS[name])])
+            for name, column in self.columns.items()
+        }
+        return len(records)
+
+    def refresh(self):
+        """
+        Ingests the QSOs appended to the log since the last refresh (or the
+        whole log if it was replaced) and saves the store if anything changed.
+        Returns the number of QSOs added.
+        """
+        records, restarted = self.reader.read_new()
+        if restarted:
+            self._clear()
+        if not records and not restarted:
+            return 0
+        added = self.add_records(records)
+        self.save()
+        return added
+
+    # -- queries ----------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.columns["time"])
+
+    def mask(self, start=None, end=None):
+        """Boolean row mask for start <= time < end (bounds as for parse_date(), None is open)."""
+        times = self.columns["time"]
+        selected = np.ones(len(times), dtype=bool)
+        start, end = parse_date(start), parse_date(end)
+        if start is not None:
+            selected &= times >= start
+        if end is not None:
+            selected &= times < end
+        return selected
+
+    def qsos_per_hour(self, start=None, end=None):
+        """QSO count per UTC hour of day, a list of 24."""
+        hours = self.columns["time"][self.mask(start, end)] // 3600 % 24
+        return np.bincount(hours, minlength=24).tolist()
+
+    def qsos_per_band(self, start=None, end=None):
+        """{band: count}, in band plan order; QSOs of unknown band are under ""."""
+        bands = self.columns["band"][self.mask(start, end)].astype(np.int64) - UNKNOWN_BAND
+        counts = np.bincount(bands, minlength=len(BAND_NAMES) + 1)
+        names = [""] + BAND_NAMES
+        return {names[index]: int(count) for index, count in enumerate(counts) if count}
+
+    def qsos_per_mode(self, start=None, end=None):
+        """{mode: count}, most used first."""
+        counts = np.bincount(self.columns["mode"][self.mask(start, end)], minlength=len(self.modes))
+        order = np.argsort(-counts, kind="stable")
+        return {self.modes[index]: int(counts[index]) for index in order if counts[index]}
+
+    def unique_calls(self, start=None, end=None):
+        """Sorted distinct calls worked in the range."""
+        call_ids = np.unique(self.columns["call"][self.mask(start, end)])
+        return sorted(self.calls[call_id] for call_id in call_ids.tolist())
+
+    def unique_grids(self, start=None, end=None):
+        """Sorted distinct non-empty grids worked in the range."""
+        grid_ids = np.unique(self.columns["grid"][self.mask(start, end)])
+        return sorted(grid for grid in (self.grids[grid_id] for grid_id in grid_ids.tolist()) if grid)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build/refresh the columnar QSO store and print log statistics")
+    parser.add_argument("--adi", default=adif.DEFAULT_ADI_PATH, help="WSJT-X ADI log (default: $ADI_FILE_PATH)")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="Directory of the .npy columns")
+    parser.add_argument("--from", dest="start", type=parse_date, help="First day, YYYYMMDD")
+    parser.add_argument("--to", dest="end", type=parse_date, help="Day after the last one, YYYYMMDD")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = QsoStore(args.adi, args.store)
+    added = store.refresh()
+    print(f"Store has {len(store)} QSOs ({added} new) after {time.perf_counter() - started:.3f}s")
+
+    started = time.perf_counter()
+    per_band = store.qsos_per_band(args.start, args.end)
+    per_mode = store.qsos_per_mode(args.start, args.end)
+    per_hour = store.qsos_per_hour(args.start, args.end)
+    calls = store.unique_calls(args.start, args.end)
+    grids = store.unique_grids(args.start, args.end)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{sum(per_band.values())} QSOs, {len(calls)} unique calls, {len(grids)} grids ({elapsed_ms:.1f} ms)")
+    print("Bands: " + ", ".join(f"{band or '?'} {count}" for band, count in per_band.items()))
+    print("Modes: " + ", ".join(f"{mode or '?'} {count}" for mode, count in per_mode.items()))
+    print("Hours: " + " ".join(f"{hour:02d}:{count}" for hour, count in enumerate(per_hour) if count))
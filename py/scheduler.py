@@ -0,0 +1,59 @@
+# Minimal deadline scheduler for loops that must never block: callers ask how
+# long they may sleep, sleep at most that long, then run whatever is due.
+
+import heapq
+import itertools
+import time
+
+
+class Timer:
+    def __init__(self, deadline, callback, args, interval=None):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._heap = []
+        self._counter = itertools.count()
+
+    def _push(self, timer):
+        heapq.heappush(self._heap, (timer.deadline, next(self._counter), timer))
+        return timer
+
+    def call_at(self, deadline, callback, *args):
+        """Runs callback(*args) once the clock reaches deadline. Returns a Timer."""
+        return self._push(Timer(deadline, callback, args))
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def call_every(self, interval, callback, *args):
+        """Runs callback(*args) every interval seconds until the Timer is cancelled."""
+        return self._push(Timer(self.clock() + interval, callback, args, interval))
+
+    def next_deadline(self):
+        """Returns the earliest pending deadline, or None if nothing is scheduled."""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def run_due(self, now=None):
+        """Runs every timer whose deadline has passed, in deadline order."""
+        if now is None:
+            now = self.clock()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+            if timer.interval is not None:
+                timer.deadline += timer.interval
+                self._push(timer)
+            timer.callback(*timer.args)
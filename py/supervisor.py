@@ -0,0 +1,133 @@
+# One WSJT-X connection and one tick loop for every handler (TX watchdog, DX
+# capture, ...). Handlers share the backend, the window and the ControlRegistry,
+# so each control is resolved once for all of them and the window is found once.
+#
+# A handler is any object with:
+#   step()               does its work if due, returns how long it may sleep
+#   reset(controls=None) starts over, with new controls after a reconnect
+#
+# The supervisor waits for WSJT-X to (re)appear instead of exiting, so it
+# survives WSJT-X restarts.
+
+import threading
+import time
+
+from tx_watchdog import TICK_SECONDS, log_message
+from ui_backend import WSJTX_TITLE_PATTERN
+from wsjtx_controls import ControlRegistry
+
+ERROR_RETRY_SECONDS = 3  # How long a failing handler is paused before the next try
+CONNECT_RETRY_SECONDS = 5  # How often to look for WSJT-X while it is not running
+
+
+class Supervisor:
+    """
+    Args:
+        backend: UIBackend shared by all handlers
+        handler_factories: Callables factory(backend, controls) -> handler,
+            called once after the first connect
+        title_re: Title pattern of the WSJT-X main window
+        clock: Time source
+        metrics: Optional UIMetrics, every loop iteration is recorded as a tick
+    """
+
+    def __init__(self, backend, handler_factories, title_re=WSJTX_TITLE_PATTERN, clock=time.time, metrics=None):
+        self.backend = backend
+        self.handler_factories = handler_factories
+        self.title_re = title_re
+        self.clock = clock
+        self.metrics = metrics
+        self.stop_event = threading.Event()
+        self.window = None
+        self.controls = None
+        self.handlers = []
+        self._retry_at = {}
+        self.reconnects = 0
+
+    def _find_window(self):
+        matches = self.backend.find_windows(self.title_re)
+        if len(matches) > 1:
+            log_message(f"Multiple windows found ({len(matches)}) matching WSJT-X. Retrying in {CONNECT_RETRY_SECONDS} seconds...")
+            return None
+        if not matches:
+            return None
+        return self.backend.connect(matches[0])
+
+    def connect(self):
+        """Blocks until exactly one WSJT-X window is found (or stop() is called)."""
+        announced = False
+        while not self.stop_event.is_set():
+            try:
+                window = self._find_window()
+            except Exception as e:
+                log_message(f"Error occurred while connecting: {e}. Retrying in {CONNECT_RETRY_SECONDS} seconds...")
+                window = None
+            if window is not None:
+                self.window = window
+                self.controls = ControlRegistry(self.backend, window)
+                log_message("Successfully connected to WSJT-X window.")
+                return True
+            if not announced:
+                log_message(f"Waiting for WSJT-X, checking every {CONNECT_RETRY_SECONDS} seconds...")
+                announced = True
+            self.stop_event.wait(CONNECT_RETRY_SECONDS)
+        return False
+
+    def _reconnect(self):
+        log_message("WSJT-X window is gone. Waiting for it to come back...")
+        if not self.connect():
+            return
+        self.reconnects += 1
+        for handler in self.handlers:
+            handler.reset(self.controls)
+        self._retry_at.clear()
+
+    def _on_error(self, handler, error):
+        log_message(f"Error in {type(handler).__name__}: {error}")
+        log_message(f"Will retry in {ERROR_RETRY_SECONDS} seconds...")
+        self._retry_at[handler] = self.clock() + ERROR_RETRY_SECONDS
+
+    def tick(self):
+        """
+        Steps every handler that is not backing off after an error.
+
+        Returns:
+            How long the loop may sleep, never more than one tick
+        """
+        now = self.clock()
+        delay = TICK_SECONDS
+        for handler in self.handlers:
+            retry_at = self._retry_at.get(handler)
+            if retry_at is not None:
+                if now < retry_at:
+                    delay = min(delay, retry_at - now)
+                    continue
+                del self._retry_at[handler]
+                # One failure check for everybody: a dead window means reconnecting
+                if not self.backend.is_alive(self.window):
+                    self._reconnect()
+                    return 0.0
+                # Same window: the handler keeps its state, only the controls
+                # are looked up again
+                self.controls.invalidate()
+            try:
+                delay = min(delay, handler.step())
+            except Exception as e:
+                self._on_error(handler, e)
+        return max(0.0, delay)
+
+    def run(self):
+        """Connects, builds the handlers and runs the tick loop until stop()."""
+        if not self.connect():
+            return
+        self.handlers = [factory(self.backend, self.controls) for factory in self.handler_factories]
+        while not self.stop_event.is_set():
+            started = time.perf_counter()
+            delay = self.tick()
+            if self.metrics is not None:
+                self.metrics.observe_tick(time.perf_counter() - started)
+            if delay:
+                self.stop_event.wait(delay)
+
+    def stop(self):
+        self.stop_event.set()
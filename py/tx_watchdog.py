@@ -0,0 +1,455 @@
+# Keeps WSJT-X calling CQ: re-enables TX with Tx 6 selected, pauses after CQ has
+# run too long, and resets QSOs that are stuck sending a signal report.
+#
+# The watchdog is a state machine driven by a deadline scheduler. Nothing in it
+# sleeps; the caller runs step() in a loop and sleeps for the time it returns,
+# which is never longer than one tick. Nothing in it waits on I/O either:
+# log_message() and the event journal are written by background threads.
+
+import threading
+import time
+from datetime import datetime
+from enum import Enum
+
+import event_journal
+from cycle_scheduler import FixedInterval
+from scheduler import Scheduler
+from window_index import WindowIndex
+
+TIME_IN_REPORT_MAX_SECONDS = 90 # Max number of seconds allowed to be in the sending signal report state
+REST_TIME_IN_SECONDS = 30 # Number of seconds to rest after resetting from report mode
+TX6_TIMEOUT_SECONDS = 150  # Time before pausing due to TX6 being active too long
+TX6_PAUSE_SECONDS = 120    # Duration of pause after a timeout
+PAUSE_STATUS_INTERVAL_SECONDS = 15  # How often to log the remaining pause time
+LOG_QSO_DELAY_SECONDS = 15.2  # Wait before clicking OK in the Log QSO window
+UI_SETTLE_SECONDS = 0.5  # Give UI time to respond after a click
+TICK_SECONDS = 1  # How often the UI is polled
+LOCATOR_STATS_INTERVAL_SECONDS = 3600  # How often to log control cache hit/miss counts
+
+def log_message(message):
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    # Per-instance workers run on threads named after their rig
+    thread = threading.current_thread()
+    if thread is not threading.main_thread():
+        message = f"[{thread.name}] {message}"
+    event_journal.console.put(f"{timestamp} - {message}")
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')
+
+def find_log_qso_windows(windows, process_id=None):
+    # Look for any window with "- Log QSO" in the title (of our WSJT-X process,
+    # when several instances are running)
+    return windows.find(r".*- Log QSO.*", process_id)
+
+def close_grid_tracker_alerts_window(backend, windows):
+    try:
+        alerts_windows = windows.find(r".*Alerts.*")
+
+        if not alerts_windows:
+            log_message("No 'Alerts' window found.")
+            return False
+
+        log_message(f"Found {len(alerts_windows)} 'Alerts' window(s). Attempting to close...")
+        alerts_window = backend.connect(alerts_windows[0])
+        backend.close(alerts_window)
+        windows.invalidate()
+        log_message("Closed 'Alerts' window using window.close() method.")
+        return True
+
+    except Exception as e:
+        log_message(f"Error while trying to close 'Alerts' window: {e}")
+        return False
+
+def log_locator_stats(controls):
+    stats = controls.stats()
+    log_message(f"Control cache: {stats['hits']} hits, {stats['misses']} misses, {stats['stale']} stale, {stats['fallback_hits']} fallbacks "
+                f"({stats['hit_rate']:.1%} hit rate, ~{stats['saved_per_hour']:.0f} tree walks saved per hour)")
+
+
+class State(Enum):
+    MONITORING = "monitoring"      # Watching Enable Tx, TX6 and report-mode timers running
+    ENABLING = "enabling"          # Tx 6 / Enable Tx clicks in flight
+    LOG_QSO_WAIT = "log_qso_wait"  # Log QSO window open, OK click scheduled
+    REPORT_REST = "report_rest"    # TX disabled after being stuck in report mode
+    TX6_PAUSED = "tx6_paused"      # TX disabled after TX6 was active too long
+
+
+class TxWatchdog:
+    """
+    State machine behind wsjt-x_enable_tx.py.
+
+    Args:
+        backend: UIBackend used for the Log QSO and Alerts windows
+        controls: ControlRegistry for the WSJT-X window
+        scheduler: Scheduler used for all timers, a new one if not given
+        clock: Time source, time.time by default
+        windows: WindowIndex shared by the Log QSO and Alerts lookups, a new
+            one (listing the windows at most once per tick) if not given
+        process_id: WSJT-X process whose Log QSO windows are ours, any if None
+        poll_policy: When to poll the UI (cycle_scheduler), every tick by default
+        journal: EventJournal for TX, TX6, report mode, Log QSO and reconnect
+            events, or None
+    """
+
+    def __init__(self, backend, controls, scheduler=None, clock=time.time, windows=None, process_id=None, poll_policy=None, journal=None):
+        self.backend = backend
+        self.controls = controls
+        self.clock = clock
+        self.scheduler = scheduler or Scheduler(clock)
+        self.windows = windows or WindowIndex(backend, max_age=TICK_SECONDS, clock=clock)
+        self.process_id = process_id
+        self.poll_policy = poll_policy or FixedInterval(TICK_SECONDS)
+        self.journal = journal
+        self.state = State.MONITORING
+        self._state_timers = []
+        self.next_poll = 0
+        # False between a disabling click and its verification, while Enable Tx
+        # may still read as checked
+        self.settled = True
+
+        # Time tracking for TX6 and report mode, plus the timers that fire on them
+        self.tx6_button_start_time = None
+        self.tx6_timer = None
+        self.tx_report_start_time = None
+        self.report_timer = None
+
+        self.scheduler.call_every(LOCATOR_STATS_INTERVAL_SECONDS, self._log_stats)
+
+    # -- plumbing ---------------------------------------------------------
+
+    def _log_stats(self):
+        log_locator_stats(self.controls)
+
+    def _emit(self, event, **fields):
+        if self.journal is not None:
+            self.journal.emit(event, self.clock(), state=self.state.value, **fields)
+
+    def _enter(self, state):
+        """Switches state and cancels every timer that belonged to the old one."""
+        for timer in self._state_timers:
+            timer.cancel()
+        self._state_timers = []
+        if state != self.state:
+            log_message(f"State: {self.state.value} -> {state.value}")
+        self.state = state
+
+    def _state_later(self, delay, callback, *args):
+        timer = self.scheduler.call_later(delay, callback, *args)
+        self._state_timers.append(timer)
+        return timer
+
+    def _sequence_pending(self):
+        """False once every one-shot timer of the state has run or was cancelled."""
+        now = self.clock()
+        return any(not timer.cancelled and timer.interval is None and timer.deadline > now for timer in self._state_timers)
+
+    def reset(self, controls=None):
+        """
+        Drops all timers and starts over in MONITORING, after reconnecting to
+        a new window. A transient error needs no reset: the next polls pick up
+        a sequence of clicks it cut short.
+        """
+        if controls is not None:
+            self.controls = controls
+            self._emit(event_journal.RECONNECTED)
+        self._stop_tx6_timer()
+        self._stop_report_timer()
+        self.settled = True
+        self._enter(State.MONITORING)
+
+    def step(self):
+        """
+        Runs due timers and, when the poll policy says so (once per tick by
+        default), polls the UI for the current state.
+
+        Returns:
+            How many seconds the caller may sleep before calling step() again
+        """
+        now = self.clock()
+        self.scheduler.run_due(now)
+        if now >= self.next_poll:
+            self.next_poll = self.poll_policy.next_poll(now)
+            self.poll()
+
+        wake_at = self.next_poll
+        deadline = self.scheduler.next_deadline()
+        if deadline is not None:
+            wake_at = min(wake_at, deadline)
+        return max(0.0, min(wake_at - self.clock(), TICK_SECONDS))
+
+    def poll(self):
+        handlers = {
+            State.MONITORING: self._poll_monitoring,
+            State.ENABLING: self._poll_enabling,
+            State.LOG_QSO_WAIT: self._poll_log_qso_wait,
+            State.REPORT_REST: self._poll_resting,
+            State.TX6_PAUSED: self._poll_resting,
+        }
+        handlers[self.state]()
+
+    def _verify_enable_tx(self, expected, success_message, reason):
+        new_state = self.controls.get_toggle_state("enable_tx")
+        self.settled = True
+        verified = bool(new_state) == expected
+        if verified:
+            log_message(success_message)
+        else:
+            log_message("Warning: Checkbox was clicked but did not change state.")
+        self._emit(event_journal.TX_ENABLED if expected else event_journal.TX_DISABLED, reason=reason, verified=verified)
+        return new_state
+
+    # -- timers -----------------------------------------------------------
+
+    def _start_tx6_timer(self):
+        self._stop_tx6_timer()
+        self.tx6_button_start_time = self.clock()
+        self.tx6_timer = self.scheduler.call_later(TX6_TIMEOUT_SECONDS, self._on_tx6_timeout)
+        log_message(f"Started tracking TX6 button activity at {format_time(self.tx6_button_start_time)}")
+        self._emit(event_journal.TX6_TIMER_STARTED)
+
+    def _stop_tx6_timer(self):
+        if self.tx6_timer is not None:
+            self.tx6_timer.cancel()
+            self.tx6_timer = None
+        self.tx6_button_start_time = None
+
+    def _stop_report_timer(self):
+        if self.report_timer is not None:
+            self.report_timer.cancel()
+            self.report_timer = None
+        self.tx_report_start_time = None
+
+    def _on_tx6_timeout(self):
+        self.tx6_timer = None
+        if self.state != State.MONITORING:
+            return
+
+        current_time = self.clock()
+        time_since_tx6 = current_time - self.tx6_button_start_time
+        in_report_mode = False
+        report_time_under_limit = False
+        time_in_report_mode = 0.0
+
+        try:
+            in_report_mode = self.controls.get_toggle_state("txrb2")
+            # If in report mode, check if we're still under the {TIME_IN_REPORT_MAX_SECONDS}-second limit
+            if in_report_mode and self.tx_report_start_time is not None:
+                time_in_report_mode = current_time - self.tx_report_start_time
+                report_time_under_limit = time_in_report_mode < TIME_IN_REPORT_MAX_SECONDS
+        except Exception as e:
+            log_message(f"Error checking report mode state: {e}")
+
+        # Only initiate pause if NOT in report mode OR in report mode but OVER the time limit
+        if in_report_mode and report_time_under_limit:
+            log_message(f"TX6 timeout detected but we're in report mode for less than {TIME_IN_REPORT_MAX_SECONDS} seconds ({time_in_report_mode:.1f}s), continuing without pause")
+            self.tx6_timer = self.scheduler.call_later(TICK_SECONDS, self._on_tx6_timeout)
+            return
+
+        if in_report_mode:
+            log_message("In report mode but exceeded time limit, proceeding with TX timeout pause")
+        else:
+            log_message("Not in report mode, proceeding with TX timeout pause")
+
+        log_message(f"TX6 has been active for {time_since_tx6:.1f} seconds, which exceeds {TX6_TIMEOUT_SECONDS} seconds")
+        self._emit(event_journal.TX6_TIMER_EXPIRED, seconds=round(time_since_tx6, 1), in_report_mode=bool(in_report_mode))
+        log_message(f"Initiating {TX6_PAUSE_SECONDS}-second pause and disabling TX...")
+
+        log_message("Clicking 'Enable Tx' checkbox to stop TX...")
+        self.controls.click("enable_tx")
+        self.settled = False
+        self._stop_tx6_timer()
+        self._stop_report_timer()
+
+        self._enter(State.TX6_PAUSED)
+        pause_start_time = self.clock()
+        self._state_later(UI_SETTLE_SECONDS, self._verify_enable_tx, False, "Successfully disabled TX for pause period.", "tx6_timeout")
+        self._state_later(TX6_PAUSE_SECONDS, self._end_tx6_pause)
+        self._state_timers.append(self.scheduler.call_every(PAUSE_STATUS_INTERVAL_SECONDS, self._log_pause_remaining, pause_start_time))
+        log_message(f"Beginning {TX6_PAUSE_SECONDS}-second pause at {format_time(pause_start_time)}")
+
+    def _log_pause_remaining(self, pause_start_time):
+        time_paused = self.clock() - pause_start_time
+        log_message(f"Still in pause mode. {TX6_PAUSE_SECONDS - time_paused:.1f} seconds remaining.")
+
+    def _end_tx6_pause(self):
+        log_message(f"Completed {TX6_PAUSE_SECONDS}-second pause after TX6 timeout. Resuming normal operation.")
+        if self.controls.get_toggle_state("enable_tx"):
+            self._enter(State.MONITORING)
+            return
+
+        log_message("Re-enabling TX...")
+        self.controls.click("enable_tx")
+        self._enter(State.ENABLING)
+        self._state_later(UI_SETTLE_SECONDS, self._finish_enabling, "Successfully re-enabled TX after pause period.", "pause_over")
+
+    def _on_report_stuck(self):
+        self.report_timer = None
+        if self.state != State.MONITORING:
+            return
+
+        time_in_report_mode = self.clock() - self.tx_report_start_time
+        log_message(f"Been in report mode for {time_in_report_mode:.1f} seconds, which exceeds {TIME_IN_REPORT_MAX_SECONDS} seconds")
+        self._emit(event_journal.REPORT_MODE_STUCK, seconds=round(time_in_report_mode, 1))
+        log_message("Taking action to reset stuck state...")
+
+        log_message("Clicking 'Enable Tx' checkbox to stop TX...")
+        self.controls.click("enable_tx")
+        self.settled = False
+        self._stop_tx6_timer()
+        self._stop_report_timer()
+
+        self._enter(State.REPORT_REST)
+        self._state_later(UI_SETTLE_SECONDS, self._verify_enable_tx, False, "Successfully disabled TX to reset from stuck state.", "report_stuck")
+        self._state_later(REST_TIME_IN_SECONDS, self._end_report_rest)
+        log_message(f"Waiting {REST_TIME_IN_SECONDS} seconds before resuming normal operation...")
+
+    def _end_report_rest(self):
+        log_message("Resuming normal operation after reset.")
+        self._enter(State.MONITORING)
+        try:
+            log_message("Clicking 'Tx 6' button after reset...")
+            self.controls.click("txb6")
+        except Exception as e:
+            log_message(f"Error clicking Tx 6 button after reset: {e}")
+
+    # -- per-state polling --------------------------------------------------
+
+    def _poll_monitoring(self):
+        # Check if Enable Tx checkbox is already checked
+        is_checked = self.controls.get_toggle_state("enable_tx")
+
+        if is_checked:
+            # If TX6 timer not started yet, start it now
+            if self.tx6_button_start_time is None:
+                self._start_tx6_timer()
+        else:
+            log_message("'Enable Tx' is not checked.")
+            self._emit(event_journal.TX_DISABLED, reason="found_off")
+            # Turned off by WSJT-X or the operator: a Log QSO window may follow
+            self.poll_policy.changed(self.clock())
+            # Reset TX6 timer if TX is disabled
+            if self.tx6_button_start_time is not None:
+                log_message("TX disabled, resetting TX6 timer.")
+                self._stop_tx6_timer()
+
+            # Check if a Log QSO window is open
+            try:
+                if find_log_qso_windows(self.windows, self.process_id):
+                    log_message(f"Found a 'Log QSO' window. Waiting {LOG_QSO_DELAY_SECONDS} seconds before clicking OK...")
+                    self._enter(State.LOG_QSO_WAIT)
+                    self._state_later(LOG_QSO_DELAY_SECONDS, self._confirm_log_qso)
+                    return
+            except Exception as e:
+                log_message(f"Error handling Log QSO window: {e}")
+
+            self._start_enabling()
+            return
+
+        self._check_report_mode()
+        self._rearm_timers()
+
+    def _rearm_timers(self):
+        # A timeout callback that raised (e.g. on its click) has already been
+        # consumed; start it again from the recorded start time
+        if self.tx6_button_start_time is not None and self.tx6_timer is None:
+            self.tx6_timer = self.scheduler.call_at(self.tx6_button_start_time + TX6_TIMEOUT_SECONDS, self._on_tx6_timeout)
+        if self.tx_report_start_time is not None and self.report_timer is None:
+            self.report_timer = self.scheduler.call_at(self.tx_report_start_time + TIME_IN_REPORT_MAX_SECONDS, self._on_report_stuck)
+
+    def _check_report_mode(self):
+        # Check if we are stuck responding to someone without luck
+        try:
+            if self.controls.get_toggle_state("txrb2"):
+                log_message("Responding with signal report")
+
+                # Start timing if this is the first time we see it checked
+                if self.tx_report_start_time is None:
+                    self.tx_report_start_time = self.clock()
+                    self.poll_policy.changed(self.tx_report_start_time)
+                    self.report_timer = self.scheduler.call_later(TIME_IN_REPORT_MAX_SECONDS, self._on_report_stuck)
+                    log_message(f"Started tracking time in report mode at {format_time(self.tx_report_start_time)}")
+                    self._emit(event_journal.REPORT_MODE_ENTERED)
+            elif self.tx_report_start_time is not None:
+                # Reset the timer if the radio button is not checked
+                log_message("No longer in report mode, resetting timer.")
+                self.poll_policy.changed(self.clock())
+                self._stop_report_timer()
+        except Exception as e:
+            log_message(f"Error checking RadioButton 'txrb2': {e}")
+
+    def _poll_enabling(self):
+        # The clicks are in flight, _finish_enabling moves us on, unless an
+        # error cut them short
+        if not self._sequence_pending():
+            log_message("Enabling TX was interrupted, checking the state again.")
+            self._enter(State.MONITORING)
+
+    def _poll_log_qso_wait(self):
+        # The operator may have dealt with the Log QSO window while we were waiting
+        if not find_log_qso_windows(self.windows, self.process_id):
+            log_message("'Log QSO' window closed before the wait was over.")
+            self._start_enabling()
+
+    def _poll_resting(self):
+        if not self._sequence_pending():
+            # The end of the rest or pause failed, monitoring re-enables TX
+            log_message(f"End of {self.state.value} was interrupted, resuming normal operation.")
+            self._enter(State.MONITORING)
+            return
+        # The operator may have turned TX back on during a rest or pause. Until
+        # the disabling click is verified a checked box is just our click not
+        # having landed yet
+        if not self.settled:
+            return
+        if self.controls.get_toggle_state("enable_tx"):
+            log_message(f"'Enable Tx' was turned on during {self.state.value}, resuming normal operation.")
+            self._emit(event_journal.TX_ENABLED, reason="turned_on", verified=True)
+            self._enter(State.MONITORING)
+            self._start_tx6_timer()
+
+    # -- actions ------------------------------------------------------------
+
+    def _confirm_log_qso(self):
+        try:
+            log_qso_windows = find_log_qso_windows(self.windows, self.process_id)
+            if log_qso_windows:
+                # Connect to the Log QSO window
+                log_qso_window = self.backend.connect(log_qso_windows[0])
+
+                # Find and click the OK button
+                ok_button = self.backend.find_control(log_qso_window, title="OK", control_type="Button")
+                self.backend.click(ok_button)
+                self.windows.invalidate()
+                log_message(f"Clicked OK on the 'Log QSO' window after {LOG_QSO_DELAY_SECONDS}-second wait.")
+                self._emit(event_journal.LOG_QSO_CONFIRMED)
+
+                # Now try to close the "Alerts" window once the UI had time to respond
+                self._state_later(UI_SETTLE_SECONDS, self._after_log_qso)
+                return
+        except Exception as e:
+            log_message(f"Error handling Log QSO window: {e}")
+        self._start_enabling()
+
+    def _after_log_qso(self):
+        close_grid_tracker_alerts_window(self.backend, self.windows)
+        self._start_enabling()
+
+    def _start_enabling(self):
+        # First click the Tx 6 button
+        log_message("Clicking 'Tx 6' button first...")
+        self.controls.click("txb6")
+        self._enter(State.ENABLING)
+        self._state_later(UI_SETTLE_SECONDS, self._click_enable_tx)
+
+    def _click_enable_tx(self):
+        self._start_tx6_timer()
+
+        # Then click the Enable Tx checkbox
+        log_message("Now clicking 'Enable Tx' checkbox...")
+        self.controls.click("enable_tx")
+        self._state_later(UI_SETTLE_SECONDS, self._finish_enabling, "Successfully enabled TX after clicking 'Tx 6'.", "enable")
+
+    def _finish_enabling(self, success_message, reason):
+        self._verify_enable_tx(True, success_message, reason)
+        self._enter(State.MONITORING)
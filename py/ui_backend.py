@@ -0,0 +1,196 @@
+# The small set of desktop UI operations the scripts need. PywinautoBackend talks
+# to the real WSJT-X through UI Automation; fake_wsjtx.FakeBackend implements the
+# same interface in memory so the TX logic can run headless (tests, benchmarks).
+
+from abc import ABC, abstractmethod
+
+WSJTX_TITLE_PATTERN = r"WSJT-X\s+.*by K1JT"
+
+# COM errors that mean the element behind a wrapper is gone, not that the call failed
+STALE_HRESULTS = {
+    0x80040201,  # UIA_E_ELEMENTNOTAVAILABLE
+    0x80010108,  # RPC_E_DISCONNECTED
+    0x800706BA,  # RPC_S_SERVER_UNAVAILABLE
+}
+
+
+class UIBackend(ABC):
+    """
+    Interface every backend implements. Windows and controls are opaque
+    objects that are only ever handed back to the same backend.
+    """
+
+    @abstractmethod
+    def find_windows(self, title_re):
+        """Returns the handles of all top-level windows whose title matches title_re."""
+
+    @abstractmethod
+    def connect(self, handle):
+        """Returns a window object for a handle returned by find_windows()."""
+
+    @abstractmethod
+    def find_control(self, window, title=None, auto_id=None, control_type=None):
+        """Resolves one control inside a window. Raises if it does not exist."""
+
+    @abstractmethod
+    def get_toggle_state(self, control):
+        """1 if a check box or radio button is checked, 0 if not."""
+
+    @abstractmethod
+    def get_value(self, control):
+        """Text of an edit control."""
+
+    @abstractmethod
+    def click(self, control):
+        """Clicks a button or check box."""
+
+    @abstractmethod
+    def close(self, window):
+        """Closes a window (e.g. a dialog)."""
+
+    @abstractmethod
+    def is_alive(self, window):
+        """True while the window still exists and responds."""
+
+    @abstractmethod
+    def top_level_handles(self):
+        """Returns the handles of all visible top-level windows, without reading anything else."""
+
+    @abstractmethod
+    def window_title(self, handle):
+        """Title of a top-level window."""
+
+    @abstractmethod
+    def window_process_id(self, handle):
+        """Id of the process that owns a top-level window."""
+
+    def is_stale(self, error):
+        """True if error means the control no longer exists, so resolving it again may help."""
+        return False
+
+    def thread_started(self):
+        """Called on a worker thread before it uses this backend."""
+
+    def thread_stopped(self):
+        """Called on a worker thread after its last use of this backend."""
+
+    def subscribe_window_events(self, callback):
+        """
+        Calls callback() whenever a top-level window opens or closes.
+
+        Returns:
+            False if the backend cannot deliver such events (callers keep polling)
+        """
+        return False
+
+
+class PywinautoBackend(UIBackend):
+    def __init__(self):
+        # Imported here so the rest of the code (and the fake backend) works
+        # on machines without pywinauto
+        from pywinauto import Application, findwindows, handleprops
+        self._application = Application
+        self._findwindows = findwindows
+        self._handleprops = handleprops
+        self._window_event_handler = None
+
+    def find_windows(self, title_re):
+        return [element.handle for element in self._findwindows.find_elements(title_re=title_re, backend="uia")]
+
+    def connect(self, handle):
+        app = self._application(backend="uia").connect(handle=handle)
+        return app.window(handle=handle)
+
+    def find_control(self, window, title=None, auto_id=None, control_type=None):
+        if auto_id is not None:
+            control = self._find_by_auto_id(window, auto_id)
+            if control_type is not None and control.element_info.control_type != control_type:
+                raise self._findwindows.ElementNotFoundError(f"{auto_id} is a {control.element_info.control_type}, not a {control_type}")
+            if title is not None and control.window_text() != title:
+                raise self._findwindows.ElementNotFoundError(f"{auto_id} is titled {control.window_text()!r}, not {title!r}")
+            return control
+        criteria = {"title": title, "control_type": control_type}
+        spec = window.child_window(**{key: value for key, value in criteria.items() if value is not None})
+        return spec.wrapper_object()
+
+    def _find_by_auto_id(self, window, auto_id):
+        # One UIA FindFirst on the AutomationId property. child_window(auto_id=...)
+        # enumerates every descendant and compares the ids in Python.
+        from pywinauto.controls.uiawrapper import UIAWrapper
+        from pywinauto.uia_defines import IUIA
+        from pywinauto.uia_element_info import UIAElementInfo
+
+        uia = IUIA()
+        condition = uia.iuia.CreatePropertyCondition(uia.UIA_dll.UIA_AutomationIdPropertyId, auto_id)
+        element = window.element_info.element.FindFirst(uia.tree_scope["descendants"], condition)
+        if not element:
+            raise self._findwindows.ElementNotFoundError(auto_id)
+        return UIAWrapper(UIAElementInfo(element))
+
+    def get_toggle_state(self, control):
+        return control.get_toggle_state()
+
+    def get_value(self, control):
+        return control.get_value()
+
+    def click(self, control):
+        control.click()
+
+    def close(self, window):
+        window.close()
+
+    def is_alive(self, window):
+        try:
+            window.is_visible()
+            return True
+        except Exception:
+            return False
+
+    def is_stale(self, error):
+        from _ctypes import COMError
+        if isinstance(error, self._findwindows.ElementNotFoundError):
+            return True
+        return isinstance(error, COMError) and (error.hresult & 0xFFFFFFFF) in STALE_HRESULTS
+
+    def thread_started(self):
+        # UI Automation is COM: every thread needs its own COM initialisation.
+        # Multithreaded apartment, so no thread has to pump messages for another.
+        import comtypes
+        comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+
+    def thread_stopped(self):
+        import comtypes
+        comtypes.CoUninitialize()
+
+    def top_level_handles(self):
+        # Plain EnumWindows, no UI Automation tree walk
+        return [handle for handle in self._findwindows.enum_windows() if self._handleprops.isvisible(handle)]
+
+    def window_title(self, handle):
+        return self._handleprops.text(handle)
+
+    def window_process_id(self, handle):
+        return self._handleprops.processid(handle)
+
+    def subscribe_window_events(self, callback):
+        try:
+            import comtypes
+            from pywinauto.uia_defines import IUIA
+
+            uia = IUIA()
+
+            class WindowEventHandler(comtypes.COMObject):
+                _com_interfaces_ = [uia.UIA_dll.IUIAutomationEventHandler]
+
+                def IUIAutomationEventHandler_HandleAutomationEvent(self, sender, event_id):
+                    # Runs on a UIA thread, so only flag the change
+                    callback()
+
+            handler = WindowEventHandler()
+            for event_id in (uia.UIA_dll.UIA_Window_WindowOpenedEventId, uia.UIA_dll.UIA_Window_WindowClosedEventId):
+                uia.iuia.AddAutomationEventHandler(event_id, uia.root, uia.tree_scope["subtree"], None, handler)
+        except Exception:
+            return False
+        # Keep the COM object alive for as long as the subscription
+        self._window_event_handler = handler
+        return True
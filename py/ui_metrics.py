@@ -0,0 +1,272 @@
+# Latency histograms and error counters for every UI interaction, plus TX
+# watchdog tick durations and overruns. Exported as Prometheus text or JSON, to
+# a file and/or a small HTTP endpoint:
+#
+#   GET /metrics        Prometheus text format
+#   GET /metrics.json   the same numbers as JSON
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ui_backend import UIBackend
+
+METRICS_FILE = "tx_watchdog_metrics.prom"  # Prometheus text, use a .json name for JSON
+METRICS_INTERVAL_SECONDS = 60  # How often the metrics file is rewritten
+
+# Bucket upper bounds in seconds; UIA calls range from sub-millisecond property
+# reads to multi-second desktop enumerations
+BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(self.buckets) and seconds > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, the last bound being '+Inf'."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + ["+Inf"], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class UIMetrics:
+    def __init__(self, tick_budget_seconds=1.0):
+        self.lock = threading.Lock()
+        self.latency = {}
+        self.errors = {}
+        self.ticks = Histogram()
+        self.tick_budget_seconds = tick_budget_seconds
+        self.tick_overruns = 0
+        self.started = time.time()
+
+    def observe(self, operation, seconds, failed=False):
+        with self.lock:
+            histogram = self.latency.get(operation)
+            if histogram is None:
+                histogram = self.latency[operation] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    def observe_tick(self, seconds):
+        """Records one watchdog step; anything over the tick budget is an overrun."""
+        with self.lock:
+            self.ticks.observe(seconds)
+            if seconds > self.tick_budget_seconds:
+                self.tick_overruns += 1
+
+    def to_json(self):
+        with self.lock:
+            return {
+                "uptime_seconds": time.time() - self.started,
+                "operations": {
+                    operation: {
+                        "count": histogram.count,
+                        "errors": self.errors.get(operation, 0),
+                        "sum_seconds": histogram.sum,
+                        "max_seconds": histogram.max,
+                        "mean_seconds": histogram.sum / histogram.count if histogram.count else 0.0,
+                        "buckets": {str(bound): count for bound, count in histogram.cumulative()},
+                    }
+                    for operation, histogram in sorted(self.latency.items())
+                },
+                "ticks": {
+                    "count": self.ticks.count,
+                    "overruns": self.tick_overruns,
+                    "budget_seconds": self.tick_budget_seconds,
+                    "max_seconds": self.ticks.max,
+                    "mean_seconds": self.ticks.sum / self.ticks.count if self.ticks.count else 0.0,
+                },
+            }
+
+    def to_prometheus(self):
+        lines = []
+
+        def histogram_lines(name, histogram, labels=""):
+            separator = "," if labels else ""
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        with self.lock:
+            lines.append("# HELP wsjtx_ui_call_seconds Latency of UI Automation calls by operation.")
+            lines.append("# TYPE wsjtx_ui_call_seconds histogram")
+            for operation, histogram in sorted(self.latency.items()):
+                histogram_lines("wsjtx_ui_call_seconds", histogram, f'operation="{operation}"')
+            lines.append("# HELP wsjtx_ui_call_errors_total UI Automation calls that raised, by operation.")
+            lines.append("# TYPE wsjtx_ui_call_errors_total counter")
+            for operation in sorted(self.latency):
+                lines.append(f'wsjtx_ui_call_errors_total{{operation="{operation}"}} {self.errors.get(operation, 0)}')
+            lines.append("# HELP wsjtx_watchdog_tick_seconds Duration of one TX watchdog step.")
+            lines.append("# TYPE wsjtx_watchdog_tick_seconds histogram")
+            histogram_lines("wsjtx_watchdog_tick_seconds", self.ticks)
+            lines.append("# HELP wsjtx_watchdog_tick_overruns_total Watchdog steps that took longer than one tick.")
+            lines.append("# TYPE wsjtx_watchdog_tick_overruns_total counter")
+            lines.append(f"wsjtx_watchdog_tick_overruns_total {self.tick_overruns}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path):
+        """Writes Prometheus text (or JSON for a .json path) via temp file + rename."""
+        content = json.dumps(self.to_json(), indent=2) if path.endswith(".json") else self.to_prometheus()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as file:
+            file.write(content)
+        os.replace(temp_path, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """Starts the /metrics endpoint on a daemon thread. Returns the server."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    payload = json.dumps(metrics.to_json()).encode("utf-8")
+                    content_type = "application/json"
+                elif self.path.startswith("/metrics"):
+                    payload = metrics.to_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class MetricsWriter:
+    """
+    Rewrites the metrics file every interval seconds. Usable as a Supervisor
+    handler (step/reset), as a scheduler callback (write) or on its own thread
+    (run).
+
+    Args:
+        metrics: UIMetrics to write
+        path: File to write, see UIMetrics.write_file()
+        interval: Seconds between writes
+        clock: Time source
+        log: Where write errors are reported
+    """
+
+    def __init__(self, metrics, path=METRICS_FILE, interval=METRICS_INTERVAL_SECONDS, clock=time.time, log=print):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+        self.log = log
+        self.next_write = clock() + interval
+
+    def write(self):
+        try:
+            self.metrics.write_file(self.path)
+        except OSError as e:
+            self.log(f"Error writing metrics to {self.path}: {e}")
+
+    def reset(self, controls=None):
+        pass
+
+    def step(self):
+        now = self.clock()
+        if now >= self.next_write:
+            self.next_write = now + self.interval
+            self.write()
+        return self.next_write - now
+
+    def run(self, stop_event):
+        """Writes every interval until stop_event is set."""
+        while not stop_event.wait(self.interval):
+            self.write()
+
+
+class InstrumentedBackend(UIBackend):
+    """Wraps any UIBackend and times every call into a UIMetrics."""
+
+    def __init__(self, backend, metrics):
+        self.backend = backend
+        self.metrics = metrics
+
+    def _timed(self, operation, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = getattr(self.backend, operation)(*args, **kwargs)
+        except Exception:
+            self.metrics.observe(operation, time.perf_counter() - started, failed=True)
+            raise
+        self.metrics.observe(operation, time.perf_counter() - started)
+        return result
+
+    def find_windows(self, title_re):
+        return self._timed("find_windows", title_re)
+
+    def connect(self, handle):
+        return self._timed("connect", handle)
+
+    def find_control(self, window, title=None, auto_id=None, control_type=None):
+        return self._timed("find_control", window, title=title, auto_id=auto_id, control_type=control_type)
+
+    def get_toggle_state(self, control):
+        return self._timed("get_toggle_state", control)
+
+    def get_value(self, control):
+        return self._timed("get_value", control)
+
+    def click(self, control):
+        return self._timed("click", control)
+
+    def close(self, window):
+        return self._timed("close", window)
+
+    def is_alive(self, window):
+        return self._timed("is_alive", window)
+
+    def top_level_handles(self):
+        return self._timed("top_level_handles")
+
+    def window_title(self, handle):
+        return self._timed("window_title", handle)
+
+    def window_process_id(self, handle):
+        return self._timed("window_process_id", handle)
+
+    def is_stale(self, error):
+        return self.backend.is_stale(error)
+
+    def thread_started(self):
+        self.backend.thread_started()
+
+    def thread_stopped(self):
+        self.backend.thread_stopped()
+
+    def subscribe_window_events(self, callback):
+        return self.backend.subscribe_window_events(callback)
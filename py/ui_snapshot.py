@@ -0,0 +1,320 @@
+# One-pass snapshot of a window's UI Automation tree.
+#
+# The tree is walked once and every control becomes a flat JSON entry with its
+# parent's index and its child-index path from the window, so analyses (buttons,
+# lower panel, TX candidates, locator diffs) run on the in-memory snapshot
+# instead of querying UIA again. With pywinauto, the whole subtree is fetched
+# through one UIA cache request where possible.
+#
+# Two snapshots (e.g. from different WSJT-X versions) can be diffed, and a
+# snapshot compiles into the locator map that wsjtx_controls loads at startup.
+
+import json
+import os
+import time
+
+from wsjtx_controls import CONTROLS
+
+SNAPSHOT_VERSION = 1
+PROPERTIES = ("name", "control_type", "class_name", "automation_id", "rectangle", "visible", "enabled", "handle")
+TX_TERMS = ("tx", "enable", "transmit")
+LOWER_PANEL_TERMS = ("lower", "bottom", "panel")
+LOCATORS_VERSION = 1
+DIFF_FIELDS = ("control_type", "name", "class_name", "path")
+
+
+def walk(root, children, properties):
+    """
+    Builds a snapshot from any tree.
+
+    Args:
+        root: Root node (the window)
+        children: children(node) -> list of child nodes
+        properties: properties(node) -> dict with the PROPERTIES keys
+
+    Returns:
+        Snapshot dict: {"version", "generated", "controls": [...]}, where
+        controls[0] is the root and every entry has index, parent, depth and path
+    """
+    controls = []
+    # Explicit stack so deep trees do not hit the recursion limit; children are
+    # pushed in reverse to keep the document order of a recursive walk
+    stack = [(root, None, ())]
+    while stack:
+        node, parent, path = stack.pop()
+        try:
+            entry = properties(node)
+        except Exception as e:
+            entry = {"error": str(e)}
+        entry.update(index=len(controls), parent=parent, depth=len(path), path=list(path))
+        controls.append(entry)
+        try:
+            kids = children(node)
+        except Exception:
+            kids = []
+        for position in range(len(kids) - 1, -1, -1):
+            stack.append((kids[position], entry["index"], path + (position,)))
+    return {
+        "version": SNAPSHOT_VERSION,
+        "generated": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "controls": controls,
+    }
+
+
+def _cached_properties(uia):
+    control_types = getattr(uia, "known_control_type_ids", {})
+
+    def properties(element):
+        rect = element.CachedBoundingRectangle
+        return {
+            "name": element.CachedName or "",
+            "control_type": control_types.get(element.CachedControlType, str(element.CachedControlType)),
+            "class_name": element.CachedClassName or "",
+            "automation_id": element.CachedAutomationId or "",
+            "rectangle": [rect.left, rect.top, rect.right, rect.bottom],
+            "visible": not element.CachedIsOffscreen,
+            "enabled": bool(element.CachedIsEnabled),
+            "handle": element.CachedNativeWindowHandle or 0,
+        }
+    return properties
+
+
+def _cached_children(element):
+    array = element.GetCachedChildren()
+    if not array:
+        return []
+    return [array.GetElement(i) for i in range(array.Length)]
+
+
+def snapshot_uia_cached(window):
+    """
+    Snapshot of a pywinauto UIA window through a single cache request: UIA
+    marshals every property of the whole subtree in one cross-process call.
+    """
+    from pywinauto.uia_defines import IUIA
+
+    uia = IUIA()
+    dll = uia.UIA_dll
+    request = uia.iuia.CreateCacheRequest()
+    for property_id in (dll.UIA_NamePropertyId, dll.UIA_ControlTypePropertyId, dll.UIA_ClassNamePropertyId,
+                        dll.UIA_AutomationIdPropertyId, dll.UIA_BoundingRectanglePropertyId,
+                        dll.UIA_IsEnabledPropertyId, dll.UIA_IsOffscreenPropertyId,
+                        dll.UIA_NativeWindowHandlePropertyId):
+        request.AddProperty(property_id)
+    request.TreeScope = dll.TreeScope_Subtree
+    request.TreeFilter = uia.true_condition  # raw view, like pywinauto's own walks
+    root = window.element_info.element.BuildUpdatedCache(request)
+    return walk(root, _cached_children, _cached_properties(uia))
+
+
+def _element_info_properties(info):
+    rect = info.rectangle
+    return {
+        "name": info.name or "",
+        "control_type": info.control_type or "",
+        "class_name": info.class_name or "",
+        "automation_id": info.automation_id or "",
+        "rectangle": [rect.left, rect.top, rect.right, rect.bottom],
+        "visible": bool(info.visible),
+        "enabled": bool(info.enabled),
+        "handle": info.handle or 0,
+    }
+
+
+def snapshot_uia(window):
+    """Snapshot of a pywinauto UIA window, falling back to a plain element_info walk."""
+    try:
+        return snapshot_uia_cached(window)
+    except Exception:
+        return walk(window.element_info, lambda info: info.children(), _element_info_properties)
+
+
+def write_snapshot(snapshot, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file, indent=1)
+
+
+def load_snapshot(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+# -- analyses on a snapshot ---------------------------------------------------
+
+def buttons(snapshot):
+    """Button entries, each with its parent's name, class and automation id added."""
+    controls = snapshot["controls"]
+    found = []
+    for control in controls:
+        if control.get("control_type") != "Button":
+            continue
+        parent = controls[control["parent"]] if control["parent"] is not None else {}
+        found.append(dict(control,
+                          parent_name=parent.get("name", "N/A"),
+                          parent_class=parent.get("class_name", "N/A"),
+                          parent_automation_id=parent.get("automation_id", "N/A"),
+                          maybe_tx=any(term in control.get("name", "").lower() for term in TX_TERMS)))
+    return found
+
+
+def lower_panel_candidates(snapshot):
+    """(panel, children) pairs for controls whose id or text mentions lower/bottom/panel."""
+    controls = snapshot["controls"]
+    children = {}
+    for control in controls:
+        children.setdefault(control["parent"], []).append(control)
+    return [
+        (control, children.get(control["index"], []))
+        for control in controls
+        if any(term in control.get("automation_id", "").lower() or term in control.get("name", "").lower()
+               for term in LOWER_PANEL_TERMS)
+    ]
+
+
+def tx_button_score(button):
+    text = button.get("name", "").lower()
+    automation_id = button.get("automation_id", "").lower()
+    score = 0
+    if "enable tx" in text:
+        score += 10
+    elif text == "tx":
+        score += 8
+    elif "tx" in text:
+        score += 5
+    elif any(term in text for term in ("transmit", "xmit")):
+        score += 4
+    if "txbutton" in automation_id:
+        score += 8
+    elif "tx" in automation_id:
+        score += 5
+    elif any(term in automation_id for term in ("transmit", "xmit")):
+        score += 4
+    return score
+
+
+def tx_button_candidates(snapshot):
+    """(button, score) pairs for the likely TX buttons, best first."""
+    scored = [(button, tx_button_score(button)) for button in buttons(snapshot)]
+    return sorted([pair for pair in scored if pair[1] > 0], key=lambda pair: pair[1], reverse=True)
+
+
+# -- diff and locator compilation ---------------------------------------------
+
+def leaf_id(automation_id):
+    """Last component of a dotted Qt automation id (the widget's objectName)."""
+    return automation_id.rsplit(".", 1)[-1]
+
+
+def by_automation_id(snapshot):
+    """automation id -> control, for the controls that have one (first wins)."""
+    index = {}
+    for control in snapshot["controls"]:
+        automation_id = control.get("automation_id")
+        if automation_id and automation_id not in index:
+            index[automation_id] = control
+    return index
+
+
+def diff_snapshots(old, new):
+    """
+    Compares two snapshots by automation id.
+
+    Returns:
+        Dict with "added" and "removed" ids, "moved" (old id -> new id for
+        controls whose leaf name and type survived a layout change) and
+        "changed" (id -> {field: [old, new]})
+    """
+    old_ids = by_automation_id(old)
+    new_ids = by_automation_id(new)
+    removed = sorted(set(old_ids) - set(new_ids))
+    added = sorted(set(new_ids) - set(old_ids))
+
+    added_by_leaf = {}
+    for automation_id in added:
+        control = new_ids[automation_id]
+        added_by_leaf.setdefault((leaf_id(automation_id), control.get("control_type")), []).append(automation_id)
+    moved = {}
+    for automation_id in removed:
+        candidates = added_by_leaf.get((leaf_id(automation_id), old_ids[automation_id].get("control_type")), [])
+        if len(candidates) == 1:
+            moved[automation_id] = candidates[0]
+
+    changed = {}
+    for automation_id in sorted(set(old_ids) & set(new_ids)):
+        fields = {field: [old_ids[automation_id].get(field), new_ids[automation_id].get(field)]
+                  for field in DIFF_FIELDS
+                  if old_ids[automation_id].get(field) != new_ids[automation_id].get(field)}
+        if fields:
+            changed[automation_id] = fields
+
+    return {
+        "added": [automation_id for automation_id in added if automation_id not in moved.values()],
+        "removed": [automation_id for automation_id in removed if automation_id not in moved],
+        "moved": moved,
+        "changed": changed,
+    }
+
+
+def locate(snapshot, spec, ids=None):
+    """
+    Finds the snapshot entry for one CONTROLS spec: by exact automation id,
+    else by a unique leaf-name match of the same type, else by a unique title
+    match of the same type. Returns (control, how) or (None, None).
+    """
+    ids = ids if ids is not None else by_automation_id(snapshot)
+    control_type = spec.get("control_type")
+    control = ids.get(spec.get("auto_id"))
+    if control is not None and control.get("control_type") == control_type:
+        return control, "auto_id"
+
+    if spec.get("auto_id"):
+        leaf = leaf_id(spec["auto_id"])
+        matches = [c for automation_id, c in ids.items()
+                   if leaf_id(automation_id) == leaf and c.get("control_type") == control_type]
+        if len(matches) == 1:
+            return matches[0], "leaf"
+
+    if spec.get("title"):
+        matches = [c for c in snapshot["controls"]
+                   if c.get("name") == spec["title"] and c.get("control_type") == control_type and c.get("automation_id")]
+        if len(matches) == 1:
+            return matches[0], "title"
+    return None, None
+
+
+def compile_locators(snapshot, controls=CONTROLS):
+    """
+    Returns (locator map, names that could not be located). The map holds
+    the automation id, type and tree path of every control found.
+    """
+    ids = by_automation_id(snapshot)
+    compiled = {}
+    missing = []
+    for name, spec in controls.items():
+        control, how = locate(snapshot, spec, ids)
+        if control is None:
+            missing.append(name)
+            continue
+        compiled[name] = {
+            "auto_id": control["automation_id"],
+            "control_type": control["control_type"],
+            "title": control.get("name", ""),
+            "path": control["path"],
+            "matched_by": how,
+        }
+    root = snapshot["controls"][0] if snapshot["controls"] else {}
+    return {
+        "version": LOCATORS_VERSION,
+        "generated": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "window_title": root.get("name", ""),
+        "snapshot_generated": snapshot.get("generated"),
+        "controls": compiled,
+    }, missing
+
+
+def write_locators(locators, path):
+    """Writes the locator map through a temp file so a running script never reads half of it."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(locators, file, indent=2)
+    os.replace(temp_path, path)
@@ -0,0 +1,118 @@
+# Shared index of top-level windows (handle -> title) for the auxiliary-window
+# handlers (Log QSO, GridTracker Alerts).
+#
+# Instead of one UIA regex scan over the desktop per handler, the index lists
+# the top-level handles at most once per tick (a cheap EnumWindows) and reads
+# titles only for handles it has not seen. Lookups are regex matches against
+# the cached titles. With events enabled, the backend's window-opened/closed
+# notifications mark the index dirty and the handle listing is skipped until
+# then (plus a periodic safety rescan).
+
+import re
+import time
+
+
+class WindowIndex:
+    """
+    Args:
+        backend: UIBackend with top_level_handles(), window_title() and
+            window_process_id()
+        max_age: Seconds a listing stays valid, normally one tick
+        use_events: Rely on backend.subscribe_window_events() instead of
+            listing the handles every tick
+        rescan_seconds: With events, list the handles anyway this often
+        clock: Time source
+    """
+
+    def __init__(self, backend, max_age=1.0, use_events=False, rescan_seconds=30.0, clock=time.monotonic):
+        self.backend = backend
+        self.max_age = max_age
+        self.rescan_seconds = rescan_seconds
+        self.clock = clock
+        self.titles = {}
+        self.process_ids = {}
+        self._handles = frozenset()
+        self._patterns = {}
+        self._listed_at = None
+        self._dirty = True
+        self._subscribers = []
+        self.listings = 0
+        self.rebuilds = 0
+
+        self.use_events = False
+        if use_events:
+            self.use_events = self.backend.subscribe_window_events(self.invalidate)
+
+    def invalidate(self):
+        """Forces the next lookup to list the windows again (e.g. after closing one)."""
+        self._dirty = True
+
+    def subscribe(self, callback):
+        """Calls callback(handle, title) for every window that appears from now on."""
+        self._subscribers.append(callback)
+
+    def _is_fresh(self, now):
+        if self._dirty or self._listed_at is None:
+            return False
+        age = now - self._listed_at
+        if self.use_events:
+            return age < self.rescan_seconds
+        return age < self.max_age
+
+    def refresh(self, force=False):
+        """
+        Lists the top-level windows unless the current listing is fresh, and
+        rebuilds the title index only if the set of handles changed.
+
+        Returns:
+            True if the index changed
+        """
+        now = self.clock()
+        if not force and self._is_fresh(now):
+            return False
+
+        self._dirty = False
+        self._listed_at = now
+        self.listings += 1
+        handles = frozenset(self.backend.top_level_handles())
+        if handles == self._handles:
+            return False
+
+        self.rebuilds += 1
+        previous = self.titles
+        titles = {}
+        process_ids = {}
+        opened = []
+        for handle in handles:
+            if handle in previous:
+                titles[handle] = previous[handle]
+                process_ids[handle] = self.process_ids[handle]
+                continue
+            try:
+                titles[handle] = self.backend.window_title(handle)
+                process_ids[handle] = self.backend.window_process_id(handle)
+            except Exception:
+                # Gone between listing and reading its title
+                titles.pop(handle, None)
+                continue
+            opened.append(handle)
+        self.titles = titles
+        self.process_ids = process_ids
+        self._handles = handles
+
+        for handle in opened:
+            for callback in self._subscribers:
+                callback(handle, titles[handle])
+        return True
+
+    def find(self, title_re, process_id=None):
+        """
+        Handles of the windows whose title matches title_re (re.match, like
+        pywinauto), only those of one process if process_id is given.
+        """
+        self.refresh()
+        pattern = self._patterns.get(title_re)
+        if pattern is None:
+            pattern = self._patterns[title_re] = re.compile(title_re)
+        return [handle for handle, title in self.titles.items()
+                if pattern.match(title) and (process_id is None or self.process_ids[handle] == process_id)]
@@ -0,0 +1,140 @@
+# Persistent worked-before index: an SQLite database (WAL mode) with one row per
+# QSO keyed by callsign. It remembers the ADI byte offset and file identity it
+# was built from, so a restart only ingests the QSOs logged since.
+#
+#   python worked_index.py K7VAY KN6RDD
+
+import argparse
+import json
+import sqlite3
+import time
+
+import adif
+from bands import record_band
+
+DEFAULT_DB_PATH = "worked_index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS qso (
+    id INTEGER PRIMARY KEY,
+    call TEXT NOT NULL,
+    band TEXT,
+    mode TEXT,
+    qso_date TEXT,
+    time_on TEXT,
+    grid TEXT
+);
+CREATE INDEX IF NOT EXISTS qso_call ON qso (call);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+QSO_COLUMNS = ("band", "mode", "qso_date", "time_on", "grid")
+
+
+def qso_row(record):
+    return (
+        record.get("call", "").strip().upper(),
+        record_band(record),
+        adif.qso_mode(record),
+        record.get("qso_date", ""),
+        record.get("time_on", ""),
+        record.get("gridsquare", "").upper(),
+    )
+
+
+class WorkedIndex:
+    """
+    Args:
+        adi_path: WSJT-X ADI log to index
+        db_path: SQLite database file, created on first use
+    """
+
+    def __init__(self, adi_path=adif.DEFAULT_ADI_PATH, db_path=DEFAULT_DB_PATH):
+        self.adi_path = adi_path
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+        # Warm start: resume from where the database left off, unless it was
+        # built from another file (then the reader restarts and we rebuild)
+        meta = dict(self.db.execute("SELECT key, value FROM meta"))
+        offset = 0
+        identity = None
+        if meta.get("adi_path") == adi_path:
+            offset = int(meta.get("offset", 0))
+            identity = json.loads(meta["identity"]) if meta.get("identity") else None
+        elif meta:
+            self._clear()
+        self.reader = adif.AdifTailReader(adi_path, offset, identity)
+
+    def _clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM qso")
+            self.db.execute("DELETE FROM meta")
+
+    def refresh(self):
+        """
+        Ingests the QSOs appended to the log since the last refresh (or the
+        whole log if it was replaced). Returns the number of QSOs added.
+        """
+        records, restarted = self.reader.read_new()
+        if restarted:
+            self._clear()
+        if not records and not restarted:
+            return 0
+
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO qso (call, band, mode, qso_date, time_on, grid) VALUES (?, ?, ?, ?, ?, ?)",
+                [qso_row(record) for record in records if record.get("call")],
+            )
+            self.db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                ("adi_path", self.adi_path),
+                ("offset", str(self.reader.offset)),
+                ("identity", json.dumps(self.reader.identity)),
+            ])
+        return len(records)
+
+    def lookup(self, call):
+        """Returns every QSO with call as a list of dicts (band, mode, qso_date, time_on, grid)."""
+        rows = self.db.execute(
+            "SELECT band, mode, qso_date, time_on, grid FROM qso WHERE call = ? ORDER BY qso_date, time_on",
+            (call.strip().upper(),),
+        )
+        return [dict(zip(QSO_COLUMNS, row)) for row in rows]
+
+    def is_worked(self, call):
+        row = self.db.execute("SELECT 1 FROM qso WHERE call = ? LIMIT 1", (call.strip().upper(),)).fetchone()
+        return row is not None
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM qso").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build/refresh the worked-before index and look up calls")
+    parser.add_argument("calls", nargs="*")
+    parser.add_argument("--adi", default=adif.DEFAULT_ADI_PATH, help="WSJT-X ADI log (default: $ADI_FILE_PATH)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = WorkedIndex(args.adi, args.db)
+    added = index.refresh()
+    print(f"Index has {index.count()} QSOs ({added} new) after {time.perf_counter() - started:.3f}s")
+
+    for call in args.calls:
+        started = time.perf_counter()
+        qsos = index.lookup(call)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"{call.upper()}: {len(qsos)} QSO(s) in {elapsed_ms:.2f} ms")
+        for qso in qsos:
+            print(f"  {qso['qso_date']} {qso['time_on']} {qso['band']} {qso['mode']} {qso['grid']}")
+    index.close()
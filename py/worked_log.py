@@ -0,0 +1,108 @@
+# In-memory worked-before table built from the WSJT-X ADI log: a dict keyed by
+# callsign, so a lookup is a single hash probe whatever the log size.
+
+import threading
+
+import adif
+from bands import record_band
+
+
+def normalize_call(call):
+    return (call or "").strip().upper()
+
+
+class WorkedLog:
+    """
+    Per-call summary of the log: number of QSOs, bands, modes, band/mode
+    pairs and the date of the last QSO.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.qso_count = 0
+
+    def clear(self):
+        self.calls.clear()
+        self.qso_count = 0
+
+    def add_records(self, records):
+        for record in records:
+            call = normalize_call(record.get("call"))
+            if not call:
+                continue
+            band = record_band(record)
+            mode = adif.qso_mode(record)
+            entry = self.calls.get(call)
+            if entry is None:
+                entry = self.calls[call] = {"qsos": 0, "band_modes": set(), "last_qso": ""}
+            entry["qsos"] += 1
+            entry["band_modes"].add((band, mode))
+            qso_date = record.get("qso_date", "")
+            if qso_date > entry["last_qso"]:
+                entry["last_qso"] = qso_date
+            self.qso_count += 1
+
+    def lookup(self, call):
+        """Returns a JSON-ready summary for call; 'worked' is False if it is not in the log."""
+        call = normalize_call(call)
+        entry = self.calls.get(call)
+        if entry is None:
+            return {"call": call, "worked": False}
+        band_modes = sorted(entry["band_modes"])
+        return {
+            "call": call,
+            "worked": True,
+            "qsos": entry["qsos"],
+            "bands": sorted({band for band, _ in band_modes if band}),
+            "modes": sorted({mode for _, mode in band_modes if mode}),
+            "band_modes": [list(pair) for pair in band_modes],
+            "last_qso": entry["last_qso"],
+        }
+
+    def __contains__(self, call):
+        return normalize_call(call) in self.calls
+
+    def __len__(self):
+        return len(self.calls)
+
+
+class LogFollower:
+    """
+    Keeps a set of in-memory indexes in sync with the ADI log. Each index
+    needs add_records(records) and clear(); refresh() only reads the tail.
+    """
+
+    def __init__(self, adi_path=adif.DEFAULT_ADI_PATH, indexes=None):
+        self.reader = adif.AdifTailReader(adi_path)
+        self.indexes = list(indexes or [])
+        self.lock = threading.Lock()
+
+    def add_index(self, index):
+        with self.lock:
+            index.clear()
+            self.indexes.append(index)
+            # A late index has to see everything read so far
+            if self.reader.offset:
+                records = []
+                for record, end in adif.iter_file_records(self.reader.path):
+                    if end > self.reader.offset:
+                        break
+                    records.append(record)
+                index.add_records(records)
+
+    def refresh(self):
+        """Pushes newly logged QSOs into every index. Returns how many were added."""
+        with self.lock:
+            records, restarted = self.reader.read_new()
+            if restarted:
+                for index in self.indexes:
+                    index.clear()
+            if records:
+                for index in self.indexes:
+                    index.add_records(records)
+            return len(records)
+
+    def version(self):
+        """Changes whenever the indexed content changes, used as an ETag."""
+        identity = self.reader.identity or {}
+        return f"{identity.get('head', '')[:12]}-{self.reader.offset}"
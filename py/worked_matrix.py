@@ -0,0 +1,182 @@
+# Compact call x band x mode worked matrix over the ADI log.
+#
+# Calls are interned to integer ids; for each id the matrix keeps bitmasks in
+# flat arrays (bands worked, modes worked, bands/modes confirmed, and bands
+# worked per mode). Every query is a dict probe plus a bit test, and a call
+# costs a few bytes per array instead of a dict per QSO.
+
+import threading
+from array import array
+
+import adif
+from bands import BAND_NAMES, UNKNOWN_BAND, band_index, band_mask_names, record_band
+
+MAX_MODES = 32
+
+# Band and mode masks are stored in 32-bit array slots
+assert len(BAND_NAMES) <= 32
+
+
+def is_confirmed(record):
+    """LoTW, eQSL or a paper QSL received."""
+    return any(record.get(field, "").upper() in ("Y", "V")
+               for field in ("lotw_qsl_rcvd", "eqsl_qsl_rcvd", "qsl_rcvd"))
+
+
+class WorkedMatrix:
+    """Call x band x mode worked matrix, as a LogFollower index."""
+
+    def __init__(self):
+        # Queries come from other threads (UDP listener) than the updates (log watcher)
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self._clear()
+
+    def _clear(self):
+        self.call_ids = {}
+        self.calls = []
+        self.mode_ids = {}
+        self.modes = []
+        self.band_masks = array("I")
+        self.mode_masks = array("I")
+        self.confirmed_band_masks = array("I")
+        self.confirmed_mode_masks = array("I")
+        # mode id -> array of band masks worked in that mode, one entry per call
+        self.mode_band_masks = []
+        self.qso_count = 0
+
+    def _call_id(self, call):
+        call_id = self.call_ids.get(call)
+        if call_id is None:
+            call_id = len(self.calls)
+            self.calls.append(call)
+            self.band_masks.append(0)
+            self.mode_masks.append(0)
+            self.confirmed_band_masks.append(0)
+            self.confirmed_mode_masks.append(0)
+            for masks in self.mode_band_masks:
+                masks.append(0)
+            # Published last, so a call id always has its mask slots
+            self.call_ids[call] = call_id
+        return call_id
+
+    def _mode_id(self, mode):
+        mode_id = self.mode_ids.get(mode)
+        if mode_id is None:
+            if len(self.modes) >= MAX_MODES:
+                raise ValueError(f"more than {MAX_MODES} distinct modes in the log")
+            mode_id = len(self.modes)
+            self.modes.append(mode)
+            self.mode_band_masks.append(array("I", bytes(4 * len(self.calls))))
+            self.mode_ids[mode] = mode_id
+        return mode_id
+
+    def add_records(self, records):
+        with self.lock:
+            self._add_records(records)
+
+    def _add_records(self, records):
+        for record in records:
+            call = record.get("call", "").strip().upper()
+            if not call:
+                continue
+            call_id = self._call_id(call)
+            mode = adif.qso_mode(record)
+            mode_bit = 1 << self._mode_id(mode) if mode else 0
+            band = band_index(record_band(record))
+            band_bit = 1 << band if band != UNKNOWN_BAND else 0
+
+            self.band_masks[call_id] |= band_bit
+            self.mode_masks[call_id] |= mode_bit
+            if mode_bit:
+                self.mode_band_masks[self.mode_ids[mode]][call_id] |= band_bit
+            if is_confirmed(record):
+                self.confirmed_band_masks[call_id] |= band_bit
+                self.confirmed_mode_masks[call_id] |= mode_bit
+            self.qso_count += 1
+
+    def _lookup(self, call, band, mode):
+        """Resolves call/band/mode to (call_id, band_bit, mode_id); None if any is unknown."""
+        call_id = self.call_ids.get(call.strip().upper())
+        if call_id is None:
+            return None
+        band_bit = 0
+        if band is not None:
+            index = band_index(band)
+            if index == UNKNOWN_BAND:
+                return None
+            band_bit = 1 << index
+        mode_id = None
+        if mode is not None:
+            mode_id = self.mode_ids.get(mode.upper())
+            if mode_id is None:
+                return None
+        return call_id, band_bit, mode_id
+
+    def is_worked(self, call, band=None, mode=None):
+        """Worked at all, on band, in mode, or on band in mode."""
+        with self.lock:
+            return self._is_worked(call, band, mode)
+
+    def _is_worked(self, call, band, mode):
+        found = self._lookup(call, band, mode)
+        if found is None:
+            return False
+        call_id, band_bit, mode_id = found
+        if mode_id is None:
+            return band is None or bool(self.band_masks[call_id] & band_bit)
+        if band is None:
+            return bool(self.mode_masks[call_id] >> mode_id & 1)
+        return bool(self.mode_band_masks[mode_id][call_id] & band_bit)
+
+    def is_confirmed(self, call, band=None, mode=None):
+        """
+        Confirmed at all, on band or in mode. Confirmation is tracked per band
+        and per mode, not per band/mode pair, so with both given this answers
+        "confirmed on band and confirmed in mode".
+        """
+        with self.lock:
+            return self._is_confirmed(call, band, mode)
+
+    def _is_confirmed(self, call, band, mode):
+        found = self._lookup(call, band, mode)
+        if found is None:
+            return False
+        call_id, band_bit, mode_id = found
+        if band is None and mode_id is None:
+            return bool(self.confirmed_band_masks[call_id] or self.confirmed_mode_masks[call_id])
+        if band is not None and not self.confirmed_band_masks[call_id] & band_bit:
+            return False
+        return mode_id is None or bool(self.confirmed_mode_masks[call_id] >> mode_id & 1)
+
+    def bands(self, call, mode=None):
+        with self.lock:
+            return self._bands(call, mode)
+
+    def _bands(self, call, mode):
+        call_id = self.call_ids.get(call.strip().upper())
+        if call_id is None:
+            return []
+        if mode is None:
+            return band_mask_names(self.band_masks[call_id])
+        mode_id = self.mode_ids.get(mode.upper())
+        return band_mask_names(self.mode_band_masks[mode_id][call_id]) if mode_id is not None else []
+
+    def modes_worked(self, call):
+        with self.lock:
+            call_id = self.call_ids.get(call.strip().upper())
+            if call_id is None:
+                return []
+            mask = self.mode_masks[call_id]
+            return [mode for mode_id, mode in enumerate(self.modes) if mask >> mode_id & 1]
+
+    def memory_bytes(self):
+        """Approximate size of the bitmask arrays (the interned call strings come on top)."""
+        arrays = [self.band_masks, self.mode_masks, self.confirmed_band_masks, self.confirmed_mode_masks] + self.mode_band_masks
+        return sum(len(masks) * masks.itemsize for masks in arrays)
+
+    def __len__(self):
+        return len(self.calls)
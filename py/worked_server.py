@@ -0,0 +1,153 @@
+# Worked-before lookup service for the Chrome extension. Answers one callsign
+# (or a small batch) per request from an in-memory table instead of shipping
+# every logged call to the browser like server.js /file does.
+#
+#   GET /worked/K7VAY
+#   GET /worked?calls=K7VAY,KN6RDD
+#   GET /worked?prefix=JA1
+#   GET /worked?grid=FN42
+#
+# Every answer also lists the logged variants of the call's base call, so
+# KN6RDD/P on QRZ matches KN6RDD or VE3/KN6RDD in the log. With a cty.dat file
+# (--cty) it also carries the DXCC entity and whether the entity or CQ zone
+# would be new.
+#
+# Responses carry an ETag tied to the log offset, so a browser revalidating an
+# unchanged answer gets an empty 304. The log is watched (adif_watch.py), new
+# QSOs are ingested as WSJT-X writes them instead of on the next request.
+
+import argparse
+import json
+import os
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import adif
+from adif_watch import AdiWatcher
+from callsign import MAX_PREFIX_CALLS, CallIndex
+from dxcc import DEFAULT_CTY_PATH, DxccIndex, DxccResolver
+from grids import WorkedGrids
+from worked_log import LogFollower, WorkedLog
+
+DEFAULT_PORT = 3089
+MAX_BATCH_CALLS = 200
+
+def log_message(message):
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"{timestamp} - {message}")
+
+
+class WorkedRequestHandler(BaseHTTPRequestHandler):
+    # Set on the server by make_server()
+    worked = None
+    calls = None
+    dxcc = None
+    grids = None
+    follower = None
+    watcher = None  # With a watcher the follower is refreshed by it, not per request
+
+    def log_message(self, format, *args):
+        # Quiet by default, every QRZ page load would print a line
+        pass
+
+    def _send(self, status, body=None, etag=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Expose-Headers", "ETag")
+        self.send_header("Cache-Control", "no-cache")
+        if etag:
+            self.send_header("ETag", etag)
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(payload)
+
+    def _lookup(self, call):
+        result = self.worked.lookup(call)
+        result.update(self.calls.lookup(call))
+        if self.dxcc is not None:
+            result.update(self.dxcc.lookup(call))
+        return result
+
+    def _answer(self, parts, query):
+        """(status, body) for a /worked request."""
+        if len(parts) == 2:
+            return 200, self._lookup(unquote(parts[1]))
+
+        grid = query.get("grid")
+        if grid:
+            result = self.grids.lookup(grid[0])
+            return (400 if "error" in result else 200), result
+
+        prefix = query.get("prefix")
+        if prefix:
+            return 200, {"prefix": prefix[0].upper(), "calls": self.calls.starting_with(prefix[0], MAX_PREFIX_CALLS)}
+
+        calls = []
+        for value in query.get("calls", []):
+            calls.extend(call for call in value.split(",") if call.strip())
+        if not calls:
+            return 400, {"error": "pass calls=CALL1,CALL2, prefix=JA1 or grid=FN42"}
+        if len(calls) > MAX_BATCH_CALLS:
+            return 400, {"error": f"at most {MAX_BATCH_CALLS} calls per request"}
+        results = [self._lookup(call) for call in calls]
+        return 200, {result["call"]: result for result in results}
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        if not parts or parts[0] != "worked" or len(parts) > 2:
+            self._send(404, {"error": "not found"})
+            return
+
+        if self.watcher is None:
+            self.follower.refresh()
+        # The watcher thread updates the indexes under the follower's lock,
+        # read them under it too so an answer never sees half an update
+        with self.follower.lock:
+            etag = f'"{self.follower.version()}"'
+            if etag in self.headers.get("If-None-Match", ""):
+                status, body = 304, None
+            else:
+                status, body = self._answer(parts, parse_qs(url.query))
+        self._send(status, body, etag)
+
+
+def make_server(adi_path=adif.DEFAULT_ADI_PATH, port=DEFAULT_PORT, host="127.0.0.1", cty_path=None, watch=True):
+    worked = WorkedLog()
+    calls = CallIndex()
+    grids = WorkedGrids()
+    indexes = [worked, calls, grids]
+    dxcc = None
+    if cty_path and os.path.exists(cty_path):
+        dxcc = DxccIndex(DxccResolver.load(cty_path))
+        indexes.append(dxcc)
+    follower = LogFollower(adi_path, indexes)
+    follower.refresh()
+    watcher = AdiWatcher(adi_path, follower.refresh).start() if watch else None
+    handler = type("Handler", (WorkedRequestHandler,), {"worked": worked, "calls": calls, "dxcc": dxcc, "grids": grids,
+                                                        "follower": follower, "watcher": watcher})
+    return ThreadingHTTPServer((host, port), handler), worked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve worked-before lookups from the WSJT-X ADI log")
+    parser.add_argument("--adi", default=adif.DEFAULT_ADI_PATH, help="WSJT-X ADI log (default: $ADI_FILE_PATH)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cty", default=DEFAULT_CTY_PATH, help="cty.dat for DXCC entities (default: $CTY_DAT_PATH or ./cty.dat)")
+    parser.add_argument("--no-watch", action="store_true", help="Re-check the log on every request instead of watching it")
+    args = parser.parse_args()
+
+    server, worked = make_server(args.adi, args.port, cty_path=args.cty, watch=not args.no_watch)
+    log_message(f"Loaded {worked.qso_count} QSOs with {len(worked)} calls from {args.adi}")
+    if server.RequestHandlerClass.dxcc is None:
+        log_message(f"No {args.cty}, answers carry no DXCC entity")
+    log_message(f"Server running at http://localhost:{args.port}/worked/<call>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log_message("Server stopped by user (Ctrl+C).")
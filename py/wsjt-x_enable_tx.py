@@ -1,105 +1,40 @@
-from pywinauto import Application, findwindows
+import argparse
+import threading
 import time
 import sys
-from datetime import datetime
 
-TIME_IN_REPORT_MAX_SECONDS = 90 # Max number of seconds allowed to be in the sending signal report state
-REST_TIME_IN_SECONDS = 30 # Number of seconds to rest after 
-TX6_TIMEOUT_SECONDS = 150  # Time before pausing due to TX6 being active too long
-TX6_PAUSE_SECONDS = 120    # Duration of pause after a timeout
+from cycle_scheduler import PERIODS, policy_for
+from event_journal import DEFAULT_JOURNAL_PATH, EventJournal
+from instances import InstanceManager
+from ui_backend import PywinautoBackend, WSJTX_TITLE_PATTERN
+from ui_metrics import METRICS_FILE, InstrumentedBackend, MetricsWriter, UIMetrics
+from wsjtx_controls import ControlRegistry
+from tx_watchdog import TICK_SECONDS, TxWatchdog, log_message, log_locator_stats
+from window_index import WindowIndex
 
-def log_message(message):
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"{timestamp} - {message}")
+ERROR_RETRY_SECONDS = 3  # How long to back off after an error during a check
+def open_journal(path):
+    if not path:
+        return None
+    log_message(f"Recording TX events to {path}")
+    return EventJournal(path)
 
-def close_grid_tracker_alerts_window():
-    try:
-        alerts_windows = findwindows.find_elements(title_re=r".*Alerts.*", backend="uia")
-        
-        if not alerts_windows:
-            log_message("No 'Alerts' window found.")
-            return False
-            
-        log_message(f"Found {len(alerts_windows)} 'Alerts' window(s). Attempting to close...")
-        alerts_app = Application(backend="uia").connect(handle=alerts_windows[0].handle)
-        alerts_window = alerts_app.window(handle=alerts_windows[0].handle)
-        alerts_window.close()
-        log_message("Closed 'Alerts' window using window.close() method.")
-        return True
-                    
-    except Exception as e:
-        log_message(f"Error while trying to close 'Alerts' window: {e}")
-        return False
-
-def handle_stuck_in_report_mode(window, enable_tx_checkbox, tx_report_start_time):
-    """
-    Handles the situation when we're stuck in report mode (txrb2 checked) for too long.
-    
-    Args:
-        window: The WSJT-X window
-        enable_tx_checkbox: Reference to the Enable TX checkbox
-        tx_report_start_time: When we first detected being in report mode
-        
-    Returns:
-        None if not stuck or not in report mode, or timestamp when action was taken
-    """
-    current_time = time.time()
-    time_in_report_mode = current_time - tx_report_start_time
-    
-    # Check if we've been in report mode for more than {TIME_IN_REPORT_MAX_SECONDS} seconds
-    if time_in_report_mode > TIME_IN_REPORT_MAX_SECONDS:
-        log_message(f"Been in report mode for {time_in_report_mode:.1f} seconds, which exceeds {TIME_IN_REPORT_MAX_SECONDS} seconds")
-        log_message("Taking action to reset stuck state...")
-        
-        log_message("Clicking 'Enable Tx' checkbox to stop TX...")
-        enable_tx_checkbox.click()
-        time.sleep(0.5)
-        new_state = enable_tx_checkbox.get_toggle_state()
-        if not new_state:
-            log_message("Successfully disabled TX to reset from stuck state.")
-        else:
-            log_message("Warning: Checkbox was clicked but did not change state.")
-        
-        log_message("Waiting {REST_TIME_IN_SECONDS} seconds before resuming normal operation...")
-        time.sleep(REST_TIME_IN_SECONDS)
-        log_message("Resuming normal operation after reset.")
-
-        try:
-            tx6_button = window.child_window(
-                title="Tx 6", 
-                auto_id="MainWindow.centralWidget.lower_panel_widget.controls_stack_widget.page.QSO_controls_widget.tabWidget.qt_tabwidget_stackedwidget.tab.txb6", 
-                control_type="Button"
-            )
-            log_message("Clicking 'Tx 6' button after reset...")
-            tx6_button.click()
-            time.sleep(0.5)
-        except Exception as e:
-            log_message(f"Error clicking Tx 6 button after reset: {e}")
-        
-        # Return the current time to reset the timer
-        return None  # Reset the timer
-    
-    return tx_report_start_time  # Not stuck, return the original start time
-
-def monitor_and_enable_tx():    
-    window_title_pattern = r"WSJT-X\s+.*by K1JT"
-    app = None
+def monitor_and_enable_tx(backend=None, metrics_file=METRICS_FILE, metrics_port=0, window_events=False, cycle=None, journal_path=DEFAULT_JOURNAL_PATH):
+    metrics = UIMetrics(tick_budget_seconds=TICK_SECONDS)
+    backend = InstrumentedBackend(backend or PywinautoBackend(), metrics)
+    if metrics_port:
+        metrics.serve(metrics_port)
+        log_message(f"Serving UI call metrics at http://localhost:{metrics_port}/metrics")
+    window_title_pattern = WSJTX_TITLE_PATTERN
+    window = None
     max_attempts = 10
     attempts = 0
-    
-    # Variables to track time in report mode
-    tx_report_start_time = None  # Will be set when we first detect being in report mode
-    
-    # Variables to track tx6 button activation time
-    tx6_button_start_time = None
-    tx6_button_paused = False
-    tx6_pause_start_time = None
 
     log_message("Searching for WSJT-X application window...")
-    
-    while app is None and attempts < max_attempts:
+
+    while window is None and attempts < max_attempts:
         try:
-            matches = findwindows.find_elements(title_re=window_title_pattern, backend="uia")
+            matches = backend.find_windows(window_title_pattern)
             if len(matches) > 1:
                 log_message(f"Multiple windows found ({len(matches)}) matching WSJT-X. Retrying in 3 seconds...")
                 time.sleep(3)
@@ -111,252 +46,150 @@ def monitor_and_enable_tx():
                 attempts += 1
                 continue
             else:
-                app = Application(backend="uia").connect(handle=matches[0].handle)
-                window = app.window(handle=matches[0].handle)
+                window = backend.connect(matches[0])
+                controls = ControlRegistry(backend, window)
                 log_message("Successfully connected to WSJT-X window.")
         except Exception as e:
             log_message(f"Error occurred while connecting: {e}. Retrying in 3 seconds...")
             time.sleep(3)
             attempts += 1
 
-    if app is None:
+    if window is None:
         log_message(f"Failed to connect to WSJT-X after {max_attempts} attempts. Exiting.")
         sys.exit(1)
-    
+
     log_message("Starting continuous monitoring of 'Enable Tx' checkbox...")
     log_message("Press Ctrl+C to stop monitoring.")
-    
+
+    windows = WindowIndex(backend, max_age=TICK_SECONDS, use_events=window_events)
+    if window_events and not windows.use_events:
+        log_message("Window events are not available, listing windows once per tick instead.")
+    journal = open_journal(journal_path)
+    watchdog = TxWatchdog(backend, controls, windows=windows, poll_policy=policy_for(cycle, TICK_SECONDS), journal=journal)
+    writer = MetricsWriter(metrics, metrics_file, log=log_message) if metrics_file else None
+    if writer is not None:
+        watchdog.scheduler.call_every(writer.interval, writer.write)
+
+    def reconnect():
+        matches = backend.find_windows(window_title_pattern)
+        return backend.connect(matches[0]) if matches else None
+
     try:
-        # Main monitoring loop
-        while True:
-            # Check if we're in the pause state after tx6 was active for too long
-            if tx6_button_paused:
-                current_time = time.time()
-                time_paused = current_time - tx6_pause_start_time
-                
-                if time_paused > TX6_PAUSE_SECONDS:  # If we've completed the full pause duration
-                    log_message(f"Completed {TX6_PAUSE_SECONDS}-second pause after TX6 timeout. Resuming normal operation.")
-                    tx6_button_paused = False
-                    tx6_button_start_time = None
-                    
-                    # Get a reference to the Enable Tx checkbox
-                    enable_tx_checkbox = window.child_window(
-                        title="Enable Tx", 
-                        auto_id="MainWindow.centralWidget.lower_panel_widget.autoButton", 
-                        control_type="CheckBox"
-                    )
-                    
-                    # Re-enable TX
-                    if not enable_tx_checkbox.get_toggle_state():
-                        log_message("Re-enabling TX...")
-                        enable_tx_checkbox.click()
-                        time.sleep(0.5)
-                        
-                        # Verify if state changed
-                        new_state = enable_tx_checkbox.get_toggle_state()
-                        if new_state:
-                            log_message("Successfully re-enabled TX after pause period.")
-                        else:
-                            log_message("Warning: Checkbox was clicked but did not change state.")
-                else:
-                    log_message(f"Still in pause mode. {TX6_PAUSE_SECONDS - time_paused:.1f} seconds remaining.")
-                    time.sleep(15)  # Check less frequently during pause
-                    continue
-            
-            try:
-                # Get a reference to the Enable Tx checkbox using the exact identifier
-                enable_tx_checkbox = window.child_window(
-                    title="Enable Tx", 
-                    auto_id="MainWindow.centralWidget.lower_panel_widget.autoButton", 
-                    control_type="CheckBox"
-                )
-                
-                # Get a reference to the Tx 6 button
-                tx6_button = window.child_window(
-                    title="Tx 6", 
-                    auto_id="MainWindow.centralWidget.lower_panel_widget.controls_stack_widget.page.QSO_controls_widget.tabWidget.qt_tabwidget_stackedwidget.tab.txb6", 
-                    control_type="Button"
-                )
-                
-                # Check if Enable Tx checkbox is already checked
-                is_checked = enable_tx_checkbox.get_toggle_state()
-                
-                # Check for tx6 timeout
-                if is_checked and tx6_button_start_time is not None:
-                    current_time = time.time()
-                    time_since_tx6 = current_time - tx6_button_start_time
-                    
-                    if time_since_tx6 > TX6_TIMEOUT_SECONDS:  # If TX6 has been active for too long
-                        # Check if we're in signal report state
-                        in_report_mode = False
-                        report_time_under_limit = False
-                        
-                        try:
-                            sending_report_radio_button = window.child_window(
-                                auto_id="MainWindow.centralWidget.lower_panel_widget.controls_stack_widget.page.QSO_controls_widget.tabWidget.qt_tabwidget_stackedwidget.tab.txrb2", 
-                                control_type="RadioButton"
-                            )
-                            
-                            in_report_mode = sending_report_radio_button.get_toggle_state()
-                            
-                            # If in report mode, check if we're still under the {TIME_IN_REPORT_MAX_SECONDS}-second limit
-                            if in_report_mode and tx_report_start_time is not None:
-                                time_in_report_mode = current_time - tx_report_start_time
-                                report_time_under_limit = time_in_report_mode < TIME_IN_REPORT_MAX_SECONDS  # Under {TIME_IN_REPORT_MAX_SECONDS} seconds limit
-                                # log_message(f"In report mode for {time_in_report_mode:.1f} seconds ({TIME_IN_REPORT_MAX_SECONDS}-second limit)")
-                            
-                        except Exception as e:
-                            log_message(f"Error checking report mode state: {e}")
-                        
-                        # Only initiate pause if NOT in report mode OR in report mode but OVER the time limit
-                        if not (in_report_mode and report_time_under_limit):
-                            if in_report_mode:
-                                log_message(f"In report mode but exceeded time limit, proceeding with TX timeout pause")
-                            else:
-                                log_message(f"Not in report mode, proceeding with TX timeout pause")
-                                
-                            log_message(f"TX6 has been active for {time_since_tx6:.1f} seconds, which exceeds {TX6_TIMEOUT_SECONDS} seconds")
-                            log_message(f"Initiating {TX6_PAUSE_SECONDS}-second pause and disabling TX...")
-                            
-                            # Disable TX
-                            log_message("Clicking 'Enable Tx' checkbox to stop TX...")
-                            enable_tx_checkbox.click()
-                            time.sleep(0.5)
-                            
-                            # Verify if state changed
-                            new_state = enable_tx_checkbox.get_toggle_state()
-                            if not new_state:
-                                log_message("Successfully disabled TX for pause period.")
-                            else:
-                                log_message("Warning: Checkbox was clicked but did not change state.")
-                            
-                            # Set pause state
-                            tx6_button_paused = True
-                            tx6_pause_start_time = time.time()
-                            log_message(f"Beginning {TX6_PAUSE_SECONDS}-second pause at {datetime.fromtimestamp(tx6_pause_start_time).strftime('%H:%M:%S')}")
-                        else:
-                            log_message(f"TX6 timeout detected but we're in report mode for less than {TIME_IN_REPORT_MAX_SECONDS} seconds ({time_in_report_mode:.1f}s), continuing without pause")
-                
-                if is_checked:
-                    # log_message(".")
-                    # If TX6 timer not started yet, start it now
-                    if tx6_button_start_time is None:
-                        tx6_button_start_time = time.time()
-                        log_message(f"Started tracking TX6 button activity at {datetime.fromtimestamp(tx6_button_start_time).strftime('%H:%M:%S')}")
-                else:
-                    log_message("'Enable Tx' is not checked.")
-                    # Reset TX6 timer if TX is disabled
-                    if tx6_button_start_time is not None:
-                        log_message("TX disabled, resetting TX6 timer.")
-                        tx6_button_start_time = None
-                    
-                    # Check if a Log QSO window is open
-                    try:
-                        # Look for any window with "- Log QSO" in the title
-                        log_qso_windows = findwindows.find_elements(title_re=r".*- Log QSO.*", backend="uia")
-                        
-                        if log_qso_windows:
-                            log_message("Found a 'Log QSO' window. Waiting 16 seconds before clicking OK...")
-                            # Wait 16 seconds before closing the Log QSO window
-                            time.sleep(15.2)
-                            
-                            # Connect to the Log QSO window
-                            log_qso_app = Application(backend="uia").connect(handle=log_qso_windows[0].handle)
-                            log_qso_window = log_qso_app.window(handle=log_qso_windows[0].handle)
-                            
-                            # Find and click the OK button
-                            ok_button = log_qso_window.child_window(title="OK", control_type="Button")
-                            ok_button.click()
-                            log_message("Clicked OK on the 'Log QSO' window after 16-second wait.")
-                            time.sleep(0.5)  # Give UI time to respond
-                            
-                            # Now try to close the "Alerts" window if it's present
-                            close_grid_tracker_alerts_window()
-                            
-                    except Exception as e:
-                        log_message(f"Error handling Log QSO window: {e}")
-                    
-                    # First click the Tx 6 button
-                    log_message("Clicking 'Tx 6' button first...")
-                    tx6_button.click()
-                    time.sleep(0.5)  # Give UI time to respond
-                    
-                    # NEW: Start the tx6 button timer
-                    tx6_button_start_time = time.time()
-                    log_message(f"Started tracking TX6 button activity at {datetime.fromtimestamp(tx6_button_start_time).strftime('%H:%M:%S')}")
-                    
-                    # Then click the Enable Tx checkbox
-                    log_message("Now clicking 'Enable Tx' checkbox...")
-                    enable_tx_checkbox.click()
-                    
-                    # Verify if state changed
-                    time.sleep(0.5)  # Short wait for state to update
-                    new_state = enable_tx_checkbox.get_toggle_state()
-                    if new_state:
-                        log_message("Successfully enabled TX after clicking 'Tx 6'.")
-                    else:
-                        log_message("Warning: Checkbox was clicked but did not change state.")
-                
-                # Wait before checking again
-                time.sleep(1)
-                
-                # Check if we are stuck responding to someone without luck
-                try:
-                    sending_report_radio_button = window.child_window(
-                        auto_id="MainWindow.centralWidget.lower_panel_widget.controls_stack_widget.page.QSO_controls_widget.tabWidget.qt_tabwidget_stackedwidget.tab.txrb2", 
-                        control_type="RadioButton"
-                    )
-                    
-                    sending_report_radio_button_state = sending_report_radio_button.get_toggle_state()
-                    if sending_report_radio_button_state:
-                        log_message("Responding with signal report")
-                        
-                        # Start timing if this is the first time we see it checked
-                        if tx_report_start_time is None:
-                            tx_report_start_time = time.time()
-                            log_message(f"Started tracking time in report mode at {datetime.fromtimestamp(tx_report_start_time).strftime('%H:%M:%S')}")
-                        
-                        # Check if we've been stuck in report mode too long
-                        tx_report_start_time = handle_stuck_in_report_mode(window, enable_tx_checkbox, tx_report_start_time)
-                        
-                    else:
-                        # log_message("...")
-                        # Reset the timer if the radio button is not checked
-                        if tx_report_start_time is not None:
-                            log_message("No longer in report mode, resetting timer.")
-                            tx_report_start_time = None
-                            
-                except Exception as e:
-                    log_message(f"Error checking RadioButton 'txrb2': {e}")
-                
-            except Exception as e:
-                # If there's an error during a single check, log it but don't exit
-                # This makes the script more resilient to temporary UI issues
-                log_message(f"Error during check: {e}")
-                log_message("Will retry in 3 seconds...")
-                time.sleep(3)
-                
-                # Try to reconnect to the window if needed
-                try:
-                    # Check if window still exists and is responsive
-                    window.is_visible()
-                except:
-                    log_message("Window may have closed. Attempting to reconnect...")
-                    # Try to reconnect
-                    matches = findwindows.find_elements(title_re=window_title_pattern, backend="uia")
-                    if matches:
-                        app = Application(backend="uia").connect(handle=matches[0].handle)
-                        window = app.window(handle=matches[0].handle)
-                        log_message("Reconnected to WSJT-X window.")
-                    else:
-                        log_message("WSJT-X window not found. Exiting.")
-                        sys.exit(1)
-        
+        if not run_watchdog(backend, window, watchdog, metrics, reconnect):
+            log_message("WSJT-X window not found. Exiting.")
+            sys.exit(1)
     except KeyboardInterrupt:
+        log_locator_stats(watchdog.controls)
+        if writer is not None:
+            writer.write()
         log_message("Monitoring stopped by user (Ctrl+C).")
     except Exception as e:
         log_message(f"Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        if journal is not None:
+            journal.close()
+
+def run_watchdog(backend, window, watchdog, metrics, reconnect, stop_event=None):
+    """
+    Steps the watchdog until stop_event is set. After an error, waits
+    ERROR_RETRY_SECONDS and, if the window stopped responding, calls
+    reconnect() for a new window and resets the watchdog; otherwise the
+    watchdog carries on where it was.
+
+    Returns:
+        False if reconnect() found no window, True when stopped
+    """
+    retry_at = None
+
+    # Main monitoring loop, never sleeps longer than one watchdog tick
+    while stop_event is None or not stop_event.is_set():
+        if retry_at is not None:
+            remaining = retry_at - time.time()
+            if remaining > 0:
+                time.sleep(min(remaining, 1))
+                continue
+            retry_at = None
+
+            # Try to reconnect to the window if needed
+            # Check if window still exists and is responsive
+            if backend.is_alive(window):
+                # Same window: keep the TX6/report timers and any pause, only
+                # look the controls up again
+                watchdog.controls.invalidate()
+            else:
+                log_message("Window may have closed. Attempting to reconnect...")
+                # Try to reconnect
+                window = reconnect()
+                if window is None:
+                    return False
+                watchdog.reset(ControlRegistry(backend, window))
+                log_message("Reconnected to WSJT-X window.")
+
+        started = time.perf_counter()
+        try:
+            delay = watchdog.step()
+            metrics.observe_tick(time.perf_counter() - started)
+            time.sleep(delay)
+        except Exception as e:
+            metrics.observe_tick(time.perf_counter() - started)
+            # If there's an error during a single check, log it but don't exit
+            # This makes the script more resilient to temporary UI issues
+            log_message(f"Error during check: {e}")
+            log_message(f"Will retry in {ERROR_RETRY_SECONDS} seconds...")
+            retry_at = time.time() + ERROR_RETRY_SECONDS
+    return True
+
+def monitor_all_instances(backend_factory=PywinautoBackend, metrics_file=METRICS_FILE, metrics_port=0, cycle=None, journal_path=DEFAULT_JOURNAL_PATH):
+    """
+    Runs one watchdog per WSJT-X instance (see instances.py), each on its own
+    thread with its own timers. The metrics and the event journal are shared.
+    """
+    metrics = UIMetrics(tick_budget_seconds=TICK_SECONDS)
+    if metrics_port:
+        metrics.serve(metrics_port)
+        log_message(f"Serving UI call metrics at http://localhost:{metrics_port}/metrics")
+    journal = open_journal(journal_path)
+
+    def run_instance(instance):
+        backend = InstrumentedBackend(instance.backend, metrics)
+        window = instance.connect()
+        # Every instance has its own Log QSO window; tell them apart by process
+        watchdog = TxWatchdog(backend, ControlRegistry(backend, window), windows=WindowIndex(backend, max_age=TICK_SECONDS),
+                              process_id=backend.window_process_id(instance.handle), poll_policy=policy_for(cycle, TICK_SECONDS),
+                              journal=journal)
+        log_message(f"Monitoring 'Enable Tx' of {instance.title}")
+        # A restarted instance comes back as a new window and gets a new worker
+        run_watchdog(backend, window, watchdog, metrics, lambda: None, instance.stop_event)
+        log_locator_stats(watchdog.controls)
+
+    manager = InstanceManager(lambda: backend_factory(), run_instance, log=log_message)
+    if metrics_file:
+        writer = MetricsWriter(metrics, metrics_file, log=log_message)
+        threading.Thread(target=writer.run, args=(manager.stop_event,), daemon=True).start()
+    log_message("Watching all WSJT-X instances. Press Ctrl+C to stop monitoring.")
+    try:
+        manager.run()
+    except KeyboardInterrupt:
+        log_message("Monitoring stopped by user (Ctrl+C).")
+    if metrics_file:
+        writer.write()
+    if journal is not None:
+        journal.close()
 
 if __name__ == "__main__":
-    monitor_and_enable_tx()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Keeps WSJT-X calling CQ with Tx 6 and Enable Tx")
+    parser.add_argument("--metrics-file", default=METRICS_FILE, help="Where to write UI call metrics, empty to disable")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve /metrics and /metrics.json on this port")
+    parser.add_argument("--window-events", action="store_true",
+                        help="Refresh the Log QSO/Alerts window index on UIA window-opened events instead of every tick")
+    parser.add_argument("--all-instances", action="store_true",
+                        help="Monitor every running WSJT-X instance (one per --rig-name) instead of exactly one")
+    parser.add_argument("--cycle", choices=sorted(PERIODS), help="Poll around the T/R period boundaries of this mode instead of every second")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="JSONL file for TX events, empty to disable")
+    args = parser.parse_args()
+    if args.all_instances:
+        monitor_all_instances(metrics_file=args.metrics_file, metrics_port=args.metrics_port, cycle=args.cycle, journal_path=args.journal)
+    else:
+        monitor_and_enable_tx(metrics_file=args.metrics_file, metrics_port=args.metrics_port,
+                              window_events=args.window_events, cycle=args.cycle, journal_path=args.journal)
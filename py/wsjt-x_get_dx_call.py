@@ -1,55 +1,167 @@
-from pywinauto import Application, findwindows
 from datetime import datetime
+import argparse
 import time
-import os
 
-def write_to_file(text):
-    with open("dx_input_log.txt", "w") as file:
-        file.write(text)
+import dx_events
+import dx_slot
+import instances
+import wsjtx_udp
+from cycle_scheduler import PERIODS, FixedInterval, policy_for
+from dx_capture import DX_POLL_SECONDS, DX_SLOT, InstanceOutputs, dx_call_changed, read_previous_text
+from ui_backend import PywinautoBackend, WSJTX_TITLE_PATTERN
+from wsjtx_controls import ControlRegistry
 
-def read_previous_text():
-    if os.path.exists("dx_input_log.txt"):
-        with open("dx_input_log.txt", "r") as file:
-            return file.read().strip()
-    return None
+window_title_pattern = WSJTX_TITLE_PATTERN
 
-window_title_pattern = r"WSJT-X\s+.*by K1JT"
-previous_text = read_previous_text()
-app = None
-
-while app is None:
-    try:
-        matches = findwindows.find_elements(title_re=window_title_pattern, backend="uia")
-        if len(matches) > 1:
-            print(f"Multiple windows found ({len(matches)}) matching WSJT-X. Retrying in 5 seconds...")
-            time.sleep(5)
-            continue
-        elif len(matches) == 0:
-            print("WSJT-X not running. Retrying in 5 seconds...")
+def connect_to_wsjtx(backend):
+    window = None
+    while window is None:
+        try:
+            matches = backend.find_windows(window_title_pattern)
+            if len(matches) > 1:
+                print(f"Multiple windows found ({len(matches)}) matching WSJT-X. Retrying in 5 seconds...")
+                time.sleep(5)
+                continue
+            elif len(matches) == 0:
+                print("WSJT-X not running. Retrying in 5 seconds...")
+                time.sleep(5)
+                continue
+            else:
+                window = backend.connect(matches[0])
+        except Exception as e:
+            print(f"Error occurred: {e}. Retrying in 5 seconds...")
             time.sleep(5)
-            continue
-        else:
-            app = Application(backend="uia").connect(handle=matches[0].handle)
-            window = app.window(handle=matches[0].handle)
-    except Exception as e:
-        print(f"Error occurred: {e}. Retrying in 5 seconds...")
-        time.sleep(5)
+    return window
 
-# window.print_control_identifiers()
-input_field = window.child_window(auto_id="MainWindow.centralWidget.lower_panel_widget.DX_controls_widget.dxCallEntry", control_type="Edit")
+def poll_dx_call(previous_text, events=None, slot=None, backend=None, poll_policy=None):
+    """
+    Reads the DX Call entry through UI Automation, once per second or when
+    poll_policy (see cycle_scheduler) says so.
+    """
+    backend = backend or PywinautoBackend()
+    poll_policy = poll_policy or FixedInterval(DX_POLL_SECONDS)
+    window = connect_to_wsjtx(backend)
 
-while True:
-    try:
-        text = input_field.get_value()
-        print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {text}")
+    # window.print_control_identifiers()
+    controls = ControlRegistry(backend, window)
+
+    while True:
+        try:
+            now = time.time()
+            text = controls.get_value("dx_call")
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {text}")
+
+            if text and text != previous_text:
+                dx_call_changed(text, events, slot)
+                previous_text = text
+                poll_policy.changed(now)
+                # print(f"{text}")
+
+            time.sleep(max(0.0, poll_policy.next_poll(now) - time.time()))
+
+        except Exception as e:
+            print(f"Error occurred: {e}")
+            break
+
+def listen_dx_call(previous_text, host, port, events=None, slot=None):
+    """
+    Follows the DX call from the WSJT-X UDP Status messages. WSJT-X sends a
+    Status as soon as the DX Call field changes, so there is nothing to poll.
+    """
+    print(f"Listening for WSJT-X UDP messages on {host}:{port}...")
+    state = {"previous_text": previous_text}
 
-        if text and text != previous_text:
-            write_to_file(text)
-            previous_text = text
-            # print(f"{text}")
+    def on_message(message, address):
+        if message["type"] != wsjtx_udp.STATUS or "dx_call" not in message:
+            return
+        text = message["dx_call"].strip()
+        if text and text != state["previous_text"]:
+            dx_call_changed(text, events, slot)
+            state["previous_text"] = text
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {text}")
 
-        time.sleep(1)
+    wsjtx_udp.listen(on_message, host=host, port=port)
 
-    except Exception as e:
-        print(f"Error occurred: {e}")
-        break
+def poll_all_instances(events=None, backend_factory=PywinautoBackend, cycle=None):
+    """
+    Polls the DX Call entry of every running WSJT-X instance, one thread each,
+    once per second or around the T/R period boundaries of cycle ("FT8", "FT4").
+    """
+
+    def run_instance(instance):
+        # Owned by this thread alone, and its slot is released when the thread ends
+        output = InstanceOutputs(instance.name)
+        poll_policy = policy_for(cycle, DX_POLL_SECONDS)
+        try:
+            controls = ControlRegistry(instance.backend, instance.connect())
+            while not instance.stop_event.is_set():
+                now = time.time()
+                try:
+                    if output.update(controls.get_value("dx_call"), events):
+                        poll_policy.changed(now)
+                except Exception as e:
+                    print(f"Error occurred on {instance.name}: {e}")
+                    return
+                instance.stop_event.wait(max(0.0, poll_policy.next_poll(now) - time.time()))
+        finally:
+            output.close()
+
+    instances.InstanceManager(lambda: backend_factory(), run_instance).run()
+
+def listen_all_instances(host, port, events=None):
+    """Follows the UDP Status messages of every instance, told apart by their client id."""
+    print(f"Listening for WSJT-X UDP messages from all instances on {host}:{port}...")
+    outputs = {}
+
+    def on_message(message, address):
+        if message["type"] != wsjtx_udp.STATUS or "dx_call" not in message:
+            return
+        name = instances.instance_name_from_udp_id(message["id"])
+        if name not in outputs:
+            outputs[name] = InstanceOutputs(name)
+        outputs[name].update(message["dx_call"].strip(), events)
+
+    try:
+        wsjtx_udp.listen(on_message, host=host, port=port)
+    finally:
+        for output in outputs.values():
+            output.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mirrors the WSJT-X DX call into dx_input_log.txt")
+    parser.add_argument("--udp", action="store_true", help="Follow WSJT-X UDP Status messages instead of polling the UI")
+    parser.add_argument("--host", default=wsjtx_udp.DEFAULT_HOST, help="UDP address WSJT-X reports to (multicast groups are joined)")
+    parser.add_argument("--port", type=int, default=wsjtx_udp.DEFAULT_PORT, help="UDP port WSJT-X reports to")
+    parser.add_argument("--events-port", type=int, default=dx_events.DEFAULT_PORT, help="Port for the Server-Sent Events endpoint, 0 disables it")
+    parser.add_argument("--all-instances", action="store_true",
+                        help="Follow every WSJT-X instance, writing dx_input_log_<rig>.txt for each --rig-name")
+    parser.add_argument("--cycle", choices=sorted(PERIODS), help="Poll around the T/R period boundaries of this mode instead of every second")
+    args = parser.parse_args()
+
+    previous_text = read_previous_text()
+    slot = None
+    if not args.all_instances:
+        # With --all-instances every instance opens its own slot
+        slot = dx_slot.DxSlotWriter(DX_SLOT)
+        if previous_text:
+            slot.write(previous_text)
+    events = None
+    if args.events_port:
+        events = dx_events.DxEventServer(port=args.events_port, initial_call=previous_text).start()
+        print(f"Publishing DX call changes at http://localhost:{events.port}/events")
+    try:
+        if args.all_instances and args.udp:
+            listen_all_instances(args.host, args.port, events)
+        elif args.all_instances:
+            poll_all_instances(events, cycle=args.cycle)
+        elif args.udp:
+            listen_dx_call(previous_text, args.host, args.port, events, slot)
+        else:
+            poll_dx_call(previous_text, events, slot, poll_policy=policy_for(args.cycle, DX_POLL_SECONDS))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if events is not None:
+            events.stop()
+        if slot is not None:
+            slot.close()
@@ -0,0 +1,80 @@
+# Runs the DX call capture and the TX watchdog in one process, over a single
+# WSJT-X connection and a single tick loop. Replaces running
+# wsjt-x_get_dx_call.py and wsjt-x_enable_tx.py side by side.
+#
+#   python wsjt-x_supervisor.py              # both
+#   python wsjt-x_supervisor.py --no-tx      # DX call capture only
+
+import argparse
+
+import dx_events
+from cycle_scheduler import PERIODS, policy_for
+from dx_capture import DX_INPUT_LOG, DX_POLL_SECONDS, DxCapture, InstanceOutputs, read_previous_text
+from event_journal import DEFAULT_JOURNAL_PATH, EventJournal
+from instances import DEFAULT_INSTANCE
+from supervisor import Supervisor
+from tx_watchdog import TICK_SECONDS, TxWatchdog, log_message, log_locator_stats
+from ui_backend import PywinautoBackend
+from ui_metrics import METRICS_FILE, InstrumentedBackend, MetricsWriter, UIMetrics
+
+
+def run_supervisor(tx=True, dx=True, events_port=dx_events.DEFAULT_PORT, metrics_file=METRICS_FILE, metrics_port=0, backend=None, cycle=None,
+                   journal_path=DEFAULT_JOURNAL_PATH):
+    metrics = UIMetrics(tick_budget_seconds=TICK_SECONDS)
+    backend = InstrumentedBackend(backend or PywinautoBackend(), metrics)
+    if metrics_port:
+        metrics.serve(metrics_port)
+        log_message(f"Serving UI call metrics at http://localhost:{metrics_port}/metrics")
+
+    factories = []
+    events = None
+    outputs = None
+    if dx:
+        outputs = InstanceOutputs(DEFAULT_INSTANCE)
+        if events_port:
+            events = dx_events.DxEventServer(port=events_port, initial_call=read_previous_text(DX_INPUT_LOG)).start()
+            log_message(f"Publishing DX call changes at http://localhost:{events.port}/events")
+        factories.append(lambda backend, controls: DxCapture(controls, outputs, events, poll_policy=policy_for(cycle, DX_POLL_SECONDS)))
+    journal = None
+    if tx:
+        if journal_path:
+            journal = EventJournal(journal_path)
+            log_message(f"Recording TX events to {journal_path}")
+        factories.append(lambda backend, controls: TxWatchdog(backend, controls, poll_policy=policy_for(cycle, TICK_SECONDS), journal=journal))
+    writer = None
+    if metrics_file:
+        writer = MetricsWriter(metrics, metrics_file, log=log_message)
+        factories.append(lambda backend, controls: writer)
+
+    supervisor = Supervisor(backend, factories, metrics=metrics)
+    log_message("Press Ctrl+C to stop.")
+    try:
+        supervisor.run()
+    except KeyboardInterrupt:
+        log_message("Stopped by user (Ctrl+C).")
+    finally:
+        if supervisor.controls is not None:
+            log_locator_stats(supervisor.controls)
+        if writer is not None:
+            writer.write()
+        if events is not None:
+            events.stop()
+        if outputs is not None:
+            outputs.close()
+        if journal is not None:
+            journal.close()
+    return supervisor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DX call capture and TX watchdog over one WSJT-X connection")
+    parser.add_argument("--no-tx", action="store_true", help="Do not run the TX watchdog")
+    parser.add_argument("--no-dx", action="store_true", help="Do not capture the DX call")
+    parser.add_argument("--events-port", type=int, default=dx_events.DEFAULT_PORT, help="Port for the Server-Sent Events endpoint, 0 disables it")
+    parser.add_argument("--metrics-file", default=METRICS_FILE, help="Where to write UI call metrics, empty to disable")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve /metrics and /metrics.json on this port")
+    parser.add_argument("--cycle", choices=sorted(PERIODS), help="Poll around the T/R period boundaries of this mode instead of every second")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="JSONL file for TX events, empty to disable")
+    args = parser.parse_args()
+    run_supervisor(tx=not args.no_tx, dx=not args.no_dx, events_port=args.events_port,
+                   metrics_file=args.metrics_file, metrics_port=args.metrics_port, cycle=args.cycle, journal_path=args.journal)
@@ -0,0 +1,182 @@
+# Automation ids of the WSJT-X controls the scripts work with, plus a registry
+# that resolves each control once and hands back the cached wrapper.
+#
+# A compiled locator map (wsjtx_locators.json, written by
+# debug/wsjt-x_ui_inspection.py --compile-locators from a UI snapshot) overrides
+# the built-in ids below, so a WSJT-X layout change only needs a new snapshot.
+
+import json
+import os
+import time
+
+LOCATORS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wsjtx_locators.json")
+
+TX_TAB_ID = "MainWindow.centralWidget.lower_panel_widget.controls_stack_widget.page.QSO_controls_widget.tabWidget.qt_tabwidget_stackedwidget.tab"
+
+CONTROLS = {
+    "enable_tx": {
+        "title": "Enable Tx",
+        "auto_id": "MainWindow.centralWidget.lower_panel_widget.autoButton",
+        "control_type": "CheckBox",
+    },
+    "dx_call": {
+        "auto_id": "MainWindow.centralWidget.lower_panel_widget.DX_controls_widget.dxCallEntry",
+        "control_type": "Edit",
+    },
+}
+
+for _i in range(1, 7):
+    CONTROLS[f"txb{_i}"] = {
+        "title": f"Tx {_i}",
+        "auto_id": f"{TX_TAB_ID}.txb{_i}",
+        "control_type": "Button",
+    }
+    CONTROLS[f"txrb{_i}"] = {
+        "auto_id": f"{TX_TAB_ID}.txrb{_i}",
+        "control_type": "RadioButton",
+    }
+
+
+def load_controls(path=LOCATORS_FILE):
+    """
+    Returns (controls, fallbacks): the lookup criteria per control name, taken
+    from the compiled locator map when there is one, and for each name the
+    criteria to try when those fail (built-in ids, then a search by title).
+    """
+    controls = {name: dict(spec) for name, spec in CONTROLS.items()}
+    titles = {name: spec["title"] for name, spec in CONTROLS.items() if spec.get("title")}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            compiled = json.load(file).get("controls", {})
+        for name, locator in compiled.items():
+            if name in controls and locator.get("auto_id"):
+                # Direct automation-id lookup; the title is kept for the fallback search
+                controls[name] = {
+                    "auto_id": locator["auto_id"],
+                    "control_type": locator.get("control_type") or CONTROLS[name]["control_type"],
+                }
+                if locator.get("title"):
+                    titles[name] = locator["title"]
+
+    fallbacks = {}
+    for name, spec in controls.items():
+        options = []
+        if CONTROLS[name]["auto_id"] != spec["auto_id"]:
+            options.append(CONTROLS[name])
+        if name in titles:
+            options.append({"title": titles[name], "control_type": spec["control_type"]})
+        fallbacks[name] = options
+    return controls, fallbacks
+
+
+class ControlRegistry:
+    """
+    Resolves WSJT-X controls by automation id once and keeps the wrappers.
+
+    A pywinauto child_window() spec walks the UIA tree every time it is used.
+    The registry walks it only on the first use of a control, or again when the
+    cached element has gone stale (the call on it raised an error the backend's
+    is_stale() recognizes).
+
+    Args:
+        backend: UIBackend used to resolve and operate the controls
+        window: Window returned by backend.connect()
+        controls: Name -> lookup criteria, the compiled locator map (or
+            CONTROLS) by default
+        clock: Time source for the per-hour rate, time.time by default
+        fallbacks: Name -> list of criteria tried when the primary lookup
+            fails, derived from the locator map by default
+    """
+
+    def __init__(self, backend, window, controls=None, clock=time.time, fallbacks=None):
+        self.backend = backend
+        self.window = window
+        if controls is None:
+            controls, default_fallbacks = load_controls()
+            fallbacks = default_fallbacks if fallbacks is None else fallbacks
+        self.controls = controls
+        self.fallbacks = fallbacks or {}
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.fallback_hits = 0
+        self.clock = clock
+        self.started = clock()
+
+    def _resolve(self, name):
+        self.misses += 1
+        try:
+            wrapper = self.backend.find_control(self.window, **self.controls[name])
+        except Exception as e:
+            wrapper = self._resolve_fallback(name, e)
+        self._cache[name] = wrapper
+        return wrapper
+
+    def _resolve_fallback(self, name, error):
+        """Tries the fallback criteria in order; re-raises the last error if none match."""
+        for criteria in self.fallbacks.get(name, []):
+            try:
+                wrapper = self.backend.find_control(self.window, **criteria)
+            except Exception as e:
+                error = e
+                continue
+            self.fallback_hits += 1
+            return wrapper
+        raise error
+
+    def get(self, name):
+        """Returns the cached wrapper for a control, resolving it on first use."""
+        wrapper = self._cache.get(name)
+        if wrapper is None:
+            return self._resolve(name)
+        self.hits += 1
+        return wrapper
+
+    def invalidate(self, name=None):
+        """Drops one cached control, or all of them (e.g. after a reconnect)."""
+        if name is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(name, None)
+
+    def call(self, name, operation):
+        """
+        Runs a backend operation (get_toggle_state, click, ...) on a control.
+        If the cached element is stale the control is resolved again and the
+        call retried once. Any other error is raised as is: the operation may
+        already have taken effect, and a second click would undo the first.
+        """
+        cached = name in self._cache
+        wrapper = self.get(name)
+        try:
+            return getattr(self.backend, operation)(wrapper)
+        except Exception as e:
+            if not cached or not self.backend.is_stale(e):
+                raise
+            self.stale += 1
+            self.invalidate(name)
+            wrapper = self._resolve(name)
+            return getattr(self.backend, operation)(wrapper)
+
+    def get_toggle_state(self, name):
+        return self.call(name, "get_toggle_state")
+
+    def get_value(self, name):
+        return self.call(name, "get_value")
+
+    def click(self, name):
+        return self.call(name, "click")
+
+    def stats(self):
+        """Returns lookup counters and the per-hour rate of tree walks saved."""
+        hours = max(self.clock() - self.started, 1) / 3600
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "fallback_hits": self.fallback_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_per_hour": self.hits / hours,
+        }
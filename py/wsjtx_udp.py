@@ -0,0 +1,242 @@
+# Reads the UDP messages WSJT-X sends to its "UDP Server" (Settings -> Reporting).
+# Messages are QDataStream-framed and big-endian, see NetworkMessage.hpp in the
+# WSJT-X sources for the full field list.
+
+import ipaddress
+import socket
+import struct
+
+MAGIC = 0xADBCCBDA
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 2237
+
+HEARTBEAT = 0
+STATUS = 1
+DECODE = 2
+CLEAR = 3
+QSO_LOGGED = 5
+CLOSE = 6
+
+# Status fields in wire order. Older WSJT-X versions stop early, so anything
+# missing at the end of a datagram is simply left out of the result.
+STATUS_FIELDS = [
+    ("dial_frequency", "quint64"),
+    ("mode", "utf8"),
+    ("dx_call", "utf8"),
+    ("report", "utf8"),
+    ("tx_mode", "utf8"),
+    ("tx_enabled", "bool"),
+    ("transmitting", "bool"),
+    ("decoding", "bool"),
+    ("rx_df", "quint32"),
+    ("tx_df", "quint32"),
+    ("de_call", "utf8"),
+    ("de_grid", "utf8"),
+    ("dx_grid", "utf8"),
+    ("tx_watchdog", "bool"),
+    ("sub_mode", "utf8"),
+    ("fast_mode", "bool"),
+    ("special_operation_mode", "quint8"),
+    ("frequency_tolerance", "quint32"),
+    ("tr_period", "quint32"),
+    ("configuration_name", "utf8"),
+    ("tx_message", "utf8"),
+]
+
+HEARTBEAT_FIELDS = [
+    ("max_schema", "quint32"),
+    ("version", "utf8"),
+    ("revision", "utf8"),
+]
+
+DECODE_FIELDS = [
+    ("new", "bool"),
+    ("time", "qtime"),
+    ("snr", "qint32"),
+    ("delta_time", "double"),
+    ("delta_frequency", "quint32"),
+    ("mode", "utf8"),
+    ("message", "utf8"),
+    ("low_confidence", "bool"),
+    ("off_air", "bool"),
+]
+
+MESSAGE_FIELDS = {
+    HEARTBEAT: HEARTBEAT_FIELDS,
+    STATUS: STATUS_FIELDS,
+    DECODE: DECODE_FIELDS,
+}
+
+_NULL_LENGTH = 0xFFFFFFFF
+
+
+class _Truncated(Exception):
+    pass
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def _take(self, size):
+        end = self.pos + size
+        if end > len(self.data):
+            raise _Truncated()
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def quint8(self):
+        return self._take(1)[0]
+
+    def bool(self):
+        return self._take(1)[0] != 0
+
+    def quint32(self):
+        return struct.unpack(">I", self._take(4))[0]
+
+    def qint32(self):
+        return struct.unpack(">i", self._take(4))[0]
+
+    def quint64(self):
+        return struct.unpack(">Q", self._take(8))[0]
+
+    def double(self):
+        return struct.unpack(">d", self._take(8))[0]
+
+    def qtime(self):
+        # Milliseconds since midnight, 0xFFFFFFFF for a null QTime
+        value = self.quint32()
+        return None if value == _NULL_LENGTH else value
+
+    def utf8(self):
+        length = self.quint32()
+        if length == _NULL_LENGTH:
+            return ""
+        return self._take(length).decode("utf-8", errors="replace")
+
+
+def parse_message(data):
+    """
+    Decodes one WSJT-X datagram.
+
+    Args:
+        data: Raw datagram bytes
+
+    Returns:
+        A dict with at least 'type', 'schema' and 'id', plus the decoded fields
+        for the message types listed in MESSAGE_FIELDS. None if the datagram
+        is not a WSJT-X message.
+    """
+    reader = _Reader(data)
+    try:
+        if reader.quint32() != MAGIC:
+            return None
+        message = {
+            "schema": reader.quint32(),
+            "type": reader.quint32(),
+        }
+        message["id"] = reader.utf8()
+    except _Truncated:
+        return None
+
+    for name, kind in MESSAGE_FIELDS.get(message["type"], []):
+        try:
+            message[name] = getattr(reader, kind)()
+        except _Truncated:
+            break
+    return message
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+
+    def quint8(self, value):
+        self.parts.append(struct.pack(">B", value))
+
+    def bool(self, value):
+        self.parts.append(struct.pack(">B", 1 if value else 0))
+
+    def quint32(self, value):
+        self.parts.append(struct.pack(">I", value))
+
+    def qint32(self, value):
+        self.parts.append(struct.pack(">i", value))
+
+    def quint64(self, value):
+        self.parts.append(struct.pack(">Q", value))
+
+    def double(self, value):
+        self.parts.append(struct.pack(">d", value))
+
+    def qtime(self, value):
+        self.quint32(_NULL_LENGTH if value is None else value)
+
+    def utf8(self, value):
+        encoded = (value or "").encode("utf-8")
+        self.quint32(len(encoded))
+        self.parts.append(encoded)
+
+
+def encode_message(message_type, client_id, fields=None, schema=2):
+    """
+    Builds a datagram in the same framing WSJT-X uses. Handy for replaying
+    traffic on a machine without WSJT-X.
+
+    Args:
+        message_type: One of the message type constants (STATUS, ...)
+        client_id: The WSJT-X instance id (usually "WSJT-X" or the rig name)
+        fields: Dict of field values, missing fields get empty defaults
+
+    Returns:
+        The encoded datagram as bytes
+    """
+    fields = fields or {}
+    writer = _Writer()
+    writer.quint32(MAGIC)
+    writer.quint32(schema)
+    writer.quint32(message_type)
+    writer.utf8(client_id)
+    defaults = {"utf8": "", "bool": False, "qtime": None, "double": 0.0}
+    for name, kind in MESSAGE_FIELDS.get(message_type, []):
+        getattr(writer, kind)(fields.get(name, defaults.get(kind, 0)))
+    return b"".join(writer.parts)
+
+
+def open_socket(host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=0.5):
+    """
+    Binds a UDP socket for WSJT-X traffic. A multicast host (e.g. 224.0.0.1,
+    which lets GridTracker and this script share the stream) is joined
+    automatically.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if ipaddress.ip_address(host).is_multicast:
+        sock.bind(("", port))
+        membership = struct.pack("4s4s", socket.inet_aton(host), socket.inet_aton("0.0.0.0"))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+    else:
+        sock.bind((host, port))
+    sock.settimeout(timeout)
+    return sock
+
+
+def listen(callback, host=DEFAULT_HOST, port=DEFAULT_PORT, stop_event=None):
+    """
+    Receives WSJT-X datagrams and calls callback(message, address) for each
+    one that decodes. Blocks until stop_event is set (or forever).
+    """
+    sock = open_socket(host, port)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            try:
+                data, address = sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            message = parse_message(data)
+            if message is not None:
+                callback(message, address)
+    finally:
+        sock.close()
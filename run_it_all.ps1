@@ -10,7 +10,9 @@ Start-Sleep -Seconds 5
 Start-Process -FilePath $gridTrackerPath
 Start-Sleep -Seconds 5
 
-$scriptPath = "$HOME\Desktop\QRZ-WSJTX-Mapper\py\wsjt-x_get_dx_call.py"
+$scriptPath = "$HOME\Desktop\QRZ-WSJTX-Mapper\py\wsjt-x_supervisor.py"
 
-# Open a new PowerShell window, set size and run the Python script
-Start-Process powershell -ArgumentList '-NoExit -Command "mode con: cols=80 lines=4; cd \"$HOME\Desktop\QRZ-WSJTX-Mapper\py\"; python.exe wsjt-x_get_dx_call.py; pause"' -WindowStyle Normal
\ No newline at end of file
+# Open a new PowerShell window, set size and run the supervisor, which captures
+# the DX call and waits for WSJT-X to come back if it restarts. Remove --no-tx to
+# also run the TX watchdog over the same WSJT-X connection.
+Start-Process powershell -ArgumentList '-NoExit -Command "mode con: cols=80 lines=4; cd \"$HOME\Desktop\QRZ-WSJTX-Mapper\py\"; python.exe wsjt-x_supervisor.py --no-tx; pause"' -WindowStyle Normal
\ No newline at end of file